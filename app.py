@@ -1,95 +1,443 @@
-from flask import Flask, render_template, redirect, url_for, request, jsonify, session
+from flask import Blueprint, Flask, render_template, redirect, url_for, request, jsonify, session, send_file, Response, stream_with_context, g
 import uuid
 import os
 import json
 import time
 import threading
 import traceback
+import asyncio
 import random
-from azure.cognitiveservices.speech import SpeechConfig, SpeechSynthesizer, AudioConfig, ResultReason
-from azure.cognitiveservices.speech.audio import AudioOutputConfig
+import shutil
+import itertools
+import mimetypes
+from xml.sax.saxutils import escape
 from dotenv import load_dotenv
-import requests
-from pydub import AudioSegment
-import io
-import google.generativeai as genai
+from audio_output import TranscodeError, atomic_write, ffmpeg_available, get_output_stage, transcode_file
+from audio_store import AudioStore, SynthesisAbandoned
+from audio_serving import AudioVersions
+from session_expiry import SessionExpiry, remove_session_dir, select_evictions, session_dir
+from session_events import SessionEventBus, StoreEventBus, TERMINAL_EVENTS, format_sse
+from session_store import MemorySessionStore, create_session_store
+from generation_executor import CancellationToken, GenerationExecutor, JobCancelled, QueueFull
+from async_engine import AsyncGenerationEngine
+from intro_audio import INTRO_DIR, IntroAudioPrecompute, RECON_INTRODUCTIONS, USER_INTRODUCTIONS
+from transcription import create_stt_engine
+from report_cache import FeedbackCache
+from question_bank import QuestionBank, normalize_config
+from llm_gateway import LLMGateway
+from speculation import SpeculationTracker, speculation_key
+from metrics import registry
+from question_pipeline import (QuestionPipeline, iter_numbered_questions, normalize_question, parse_question_batch,
+                               unique_questions)
 
 # Load environment variables
 load_dotenv()
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-gemini_model = genai.GenerativeModel('gemini-2.0-flash')
-
-app = Flask(__name__)
-app.secret_key = 'your_secret_key'  # For session management
+# Routes live on a blueprint; create_app() builds the Flask app around it
+bp = Blueprint('main', __name__)
 
 # Initialize Azure Speech
 speech_key = os.getenv("AZURE_SPEECH_KEY")
 speech_region = os.getenv("AZURE_SPEECH_REGION")
 
-# In-memory session storage (replace with DB in production)
-sessions = {}
+# Per-session worker pool size for concurrent answer/TTS generation
+QUESTION_PREP_WORKERS = int(os.getenv("QUESTION_PREP_WORKERS", "4"))
+# How questions are requested from Gemini:
+#   batch  - one JSON call for all questions and model answers
+#   stream - stream the question list, one answer call per question
+#   single - blocking question list call, one answer call per question
+QUESTION_GENERATION_MODE = os.getenv("QUESTION_GENERATION_MODE", "batch").lower()
+
+# Generated questions are banked per normalized config (skills/company, role, level).
+# Once a config has QUESTION_BANK_WARM_SIZE questions, sessions are served from
+# the bank without Gemini or TTS calls; prewarm_questions.py fills it ahead of time.
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK", "true").lower() == "true"
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH", "data/question_bank.db")
+QUESTION_BANK_WARM_SIZE = int(os.getenv("QUESTION_BANK_WARM_SIZE", "30"))
+
+# Voice settings, part of the audio cache key
+TTS_VOICE = "en-US-AriaNeural"
+TTS_PROSODY_RATE = "0.9"
+# 'native' requests MP3 straight from Azure, 'transcode' requests PCM and encodes locally
+AUDIO_OUTPUT_MODE = os.getenv("AUDIO_OUTPUT_MODE", "native").lower()
+# Relay question audio to the browser while it is being synthesized (needs native output)
+AUDIO_STREAMING = os.getenv("AUDIO_STREAMING", "true").lower() == "true" and AUDIO_OUTPUT_MODE == "native"
+# Cache format of streamed clips, the same key generate_tts uses in native mode
+STREAM_AUDIO_FORMAT = "rest-native-mp3"
+# Besides MP3, produce an Opus (.ogg) variant of every clip for browsers that
+# can play it; clients get the best variant they accept. Variants are
+# transcoded from the synthesized clip with ffmpeg, in the background.
+AUDIO_OPUS = os.getenv("AUDIO_OPUS", "true").lower() == "true"
+AUDIO_FORMATS = ('mp3', 'ogg') if AUDIO_OPUS else ('mp3',)
+AUDIO_MIMETYPES = {'mp3': 'audio/mpeg', 'ogg': 'audio/ogg'}
+
+# LLM_BACKEND=fake swaps Gemini for the local fake from fakes.py, whose speed and
+# failures are set by LLM_FAKE_LATENCY, LLM_FAKE_JITTER and LLM_FAKE_ERROR_RATE
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+
+# Heavy SDK clients (google.generativeai, requests, the Azure Speech SDK) are
+# imported and built on first use, see get_gemini_model() and get_tts_client()
+_gemini_model = None
+_tts_client = None
+_stt_engine = None
+_client_lock = threading.Lock()
+
+# Synthesized audio is shared across sessions by content hash
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", "static/audio/cache")
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Clips used within this many seconds are kept even over the size cap, since
+# sessions link to them; never less than the session TTL
+AUDIO_CACHE_MIN_AGE = int(os.getenv("AUDIO_CACHE_MIN_AGE", "7200"))
+
+# Question and introduction audio is served from content-versioned, immutable
+# URLs (/audio/v/<hash>/...). AUDIO_OFFLOAD hands the file transfer to the proxy:
+#   none     - the worker sends the file (default)
+#   nginx    - X-Accel-Redirect to AUDIO_ACCEL_PREFIX/<root>/<filename>, an internal location
+#   sendfile - X-Sendfile with the absolute path (Apache mod_xsendfile, lighttpd)
+AUDIO_OFFLOAD = os.getenv("AUDIO_OFFLOAD", "none").lower()
+AUDIO_ACCEL_PREFIX = os.getenv("AUDIO_ACCEL_PREFIX", "/protected-audio").rstrip('/')
+AUDIO_MAX_AGE = 365 * 24 * 3600
+audio_versions = AudioVersions({'intro': INTRO_DIR, 'cache': AUDIO_CACHE_DIR})
+
+# Introduction clips at startup:
+#   eager      - synthesize missing or stale clips before serving (default)
+#   background - serve right away, synthesize in a background thread
+#   lazy       - skip startup synthesis, build each clip on first use
+INTRO_AUDIO_MODE = os.getenv("INTRO_AUDIO_MODE", "eager").lower()
+# Concurrent Azure syntheses while precomputing introduction clips
+INTRO_AUDIO_WORKERS = int(os.getenv("INTRO_AUDIO_WORKERS", "4"))
+
+# Seconds between keep-alive comments on idle event streams
+SSE_HEARTBEAT_SECONDS = int(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+# An event stream holds its worker thread for the whole preparation. Under
+# sync workers (gunicorn's default) set SSE_ENABLED=false: the stream answers
+# 204 and clients long-poll /session_events/<id>/poll instead.
+SSE_ENABLED = os.getenv("SSE_ENABLED", "true").lower() == "true"
+
+# Per-stage latencies and outcomes, served in Prometheus text format at /metrics
+gemini_seconds = registry.histogram('recon_gemini_request_seconds', 'Gemini call latency', ['mode'])
+gemini_requests = registry.counter('recon_gemini_requests_total', 'Gemini calls by outcome', ['mode', 'outcome'])
+tts_seconds = registry.histogram('recon_tts_seconds', 'Audio generation latency, cache hits included', ['engine'])
+tts_requests = registry.counter('recon_tts_requests_total', 'Audio generations by outcome', ['engine', 'outcome'])
+tts_synthesis_seconds = registry.histogram('recon_tts_synthesis_seconds', 'Azure synthesis latency on cache misses', ['engine'])
+tts_fallbacks = registry.counter('recon_tts_fallbacks_total', 'Clips that needed the Azure SDK fallback')
+route_seconds = registry.histogram('recon_http_request_seconds', 'Route latency until the response is returned',
+                                   ['endpoint', 'method'])
+route_responses = registry.counter('recon_http_responses_total', 'Responses by route and status',
+                                   ['endpoint', 'method', 'status'])
+session_milestone_seconds = registry.histogram(
+    'recon_session_milestone_seconds',
+    'Time from session creation to intro_ready, question_N and all_questions_ready', ['milestone'],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+)
+executor_jobs = registry.gauge('recon_executor_jobs', 'Running and queued jobs per executor', ['executor', 'state'])
+
+# Engine for session question generation:
+#   threads - bounded thread pool; beyond the queue depth /prepare_session
+#             answers 503 with Retry-After (default)
+#   asyncio - every preparing session is a task on one event-loop thread, using
+#             the async Gemini API and async HTTP for TTS; up to
+#             ASYNC_MAX_SESSIONS at once, TTS_MAX_CONCURRENCY syntheses in flight
+GENERATION_ENGINE = os.getenv("GENERATION_ENGINE", "threads").lower()
+if GENERATION_ENGINE == 'asyncio':
+    generation_executor = AsyncGenerationEngine(max_sessions=int(os.getenv("ASYNC_MAX_SESSIONS", "500")))
+else:
+    generation_executor = GenerationExecutor(
+        max_workers=int(os.getenv("GENERATION_WORKERS", "8")),
+        max_queue=int(os.getenv("GENERATION_QUEUE_DEPTH", "32"))
+    )
+tts_slots = asyncio.Semaphore(int(os.getenv("TTS_MAX_CONCURRENCY", "20")))
+
+# Setup pages prepare a provisional session while the form is filled in. It is
+# claimed if the submitted config matches and cancelled otherwise; unclaimed
+# ones expire after SPECULATION_TTL_SECONDS. Speculation only runs while more
+# than SPECULATION_RESERVED_WORKERS generation workers are idle.
+SPECULATION_TTL_SECONDS = int(os.getenv("SPECULATION_TTL_SECONDS", "300"))
+SPECULATION_RESERVED_WORKERS = int(os.getenv("SPECULATION_RESERVED_WORKERS", "1"))
+speculation_tracker = SpeculationTracker()
+
+# Answers are transcribed in the background as they are submitted.
+# STT_ENGINE: azure (default) or offline (placeholder transcripts, no Azure calls)
+STT_ENGINE = os.getenv("STT_ENGINE", "azure").lower()
+STT_LANGUAGE = os.getenv("STT_LANGUAGE", "en-US")
+transcription_executor = GenerationExecutor(
+    max_workers=int(os.getenv("TRANSCRIPTION_WORKERS", "2")),
+    max_queue=int(os.getenv("TRANSCRIPTION_QUEUE_DEPTH", "64"))
+)
+
+# Reports are generated in the background once the last answer is in and
+# memoized on the session; feedback is shared by sessions with the same inputs
+report_executor = GenerationExecutor(
+    max_workers=int(os.getenv("REPORT_WORKERS", "2")),
+    max_queue=int(os.getenv("REPORT_QUEUE_DEPTH", "64"))
+)
+# Opus variants of question clips, derived after the question is published
+variant_executor = GenerationExecutor(
+    max_workers=int(os.getenv("AUDIO_VARIANT_WORKERS", "2")),
+    max_queue=int(os.getenv("AUDIO_VARIANT_QUEUE_DEPTH", "256"))
+)
+feedback_cache = FeedbackCache(max_entries=int(os.getenv("REPORT_CACHE_ENTRIES", "512")))
+# A pending report older than this is assumed lost (e.g. its worker restarted)
+REPORT_STALE_SECONDS = 120
+
+# Sessions expire after SESSION_TTL_SECONDS without activity. Over the session
+# count or disk budget, the least recently active sessions are evicted first.
+# Activity, TTLs and disk usage live in the session store, so every worker
+# agrees; each worker writes a session's activity at most every
+# SESSION_ACTIVITY_WRITE_SECONDS.
+SESSION_SWEEP_INTERVAL = int(os.getenv("SESSION_SWEEP_INTERVAL", "30"))
+SESSION_DATA_DIR = os.getenv("SESSION_DATA_DIR", "data/sessions")
+MAX_ACTIVE_SESSIONS = int(os.getenv("MAX_ACTIVE_SESSIONS", "1000"))
+SESSION_DISK_BUDGET_BYTES = int(os.getenv("SESSION_DISK_BUDGET_BYTES", str(2 * 1024 ** 3)))
+# Sessions read per round when the disk budget is exceeded
+SESSION_EVICTION_BATCH = 64
+session_expiry = SessionExpiry(
+    ttl=int(os.getenv("SESSION_TTL_SECONDS", "3600")),
+    persist_interval=int(os.getenv("SESSION_ACTIVITY_WRITE_SECONDS", "30"))
+)
+
+# Session storage: memory:// (default), sqlite:///path/to.db or redis://host:port/db
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL")
+
+# Per-worker resources, built by create_app() after the worker has forked
+audio_store = None
+sessions = None
+event_bus = None
+question_bank = None
+
+def create_app(start_services=True):
+    """
+    Application factory: creates directories, storage and the Flask app
+
+    Call it in each worker after forking, e.g. gunicorn "app:create_app()".
+    The heavy SDKs are not imported here. With start_services, introduction
+    audio precompute and the session sweeper are started as well.
+    """
+    global audio_store, sessions, event_bus, question_bank
+
+    # Ensure static directories exist
+    for directory in ['static/audio', INTRO_DIR, SESSION_DATA_DIR]:
+        os.makedirs(directory, exist_ok=True)
+
+    audio_store = AudioStore(root=AUDIO_CACHE_DIR, max_bytes=AUDIO_CACHE_MAX_BYTES,
+                             min_age=max(AUDIO_CACHE_MIN_AGE, session_expiry.ttl))
+    sessions = create_session_store(SESSION_STORE_URL)
+    if QUESTION_BANK_ENABLED:
+        question_bank = QuestionBank(QUESTION_BANK_PATH)
+
+    # Preparation progress pushed to clients (intro_ready, question_ready, ...).
+    # Shared stores keep events in the session record so every worker sees them.
+    if isinstance(sessions, MemorySessionStore):
+        event_bus = SessionEventBus()
+    else:
+        event_bus = StoreEventBus(sessions)
+
+    app = Flask(__name__)
+    app.secret_key = 'your_secret_key'  # For session management
+    app.config['USE_X_SENDFILE'] = AUDIO_OFFLOAD == 'sendfile'
+    app.register_blueprint(bp)
 
-# Ensure static directories exist
-for directory in ['static/audio', 'static/user_answers', 'static/audio/introductions']:
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+    if start_services:
+        start_background_services()
+    return app
+
+def get_gemini_model():
+    """Configure Gemini and build the model on first use"""
+    global _gemini_model
+    if _gemini_model is None:
+        with _client_lock:
+            if _gemini_model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+                _gemini_model = genai.GenerativeModel('gemini-2.0-flash')
+    return _gemini_model
+
+def get_llm_backend():
+    """Model behind the LLM gateway: Gemini, or the local fake when LLM_BACKEND=fake"""
+    global _gemini_model
+    if LLM_BACKEND == 'fake' and _gemini_model is None:
+        with _client_lock:
+            if _gemini_model is None:
+                from fakes import FakeGeminiModel
+                _gemini_model = FakeGeminiModel(
+                    latency=float(os.getenv("LLM_FAKE_LATENCY", "0.5")),
+                    jitter=float(os.getenv("LLM_FAKE_JITTER", "0")),
+                    error_rate=float(os.getenv("LLM_FAKE_ERROR_RATE", "0"))
+                )
+    return get_gemini_model()
+
+# Every LLM call goes through one gateway: a token bucket sized to the Gemini
+# quota, a cap on concurrent calls, coalescing of identical prompts in flight
+# and an optional response cache (LLM_CACHE_TTL seconds, 0 disables it)
+llm_gateway = LLMGateway(
+    get_llm_backend,
+    requests_per_minute=int(os.getenv("LLM_REQUESTS_PER_MINUTE", "600")),
+    burst=int(os.getenv("LLM_BURST", "20")),
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+    cache_ttl=int(os.getenv("LLM_CACHE_TTL", "0"))
+)
+
+def get_tts_client():
+    """Shared Azure TTS REST client (connection pool, cached token, retries), built on first use"""
+    global _tts_client
+    if _tts_client is None:
+        with _client_lock:
+            if _tts_client is None:
+                from tts_client import AzureTTSClient
+                _tts_client = AzureTTSClient(
+                    speech_key, speech_region,
+                    pool_size=int(os.getenv("AZURE_TTS_POOL_SIZE", "20")),
+                    max_retries=int(os.getenv("AZURE_TTS_MAX_RETRIES", "3")),
+                    backoff_factor=float(os.getenv("AZURE_TTS_BACKOFF", "0.5")),
+                    endpoint=os.getenv("AZURE_TTS_ENDPOINT"),
+                    token_endpoint=os.getenv("AZURE_TTS_TOKEN_ENDPOINT")
+                )
+    return _tts_client
+
+def get_stt_engine():
+    """Speech-to-text engine selected by STT_ENGINE, built on first use"""
+    global _stt_engine
+    if _stt_engine is None:
+        with _client_lock:
+            if _stt_engine is None:
+                _stt_engine = create_stt_engine(STT_ENGINE, key=speech_key, region=speech_region,
+                                                language=STT_LANGUAGE)
+    return _stt_engine
 
 # --- IMPROVED TTS FUNCTION ---
-def generate_tts(text, output_file):
+def generate_tts(text, output_file=None, ext='mp3'):
     """
-    Generate TTS audio using Azure Speech Services REST API with better error handling
+    Generate TTS audio through the shared audio cache using the REST API
+
+    Returns the path of the generated audio (the cached file in format
+    `ext` when no output_file is given), or False on failure.
     """
-    print(f"[DEBUG] Generating TTS for: {text[:50]}... -> {output_file}")
-    
+    if output_file is not None:
+        ext = os.path.splitext(output_file)[1].lstrip('.')
+    fmt = ext if ext in AUDIO_MIMETYPES else 'wav'
+    with tts_seconds.time(engine='rest'):
+        cached = audio_store.fetch(
+            text, lambda target: synthesize_tts_rest(text, target),
+            voice=TTS_VOICE, rate=TTS_PROSODY_RATE, fmt=f"rest-{AUDIO_OUTPUT_MODE}-{fmt}", ext=fmt
+        )
+        placed = place_cached_audio(cached, output_file)
+    tts_requests.inc(engine='rest', outcome='success' if placed else 'failure')
+    return placed
+
+def generate_tts_fallback(text, output_file=None):
+    """
+    Fallback TTS generation through the shared audio cache using the Azure SDK
+    """
+    tts_fallbacks.inc()
+    with tts_seconds.time(engine='sdk'):
+        cached = audio_store.fetch(
+            text, lambda target: synthesize_tts_sdk(text, target),
+            voice=TTS_VOICE, rate='sdk-default', fmt='sdk-riff', ext='wav'
+        )
+        placed = place_cached_audio(cached, output_file)
+    tts_requests.inc(engine='sdk', outcome='success' if placed else 'failure')
+    return placed
+
+def place_cached_audio(cached, output_file):
+    """
+    Expose a cached clip at output_file, keeping the extension of what was synthesized
+    """
+    if not cached:
+        return False
+    if output_file is None:
+        return cached
+
+    target = os.path.splitext(output_file)[0] + os.path.splitext(cached)[1]
     try:
-        # Construct the REST API URL
-        url = f"https://{speech_region}.tts.speech.microsoft.com/cognitiveservices/v1"
-        
-        # Prepare headers
-        headers = {
-            'Ocp-Apim-Subscription-Key': speech_key,
-            'Content-Type': 'application/ssml+xml',
-            'X-Microsoft-OutputFormat': 'riff-24khz-16bit-mono-pcm',
-            'User-Agent': 'ReconAI-TTS'
-        }
-        
-        # Create SSML content
-        ssml_content = f"""<?xml version="1.0" encoding="UTF-8"?>
+        return audio_store.place(cached, target)
+    except OSError as e:
+        print(f"[ERROR] Could not place cached audio at {target}: {str(e)}")
+        return False
+
+def build_ssml(text):
+    """
+    Build the SSML request body for a piece of text
+    """
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
 <speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="en-US">
-    <voice name="en-US-AriaNeural">
-        <prosody rate="0.9" pitch="0%">
-            {text}
+    <voice name="{TTS_VOICE}">
+        <prosody rate="{TTS_PROSODY_RATE}" pitch="0%">
+            {escape(text)}
         </prosody>
     </voice>
 </speak>"""
+
+def tts_stream_opener(text):
+    """
+    Zero-argument callable that starts synthesizing text and returns its MP3 chunks
+    """
+    stage = get_output_stage('stream.mp3', mode='native')
+
+    def open_stream():
+        response = get_tts_client().synthesize(build_ssml(text), stage.request_format, stream=True)
+        if response.status_code != 200:
+            response.close()
+            raise RuntimeError(f"TTS stream request failed with status {response.status_code}")
+        return relay(response)
+
+    def relay(response):
+        try:
+            with tts_synthesis_seconds.time(engine='stream'):
+                yield from response.iter_content(chunk_size=4096)
+        finally:
+            response.close()
+
+    return open_stream
+
+def stream_tts(text):
+    """
+    Yield MP3 chunks for text as Azure synthesizes them, teeing them into the audio cache
+
+    A synthesis already in flight for the same text is followed instead of repeated.
+    """
+    return audio_store.stream(
+        text, tts_stream_opener(text),
+        voice=TTS_VOICE, rate=TTS_PROSODY_RATE, fmt=STREAM_AUDIO_FORMAT, ext='mp3'
+    )
+
+def generate_streamed_tts(text):
+    """
+    generate_tts for clips that /audio_stream may ask for while they are synthesized
+
+    The clip is written through the streaming path, so listeners that arrive
+    before it is done follow it as it is written. Returns its path or False.
+    """
+    with tts_seconds.time(engine='stream'):
+        path = audio_store.fetch_stream(
+            text, tts_stream_opener(text),
+            voice=TTS_VOICE, rate=TTS_PROSODY_RATE, fmt=STREAM_AUDIO_FORMAT, ext='mp3'
+        )
+    tts_requests.inc(engine='stream', outcome='success' if path else 'failure')
+    return path or False
+
+def synthesize_tts_rest(text, output_file):
+    """
+    Generate TTS audio using Azure Speech Services REST API with better error handling
+    """
+    print(f"[DEBUG] Generating TTS for: {text[:50]}... -> {output_file}")
+    
+    try:
+        # Ask for the final format directly when the service supports it
+        stage = get_output_stage(output_file, mode=AUDIO_OUTPUT_MODE)
+
+        # Create SSML content
+        ssml_content = build_ssml(text)
         
-        # Make the request
-        response = requests.post(url, headers=headers, data=ssml_content, timeout=30)
+        # Make the request over the pooled, token-authenticated client
+        with tts_synthesis_seconds.time(engine='rest'):
+            response = get_tts_client().synthesize(ssml_content, stage.request_format)
         
         if response.status_code == 200:
-            # Convert WAV to MP3 if needed
-            if output_file.endswith('.mp3'):
-                # Save as WAV first
-                temp_wav = output_file.replace('.mp3', '.wav')
-                with open(temp_wav, 'wb') as f:
-                    f.write(response.content)
-                
-                try:
-                    # Convert to MP3
-                    audio = AudioSegment.from_wav(temp_wav)
-                    audio.export(output_file, format="mp3")
-                    os.remove(temp_wav)  # Clean up temp file
-                except Exception as e:
-                    print(f"[WARNING] Could not convert to MP3: {e}. Saving as WAV.")
-                    os.rename(temp_wav, output_file.replace('.mp3', '.wav'))
-                    return output_file.replace('.mp3', '.wav')
-            else:
-                with open(output_file, 'wb') as f:
-                    f.write(response.content)
+            # Transcoding (if any) is piped through ffmpeg, the final file is written atomically
+            output_file = stage.write(response.content, output_file)
             
             print(f"[SUCCESS] TTS generated successfully: {output_file}")
-            return True
+            return output_file
         else:
             print(f"[ERROR] TTS request failed with status {response.status_code}: {response.text}")
             return False
@@ -99,16 +447,19 @@ def generate_tts(text, output_file):
         traceback.print_exc()
         return False
 
-def generate_tts_fallback(text, output_file):
+def synthesize_tts_sdk(text, output_file):
     """
     Fallback TTS generation using Azure SDK
     """
     print(f"[DEBUG] Using fallback TTS for: {text[:50]}...")
     
     try:
+        # The Speech SDK is large and only needed here, so it is imported on first use
+        from azure.cognitiveservices.speech import SpeechConfig, SpeechSynthesizer, AudioConfig, ResultReason
+        
         # Configure speech synthesis
         speech_config = SpeechConfig(subscription=speech_key, region=speech_region)
-        speech_config.speech_synthesis_voice_name = "en-US-AriaNeural"
+        speech_config.speech_synthesis_voice_name = TTS_VOICE
         
         # Configure audio output to file
         audio_config = AudioConfig(filename=output_file)
@@ -117,12 +468,13 @@ def generate_tts_fallback(text, output_file):
         synthesizer = SpeechSynthesizer(speech_config=speech_config, audio_config=audio_config)
         
         # Generate speech synchronously
-        result = synthesizer.speak_text(text)
+        with tts_synthesis_seconds.time(engine='sdk'):
+            result = synthesizer.speak_text(text)
         
         # Check result
         if result.reason == ResultReason.SynthesizingAudioCompleted:
             print(f"[SUCCESS] Fallback TTS generated successfully: {output_file}")
-            return True
+            return output_file
         else:
             print(f"[ERROR] Fallback TTS failed with reason: {result.reason}")
             return False
@@ -131,85 +483,103 @@ def generate_tts_fallback(text, output_file):
         print(f"[ERROR] Exception in fallback TTS: {str(e)}")
         return False
 
-def get_gemini_response(prompt, max_tokens=500):
+GEMINI_ERROR_RESPONSE = "I apologize, but I'm having trouble generating a response right now. Please try again."
+
+def get_gemini_response(prompt, max_tokens=500, generation_config=None, shared=True):
+    """
+    Get response from Gemini through the LLM gateway with error handling
+
+    shared=False skips coalescing and caching, for prompts that should give
+    a fresh answer every time.
+    """
+    try:
+        with gemini_seconds.time(mode='blocking'):
+            text = llm_gateway.generate(prompt, max_tokens=max_tokens, generation_config=generation_config, shared=shared)
+        gemini_requests.inc(mode='blocking', outcome='success')
+        return text
+    except Exception as e:
+        gemini_requests.inc(mode='blocking', outcome='failure')
+        print(f"[ERROR] Gemini API call failed: {str(e)}")
+        traceback.print_exc()
+        return GEMINI_ERROR_RESPONSE
+
+async def get_gemini_response_async(prompt, max_tokens=500, generation_config=None, shared=True):
     """
-    Get response from Gemini with error handling
+    get_gemini_response for the asyncio generation engine
     """
     try:
-        response = gemini_model.generate_content(prompt)
-        return response.text
+        with gemini_seconds.time(mode='async'):
+            text = await llm_gateway.agenerate(prompt, max_tokens=max_tokens, generation_config=generation_config, shared=shared)
+        gemini_requests.inc(mode='async', outcome='success')
+        return text
     except Exception as e:
+        gemini_requests.inc(mode='async', outcome='failure')
         print(f"[ERROR] Gemini API call failed: {str(e)}")
         traceback.print_exc()
-        return "I apologize, but I'm having trouble generating a response right now. Please try again."
+        return GEMINI_ERROR_RESPONSE
+
+def stream_gemini_response(prompt, max_tokens=None):
+    """
+    Stream response text chunks from Gemini as they are generated
+    """
+    try:
+        with gemini_seconds.time(mode='stream'):
+            for text in llm_gateway.stream(prompt, max_tokens=max_tokens):
+                yield text
+        gemini_requests.inc(mode='stream', outcome='success')
+    except Exception as e:
+        gemini_requests.inc(mode='stream', outcome='failure')
+        print(f"[ERROR] Gemini streaming call failed: {str(e)}")
+        traceback.print_exc()
 
 # --- INTRODUCTION AUDIO GENERATION ---
-def ensure_introduction_audios():
+def synthesize_intro_audio(text, filepath):
+    """
+    Synthesize one introduction clip at filepath, falling back to the Azure SDK
     """
-    Generate introduction audios for both Recon AI and user introductions
+    if filepath.endswith('.ogg') and ffmpeg_available():
+        # Derived from the MP3 clip, so every introduction is synthesized once
+        mp3_path = intro_audio.ensure(os.path.splitext(os.path.basename(filepath))[0] + '.mp3')
+        return bool(mp3_path and derive_opus_variant(mp3_path, filepath))
+    written = generate_tts(text, filepath)
+    if not written and filepath.endswith('.ogg'):
+        # The SDK fallback only produces WAV; sessions use the MP3 clip instead
+        return False
+    if not written:
+        print(f"[WARNING] Primary TTS failed for {os.path.basename(filepath)}, trying fallback...")
+        written = generate_tts_fallback(text, filepath)
+    if written and written != filepath:
+        # The fallback produces WAV; keep the clip under its fixed name like before
+        os.replace(written, filepath)
+    return bool(written)
+
+# Shared with audio_generator.py; the manifest tracks which texts/voice each clip was built from
+intro_audio = IntroAudioPrecompute(
+    synthesize_intro_audio,
+    directory=INTRO_DIR,
+    settings=f"{TTS_VOICE}|{TTS_PROSODY_RATE}|{AUDIO_OUTPUT_MODE}",
+    max_workers=INTRO_AUDIO_WORKERS,
+    formats=AUDIO_FORMATS
+)
+
+def ensure_introduction_audios(formats=None):
+    """
+    Generate missing or stale introduction audios in parallel, in every format unless given
     """
     print("[DEBUG] Checking introduction audios...")
-    
-    # Recon AI introductions
-    recon_introductions = [
-        "Welcome to Recon AI, your personal coach for interview success. Think of me as your practice partner, here to boost your confidence, sharpen your skills, and help you shine in every answer. This is your time to take the spotlight.",
-        "Hello and welcome to Recon AI. You're not alone in this, I'm here to support you every step of the way. This is your space to practice, grow, and prepare with confidence. Let's begin on a strong note.",
-        "Welcome to Recon AI, where preparation meets progress. Whether you're just starting out or polishing your skills, I'm here to help you bring out your best. Let's ease into this experience together.",
-        "Hi there, and welcome aboard Recon AI, your smart partner in nailing every interview. Today is about growth, self-belief, and getting one step closer to your goals. You're in the perfect place to begin.",
-        "Hey, and welcome to Recon AI, your space to prepare, practice, and gain confidence. No pressure, no rush, just a relaxed environment focused on you and your journey."
-    ]
-    
-    # User introduction prompts
-    user_introductions = [
-        "To begin, please tell me a little about yourself and what interests you about this opportunity.",
-        "Let's start with you introducing yourself. What's your background and what draws you to this field?",
-        "I'd love to hear about you first. Could you share your background and what excites you about this role?",
-        "Let's kick off with introductions. Tell me about yourself and what motivates you in your career.",
-        "To get us started, please introduce yourself and share what passionate you about this industry."
-    ]
-    
-    # Generate Recon AI introduction audios
-    for i, text in enumerate(recon_introductions, 1):
-        filepath = f"static/audio/introductions/recon_intro_{i}.mp3"
-        if not os.path.exists(filepath):
-            print(f"Generating Recon AI introduction {i}/5...")
-            success = generate_tts(text, filepath)
-            if not success:
-                print(f"[WARNING] Primary TTS failed for Recon intro {i}, trying fallback...")
-                success = generate_tts_fallback(text, filepath)
-                if not success:
-                    print(f"[ERROR] Both TTS methods failed for Recon intro {i}")
-    
-    # Generate user introduction audios
-    for i, text in enumerate(user_introductions, 1):
-        filepath = f"static/audio/introductions/user_intro_{i}.mp3"
-        if not os.path.exists(filepath):
-            print(f"Generating user introduction {i}/5...")
-            success = generate_tts(text, filepath)
-            if not success:
-                print(f"[WARNING] Primary TTS failed for user intro {i}, trying fallback...")
-                success = generate_tts_fallback(text, filepath)
-                if not success:
-                    print(f"[ERROR] Both TTS methods failed for user intro {i}")
-    
-    print("[SUCCESS] Introduction audio generation complete!")
+    built, failed = intro_audio.precompute(formats=formats)
+    if failed:
+        print(f"[WARNING] {len(failed)} introduction audios failed, they will be retried on first use")
+    print(f"[SUCCESS] Introduction audio generation complete! ({len(built)} built)")
 
 # --- BACKGROUND QUESTION GENERATION ---
-def prepare_remaining_questions(session_id, config):
+def build_questions_prompt(config, num_questions, level):
     """
-    Generate remaining questions after the introduction
+    Build the Gemini prompt for the interview question list
     """
-    print(f"[DEBUG] Preparing remaining questions for session {session_id}")
-    
-    try:
-        session_data = sessions[session_id]
-        num_questions = int(config.get('num_questions', '5'))
-        level = config.get('level', 'mid')
-        
-        # Create appropriate prompt based on config
-        if 'skills' in config and config['skills']:
-            skills_str = ", ".join(config['skills'])
-            prompt = f"""Generate {num_questions} technical interview questions focusing on: {skills_str}
+    if 'skills' in config and config['skills']:
+        skills_str = ", ".join(config['skills'])
+        return f"""Generate {num_questions} technical interview questions focusing on: {skills_str}
             
             Requirements:
             - Questions should be appropriate for {level} level candidates
@@ -218,10 +588,10 @@ def prepare_remaining_questions(session_id, config):
             - Each question on a new line
             - Focus on problem-solving and practical application
             """
-        elif 'company' in config and config['company']:
-            company = config.get('company', '')
-            role = config.get('role', 'Software Engineer')
-            prompt = f"""Generate {num_questions} interview questions for a {role} position at {company}
+    elif 'company' in config and config['company']:
+        company = config.get('company', '')
+        role = config.get('role', 'Software Engineer')
+        return f"""Generate {num_questions} interview questions for a {role} position at {company}
             
             Requirements:
             - Questions should reflect {company}'s culture and values
@@ -230,8 +600,7 @@ def prepare_remaining_questions(session_id, config):
             - Provide only the questions, numbered 1-{num_questions}
             - Each question on a new line
             """
-        else:
-            prompt = f"""Generate {num_questions} general interview questions for a {level} level candidate
+    return f"""Generate {num_questions} general interview questions for a {level} level candidate
             
             Requirements:
             - Mix of behavioral and problem-solving questions
@@ -239,18 +608,37 @@ def prepare_remaining_questions(session_id, config):
             - Provide only the questions, numbered 1-{num_questions}
             - Each question on a new line
             """
-        
-        print(f"[DEBUG] Sending prompt to Gemini...")
-        questions_response = get_gemini_response(prompt, max_tokens=800)
-        questions_list = [q.strip() for q in questions_response.strip().split('\n') if q.strip()]
-        
-        # Generate questions with answers and audio
-        for i, question_text in enumerate(questions_list[:num_questions], 1):
-            # Clean up question text (remove numbering if present)
-            clean_question = question_text.split('. ', 1)[-1] if '. ' in question_text else question_text
+
+def build_batch_prompt(config, num_questions, level):
+    """
+    Build the Gemini prompt for all questions and model answers as JSON
+    """
+    if 'skills' in config and config['skills']:
+        focus = f"technical interview questions focusing on: {', '.join(config['skills'])}"
+        style = "- Focus on problem-solving and practical application"
+    elif 'company' in config and config['company']:
+        company = config.get('company', '')
+        focus = f"interview questions for a {config.get('role', 'Software Engineer')} position at {company}"
+        style = f"- Questions should reflect {company}'s culture and values\n            - Mix of technical and behavioral questions"
+    else:
+        focus = f"general interview questions for a {level} level candidate"
+        style = "- Mix of behavioral and problem-solving questions"
+
+    return f"""Generate {num_questions} {focus}, each with a concise model answer
             
-            # Generate model answer
-            answer_prompt = f"""Provide a concise model answer for this interview question: "{clean_question}"
+            Requirements:
+            - Questions should be appropriate for {level} level candidates
+            {style}
+            - Each model answer is structured, professional and at most 3-4 sentences
+            - Respond with only a JSON array of exactly {num_questions} objects
+            - Each object has the string fields "question" and "answer"
+            """
+
+def build_answer_prompt(question_text, level):
+    """
+    Build the Gemini prompt for a single model answer
+    """
+    return f"""Provide a concise model answer for this interview question: "{question_text}"
             
             Requirements:
             - Answer should be appropriate for a {level} level candidate
@@ -258,113 +646,631 @@ def prepare_remaining_questions(session_id, config):
             - Include key points that interviewers look for
             - Maximum 3-4 sentences
             """
-            
-            model_answer = get_gemini_response(answer_prompt, max_tokens=300)
-            
-            # Generate audio file
-            audio_file = f"static/audio/session_{session_id}_q_{i}.mp3"
-            print(f"[DEBUG] Generating audio for question {i}: {clean_question[:50]}...")
-            
-            tts_success = generate_tts(clean_question, audio_file)
-            if not tts_success:
-                print(f"[WARNING] Primary TTS failed for question {i}, trying fallback...")
-                tts_success = generate_tts_fallback(clean_question, audio_file)
-            
-            if tts_success:
-                audio_url = f"/{audio_file}"
-            else:
-                audio_url = None
-                print(f"[ERROR] Both TTS methods failed for question {i}")
-            
-            # Add to session
-            session_data['questions'].append({
-                'text': clean_question,
-                'answer': model_answer,
-                'audio_url': audio_url,
-                'index': i
-            })
+
+def generate_model_answer(question_text, level):
+    """
+    Generate a concise model answer for a single question
+    """
+    return get_gemini_response(build_answer_prompt(question_text, level), max_tokens=300)
+
+async def generate_model_answer_async(question_text, level):
+    """
+    generate_model_answer for the asyncio generation engine
+    """
+    return await get_gemini_response_async(build_answer_prompt(question_text, level), max_tokens=300)
+
+def generate_question_audio(session_id, index, question_text):
+    """
+    Generate the audio for a question, returns its URL or None
+    """
+    print(f"[DEBUG] Generating audio for question {index} of session {session_id}: {question_text[:50]}...")
+
+    # Questions can be published before their audio, /audio_stream then follows this synthesis
+    audio_path = generate_streamed_tts(question_text) if AUDIO_STREAMING else generate_tts(question_text)
+    if not audio_path:
+        print(f"[WARNING] Primary TTS failed for question {index}, trying fallback...")
+        audio_path = generate_tts_fallback(question_text)
+
+    if not audio_path:
+        print(f"[ERROR] Both TTS methods failed for question {index}")
+        return None
+    schedule_opus_variant(question_text, audio_path)
+    return f"/{audio_path}"
+
+async def generate_question_audio_async(session_id, index, question_text):
+    """
+    generate_question_audio for the asyncio generation engine, sharing its cache entries
+    """
+    print(f"[DEBUG] Generating audio for question {index} of session {session_id}: {question_text[:50]}...")
+
+    audio_path = await generate_tts_async(question_text, 'mp3')
+    if not audio_path:
+        print(f"[WARNING] Primary TTS failed for question {index}, trying fallback...")
+        audio_path = await asyncio.to_thread(generate_tts_fallback, question_text)
+
+    if not audio_path:
+        print(f"[ERROR] Both TTS methods failed for question {index}")
+        return None
+    schedule_opus_variant(question_text, audio_path)
+    return f"/{audio_path}"
+
+def schedule_opus_variant(text, source_path):
+    """Queue the Opus variant of a question clip, off the path that publishes the question"""
+    if not AUDIO_OPUS:
+        return
+    try:
+        variant_executor.submit(f"opus:{uuid.uuid4().hex}", generate_opus_variant, text, source_path)
+    except QueueFull:
+        print("[WARNING] Audio variant queue full, question is served as MP3 only")
+
+def generate_opus_variant(text, source_path):
+    """
+    Cache the Opus variant of a question clip, returns its path or False
+
+    Transcoded from the synthesized clip, so each question is synthesized
+    once; without ffmpeg Azure synthesizes the variant instead.
+    """
+    if not ffmpeg_available():
+        return generate_tts(text, ext='ogg')
+    path = audio_store.fetch(
+        text, lambda target: derive_opus_variant(source_path, target),
+        voice=TTS_VOICE, rate=TTS_PROSODY_RATE, fmt=f"rest-{AUDIO_OUTPUT_MODE}-ogg", ext='ogg'
+    )
+    return path or False
+
+def derive_opus_variant(source_path, output_file):
+    """Transcode a synthesized clip to Opus at output_file, returns its path or False"""
+    try:
+        return transcode_file(source_path, output_file, 'ogg')
+    except (OSError, TranscodeError) as e:
+        print(f"[WARNING] Could not derive Opus audio from {os.path.basename(source_path)}: {str(e)}")
+        return False
+
+async def generate_tts_async(text, ext):
+    """
+    generate_tts for the asyncio generation engine, returns the cached clip's path or False
+
+    The cache entry is reserved before Azure is called, so /audio_stream and
+    other sessions asking for the same clip wait for this synthesis.
+    """
+    key = audio_store.make_key(text, TTS_VOICE, TTS_PROSODY_RATE, f"rest-{AUDIO_OUTPUT_MODE}-{ext}")
+    with tts_seconds.time(engine='rest_async'):
+        while True:
+            audio_path = await asyncio.to_thread(audio_store.get, key)
+            if audio_path:
+                break
+            # No await between reserving and synthesize_tts_async, which settles the reservation
+            future, owner = audio_store.reserve(key)
+            if owner:
+                audio_path = await synthesize_tts_async(text, key, ext)
+                break
+            try:
+                # Shielded, so cancelling this session leaves the shared synthesis alone
+                audio_path = await asyncio.shield(asyncio.wrap_future(future))
+                break
+            except SynthesisAbandoned:
+                continue
+    tts_requests.inc(engine='rest_async', outcome='success' if audio_path else 'failure')
+    return audio_path or False
+
+async def synthesize_tts_async(text, key, ext):
+    """
+    Synthesize audio over async HTTP into the cache entry reserved for key, returns its path or None
+    """
+    body = None
+    try:
+        stage = get_output_stage(f'question.{ext}', mode=AUDIO_OUTPUT_MODE)
+        async with tts_slots:
+            with tts_synthesis_seconds.time(engine='rest_async'):
+                status, body = await get_tts_client().synthesize_async(build_ssml(text), stage.request_format)
+        if status != 200:
+            print(f"[ERROR] TTS request failed with status {status}")
+            body = None
+    except asyncio.CancelledError:
+        # Waiters retry the synthesis instead of failing with this session
+        audio_store.abandon(key)
+        raise
+    except Exception as e:
+        print(f"[ERROR] Exception in async TTS: {str(e)}")
+        traceback.print_exc()
+        body = None
+
+    # Writing (and transcoding, if any) happens off the event loop; a failure settles waiters with None
+    return await asyncio.to_thread(
+        audio_store.complete, key, ext, lambda target: body is not None and stage.write(body, target)
+    )
+
+def sample_banked_questions(bank_key, num_questions):
+    """
+    Draw a session's questions from the bank when its config is warm, else an empty list
+    """
+    if not question_bank or question_bank.count(bank_key) < max(QUESTION_BANK_WARM_SIZE, num_questions):
+        return []
+    
+    items = question_bank.sample(bank_key, num_questions)
+    print(f"[DEBUG] Serving {len(items)} questions from the bank for {bank_key}")
+    for item in items:
+        item['audio_url'] = f"/{item['audio_path']}" if item['audio_path'] else None
+    return items
+
+def submit_banked_questions(pipeline, bank_key, num_questions):
+    """
+    Serve a session from the question bank when its config is warm, returns how many were submitted
+    """
+    submitted = 0
+    for item in sample_banked_questions(bank_key, num_questions):
+        if pipeline.submit(item['question'], answer=item['answer'], audio_url=item['audio_url']) is None:
+            break
+        submitted += 1
+    return submitted
+
+def submit_batched_questions(pipeline, config, num_questions, level):
+    """
+    Request all questions and answers in one structured call, returns how many were submitted
+    """
+    prompt = build_batch_prompt(config, num_questions, level)
+    response = pipeline.run(get_gemini_response, prompt, max_tokens=300 * num_questions,
+                            generation_config={'response_mime_type': 'application/json'}, shared=False)
+    items = parse_question_batch(response, num_questions)
+
+    missing_answers = sum(1 for item in items if not item['answer'])
+    print(f"[DEBUG] Batched response: {len(items)}/{num_questions} questions, {missing_answers} answers missing")
+    submitted = 0
+    for item in items:
+        if pipeline.submit(item['question'], answer=item['answer']) is None:
+            break
+        submitted += 1
+    return submitted
+
+def submit_listed_questions(pipeline, prompt, limit):
+    """
+    Request a numbered question list and submit each question, returns how many were submitted
+
+    Questions the pipeline already has, e.g. from a partial batch, are skipped.
+    """
+    submitted = 0
+    seen = {normalize_question(text) for text in pipeline.texts}
+    if QUESTION_GENERATION_MODE != 'single':
+        # Leaving the loop after a cancel closes the stream
+        questions = iter_numbered_questions(stream_gemini_response(prompt, max_tokens=800))
+        for clean_question in itertools.islice(unique_questions(questions, seen), limit):
+            if pipeline.submit(clean_question) is None:
+                return submitted
+            submitted += 1
+
+    if submitted == 0:
+        questions_response = pipeline.run(get_gemini_response, prompt, max_tokens=800, shared=False)
+        questions = iter_numbered_questions([questions_response])
+        for clean_question in itertools.islice(unique_questions(questions, seen), limit):
+            if pipeline.submit(clean_question) is None:
+                break
+            submitted += 1
+    return submitted
+
+def audio_variants(text):
+    """Versioned URLs of a question's cached clips, by format"""
+    variants = {}
+    for ext in AUDIO_FORMATS:
+        path = audio_store.get(AudioStore.make_key(text, TTS_VOICE, TTS_PROSODY_RATE, f"rest-{AUDIO_OUTPUT_MODE}-{ext}"))
+        # A failed transcode leaves WAV under the key, that is not this variant
+        if path and path.endswith(f".{ext}"):
+            variants[ext] = audio_versions.url(path)
+    return variants
+
+def intro_audio_variants(mp3_path, manifest=None):
+    """Versioned URLs of an introduction clip's built formats"""
+    variants = {'mp3': audio_versions.url(mp3_path)}
+    for ext in AUDIO_FORMATS[1:]:
+        filename = f"{os.path.splitext(os.path.basename(mp3_path))[0]}.{ext}"
+        if intro_audio.is_fresh(filename, manifest):
+            variants[ext] = audio_versions.url(intro_audio.path(filename))
+    return variants
+
+def preferred_audio_format():
+    """The client's audio format: ?format= from the player, else the best match for Accept"""
+    requested = request.args.get('format')
+    if requested in AUDIO_FORMATS:
+        return requested
+    # Audio elements send */* in most browsers, which keeps MP3
+    best = request.accept_mimetypes.best_match([AUDIO_MIMETYPES[ext] for ext in AUDIO_FORMATS])
+    return next((ext for ext in AUDIO_FORMATS if AUDIO_MIMETYPES[ext] == best), 'mp3')
+
+def redirect_to_audio(url):
+    response = redirect(url)
+    response.vary.add('Accept')
+    return response
+
+def record_milestone(session_data, milestone):
+    """Time from session creation to a preparation milestone"""
+    session_milestone_seconds.observe(time.time() - session_data['created_at'], milestone=milestone)
+
+def bank_question(bank_key, question):
+    """
+    Grow the bank with a good question once its audio is done
+
+    Questions already banked only get their audio path refreshed, e.g. when
+    the cached clip was evicted and synthesized again.
+    """
+    if not question_bank or not question['answer'] or question['answer'] == GEMINI_ERROR_RESPONSE:
+        return
+    audio_path = question['audio_url'][1:] if question['audio_url'] else None
+    if not question_bank.add(bank_key, question['text'], question['answer'], audio_path) and audio_path:
+        question_bank.set_audio(bank_key, question['text'], audio_path)
+
+def publish_question(session_id, question):
+    """
+    Append a prepared question to its session and announce it, returns False if the session is gone
+    """
+    audio_path = question['audio_url'][1:] if question['audio_url'] else None
+    if audio_path:
+        question['audio_url'] = audio_versions.url(audio_path)
+        question['audio_variants'] = audio_variants(question['text'])
+    elif AUDIO_STREAMING:
+        # Audio is relayed while it is synthesized, or redirected to the cached clip once done
+        question['audio_url'] = f"/audio_stream/{session_id}/{question['index']}"
+    session_data = sessions.update(session_id, lambda data: data['questions'].append(question))
+    if session_data is None:
+        return False
+    record_milestone(session_data, f"question_{question['index']}")
+    event_bus.publish(session_id, 'question_ready', {'index': question['index'], 'question': question})
+    return True
+
+def finish_question_generation(session_id):
+    """
+    Mark a session's questions as all ready, returns False if the session is gone
+    """
+    session_data = sessions.set_fields(session_id, status='all_questions_ready')
+    if session_data is None:
+        return False
+    record_milestone(session_data, 'all_questions_ready')
+    event_bus.publish(session_id, 'all_questions_ready', {'questions_ready': len(session_data['questions'])})
+    print(f"[SUCCESS] Generated {len(session_data['questions'])} questions for session {session_id}")
+    return True
+
+def fail_question_generation(session_id, e):
+    """Mark a session whose question generation failed"""
+    print(f"[ERROR] Failed to prepare questions: {str(e)}")
+    # Also called from a worker thread, where e is no longer being handled
+    traceback.print_exception(type(e), e, e.__traceback__)
+    if sessions.set_fields(session_id, status='error') is not None:
+        event_bus.publish(session_id, 'error', {'message': str(e)})
+
+def account_cancelled_generation(session_id, token):
+    """Log the work a cancelled generation job finished anyway, wasted for speculative sessions"""
+    seconds = time.time() - token.cancelled_at
+    print(f"[DEBUG] Stopped question generation for session {session_id} "
+          f"({token.reason}, {token.late_work} calls finished after the cancel)")
+    if token.reason == 'speculation':
+        speculation_tracker.record_late_waste(token.late_work, seconds)
+
+def prepare_remaining_questions(session_id, config, token):
+    """
+    Generate remaining questions after the introduction
+
+    Stops starting new Gemini and TTS work once the token is cancelled
+    (the session was removed).
+    """
+    print(f"[DEBUG] Preparing remaining questions for session {session_id}")
+    if session_id not in sessions:
+        # Removed while queued, e.g. a cancelled speculative session
+        return
+    
+    try:
+        num_questions = int(config.get('num_questions', '5'))
+        level = config.get('level', 'mid')
+        bank_key = normalize_config(config)
+
+        def on_ready(question):
+            if not publish_question(session_id, question):
+                # Removed, possibly by another worker
+                token.cancel('removed')
+
+        # Answers and audio for different questions are generated concurrently,
+        # questions are still appended to the session in order
+        pipeline = QuestionPipeline(
+            answer_fn=lambda text: generate_model_answer(text, level),
+            audio_fn=lambda index, text: generate_question_audio(session_id, index, text),
+            on_ready=on_ready,
+            max_workers=QUESTION_PREP_WORKERS,
+            wait_for_audio=not AUDIO_STREAMING,
+            # Streamed questions are published before their audio exists, so they are banked later
+            on_complete=lambda question: bank_question(bank_key, question),
+            token=token
+        )
+        try:
+            # Warm configs are served entirely from the question bank
+            submitted = submit_banked_questions(pipeline, bank_key, num_questions)
+            if not submitted:
+                print("[DEBUG] Sending prompt to Gemini...")
+                if QUESTION_GENERATION_MODE == 'batch':
+                    submitted = submit_batched_questions(pipeline, config, num_questions, level)
+
+            # Only the questions missing from a partial batch are requested again
+            if submitted < num_questions and not token.cancelled():
+                prompt = build_questions_prompt(config, num_questions - submitted, level)
+                submit_listed_questions(pipeline, prompt, num_questions - submitted)
+            pipeline.wait()
+        finally:
+            pipeline.shutdown()
         
-        session_data['status'] = 'all_questions_ready'
-        print(f"[SUCCESS] Generated {len(session_data['questions'])} questions for session {session_id}")
+        if token.cancelled():
+            account_cancelled_generation(session_id, token)
+            return
+        finish_question_generation(session_id)
         
+    except JobCancelled:
+        account_cancelled_generation(session_id, token)
     except Exception as e:
-        print(f"[ERROR] Failed to prepare questions: {str(e)}")
-        traceback.print_exc()
-        if session_id in sessions:
-            sessions[session_id]['status'] = 'error'
+        fail_question_generation(session_id, e)
+
+async def prepare_remaining_questions_async(session_id, config, token):
+    """
+    Generate remaining questions after the introduction on the asyncio engine
+
+    Answers and audio for every question run as tasks on the engine's loop,
+    questions are still published in order. Cancelling the job (e.g. when the
+    session expires) cancels all of them.
+    """
+    print(f"[DEBUG] Preparing remaining questions for session {session_id}")
+    if not await asyncio.to_thread(sessions.exists, session_id):
+        return
+
+    tasks = []
+    try:
+        num_questions = int(config.get('num_questions', '5'))
+        level = config.get('level', 'mid')
+        bank_key = normalize_config(config)
+
+        # Warm configs are served entirely from the question bank
+        items = await asyncio.to_thread(sample_banked_questions, bank_key, num_questions)
+        if not items:
+            print("[DEBUG] Sending prompt to Gemini...")
+            if QUESTION_GENERATION_MODE == 'batch':
+                response = await get_gemini_response_async(
+                    build_batch_prompt(config, num_questions, level), max_tokens=300 * num_questions,
+                    generation_config={'response_mime_type': 'application/json'}, shared=False
+                )
+                items = [dict(item, audio_url=None) for item in parse_question_batch(response, num_questions)]
+
+        # Only the questions missing from a partial batch are requested again;
+        # the question list is not streamed here, the batch is the fast path
+        missing = num_questions - len(items)
+        if missing > 0:
+            response = await get_gemini_response_async(build_questions_prompt(config, missing, level),
+                                                       max_tokens=800, shared=False)
+            # A re-request may repeat questions of the partial batch
+            seen = {normalize_question(item['question']) for item in items}
+            questions = unique_questions(iter_numbered_questions([response]), seen)
+            items += [{'question': text, 'answer': None, 'audio_url': None}
+                      for text in itertools.islice(questions, missing)]
+
+        for index, item in enumerate(items, start=1):
+            if not item['answer']:
+                item['answer_task'] = asyncio.create_task(generate_model_answer_async(item['question'], level))
+                tasks.append(item['answer_task'])
+            if not item['audio_url']:
+                item['audio_task'] = asyncio.create_task(generate_question_audio_async(session_id, index, item['question']))
+                tasks.append(item['audio_task'])
+
+        completed = []
+        for index, item in enumerate(items, start=1):
+            answer = item['answer'] or await item['answer_task']
+            audio_url = item['audio_url']
+            audio_task = item.get('audio_task')
+            if audio_task and (audio_task.done() or not AUDIO_STREAMING):
+                audio_url = await audio_task
+            question = {'text': item['question'], 'answer': answer, 'audio_url': audio_url, 'index': index}
+            completed.append(dict(question))
+            # Session stores may block (SQLite, Redis), keep them off the loop
+            if not await asyncio.to_thread(publish_question, session_id, question):
+                # Removed, possibly by another worker; the finally block cancels the rest
+                token.cancel('removed')
+                account_cancelled_generation(session_id, token)
+                return
+
+        # Streamed audio keeps warming the cache after its question is published;
+        # questions are banked once their audio is done
+        await asyncio.gather(*tasks)
+        for question, item in zip(completed, items):
+            if item.get('audio_task'):
+                question['audio_url'] = item['audio_task'].result()
+            await asyncio.to_thread(bank_question, bank_key, question)
+        await asyncio.to_thread(finish_question_generation, session_id)
+
+    except asyncio.CancelledError:
+        if token.cancelled():
+            # Calls in flight were already sent and are thrown away, like the
+            # units the threads pipeline counts as finishing after a cancel
+            token.record_late_work(sum(1 for task in tasks if not task.done() or task.cancelled()))
+            account_cancelled_generation(session_id, token)
+        raise
+    except Exception as e:
+        await asyncio.to_thread(fail_question_generation, session_id, e)
+    finally:
+        for task in tasks:
+            task.cancel()
 
 def prepare_introduction_question(session_id, config):
     """
-    Prepare the introduction question and start background generation
+    Prepare the introduction question from the pre-generated clips
     """
     print(f"[DEBUG] Preparing introduction question for session {session_id}")
     
     try:
-        session_data = sessions[session_id]
-        
         # Select random introduction texts
-        recon_intro_num = random.randint(1, 5)
-        user_intro_num = random.randint(1, 5)
-        
-        recon_audio_path = f"static/audio/introductions/recon_intro_{recon_intro_num}.mp3"
-        user_audio_path = f"static/audio/introductions/user_intro_{user_intro_num}.mp3"
-        
-        # Check if files exist, fallback to first one if not
-        if not os.path.exists(recon_audio_path):
-            print(f"[WARNING] Recon intro audio not found: {recon_audio_path}")
-            recon_audio_path = "static/audio/introductions/recon_intro_1.mp3"
-        
-        if not os.path.exists(user_audio_path):
-            print(f"[WARNING] User intro audio not found: {user_audio_path}")
-            user_audio_path = "static/audio/introductions/user_intro_1.mp3"
-        
-        # Get the corresponding text for user introduction
-        user_intro_texts = [
-            "To begin, please tell me a little about yourself and what interests you about this opportunity.",
-            "Let's start with you introducing yourself. What's your background and what draws you to this field?",
-            "I'd love to hear about you first. Could you share your background and what excites you about this role?",
-            "Let's kick off with introductions. Tell me about yourself and what motivates you in your career.",
-            "To get us started, please introduce yourself and share what passionate you about this industry."
-        ]
+        recon_intro_num = random.randint(1, len(RECON_INTRODUCTIONS))
+        user_intro_num = random.randint(1, len(USER_INTRODUCTIONS))
         
-        # Set up the introduction question
-        session_data['recon_intro_audio'] = f"/{recon_audio_path}"
-        session_data['intro_question'] = {
-            'text': user_intro_texts[user_intro_num - 1],
-            'audio_url': f"/{user_audio_path}",
-            'index': 0
-        }
+        # Clips are synthesized on first use when startup skipped them (INTRO_AUDIO_MODE=lazy).
+        # One manifest for every check below; it only changes when a clip is built.
+        manifest = intro_audio.load_manifest()
+        recon_audio_path = intro_audio.ensure(f"recon_intro_{recon_intro_num}.mp3", manifest)
+        user_audio_path = intro_audio.ensure(f"user_intro_{user_intro_num}.mp3", manifest)
+        
+        # Fallback to the first clip if synthesis failed
+        if not recon_audio_path:
+            print(f"[WARNING] Recon intro audio not available: recon_intro_{recon_intro_num}.mp3")
+            recon_audio_path = intro_audio.path("recon_intro_1.mp3")
         
-        session_data['status'] = 'intro_ready'
+        if not user_audio_path:
+            print(f"[WARNING] User intro audio not available: user_intro_{user_intro_num}.mp3")
+            user_intro_num = 1
+            user_audio_path = intro_audio.path("user_intro_1.mp3")
         
-        # Start background generation of remaining questions
-        threading.Thread(target=prepare_remaining_questions, args=(session_id, config), daemon=True).start()
+        # Set up the introduction question
+        session_data = sessions.set_fields(
+            session_id,
+            recon_intro_audio=audio_versions.url(recon_audio_path),
+            recon_intro_audio_variants=intro_audio_variants(recon_audio_path, manifest),
+            intro_question={
+                'text': USER_INTRODUCTIONS[user_intro_num - 1],
+                'audio_url': audio_versions.url(user_audio_path),
+                'audio_variants': intro_audio_variants(user_audio_path, manifest),
+                'index': 0
+            },
+            status='intro_ready'
+        )
+        if session_data is None:
+            print(f"[WARNING] Session {session_id} was removed during preparation")
+            return
+        record_milestone(session_data, 'intro_ready')
+        event_bus.publish(session_id, 'intro_ready', {
+            'recon_intro_audio': session_data['recon_intro_audio'],
+            'recon_intro_audio_variants': session_data['recon_intro_audio_variants'],
+            'intro_question': session_data['intro_question']
+        })
         
         print(f"[SUCCESS] Introduction ready for session {session_id}")
         
     except Exception as e:
         print(f"[ERROR] Failed to prepare introduction: {str(e)}")
         traceback.print_exc()
-        if session_id in sessions:
-            sessions[session_id]['status'] = 'error'
+        if sessions.set_fields(session_id, status='error') is not None:
+            event_bus.publish(session_id, 'error', {'message': str(e)})
 
 # --- ROUTES ---
-@app.route('/')
+@bp.before_request
+def track_session_activity():
+    """Any request for a session keeps it alive"""
+    g.request_started = time.perf_counter()
+    session_id = (request.view_args or {}).get('session_id')
+    if session_id and (session_id in session_expiry or session_id in sessions):
+        touch_session(session_id)
+
+@bp.after_request
+def record_route_timing(response):
+    """Per-route latency and status counts; streamed bodies are timed until the response starts"""
+    started = g.get('request_started')
+    if started is not None:
+        route_seconds.observe(time.perf_counter() - started, endpoint=request.endpoint, method=request.method)
+    route_responses.inc(endpoint=request.endpoint, method=request.method, status=response.status_code)
+    return response
+
+@bp.route('/')
 def home():
     """Renders the main choice page."""
     return render_template('index.html')
 
-@app.route('/setup/skill')
+@bp.route('/setup/skill')
 def setup_skill():
     """Renders the skill-based setup page."""
     return render_template('setup_skill.html')
 
-@app.route('/setup/company')
+@bp.route('/setup/company')
 def setup_company():
     """Renders the company-based setup page."""
     return render_template('setup_company.html')
 
-@app.route('/prepare_session', methods=['POST'])
+def touch_session(session_id, ttl=None):
+    """Keep a session alive in this worker's expiry heap and, when due, in the shared store"""
+    if session_expiry.touch(session_id, ttl=ttl):
+        sessions.touch(session_id, ttl=ttl)
+
+def start_session(config, speculative=False):
+    """
+    Create a session, prepare its introduction and queue question generation
+
+    Returns (session_id, queue_position). Raises QueueFull, after removing
+    the session again, when the generation queue is saturated.
+    """
+    session_id = str(uuid.uuid4())
+    total_questions = int(config.get('num_questions', 5)) + 1  # +1 for introduction
+    
+    session_data = {
+        'config': config,
+        'status': 'initializing',
+        'questions': [],
+        'user_answers': {},
+        'total_questions': total_questions,
+        'created_at': time.time()
+    }
+    if speculative:
+        session_data.update(speculative=True, speculation_key=speculation_key(config))
+    sessions.create(session_id, session_data)
+    # Unclaimed speculative sessions expire quickly
+    touch_session(session_id, ttl=SPECULATION_TTL_SECONDS if speculative else session_expiry.ttl)
+    
+    # The introduction uses pre-generated clips, so it is ready right away
+    prepare_introduction_question(session_id, config)
+    
+    # Admission control: question generation runs on the bounded executor or the asyncio engine
+    prepare = prepare_remaining_questions_async if GENERATION_ENGINE == 'asyncio' else prepare_remaining_questions
+    # Removing the session cancels the token, which stops the job from starting more work
+    token = CancellationToken()
+    try:
+        queue_position = generation_executor.submit(session_id, prepare, session_id, config, token, token=token)
+    except QueueFull:
+        sessions.delete(session_id)
+        event_bus.discard(session_id)
+        session_expiry.forget(session_id)
+        raise
+    return session_id, queue_position
+
+def claim_speculation(speculation_id, config):
+    """
+    Turn a speculative session into the real one if it was prepared for an
+    equivalent config, returns its session id or None
+    """
+    key = speculation_key(config)
+    claimed = {}
+    
+    def claim(data):
+        if data.get('speculative') and data.get('speculation_key') == key and data['status'] not in ('error', 'cancelled'):
+            data['speculative'] = False
+            data['config'] = config
+            claimed['created_at'] = data['created_at']
+    if sessions.update(speculation_id, claim) is None:
+        return None
+    if not claimed:
+        cancel_speculation(speculation_id, 'mismatch')
+        return None
+    
+    touch_session(speculation_id, ttl=session_expiry.ttl)
+    speculation_tracker.record_claim(time.time() - claimed['created_at'])
+    print(f"[DEBUG] Claimed speculative session {speculation_id}")
+    return speculation_id
+
+def cancel_speculation(speculation_id, reason):
+    """Throw away a speculative session that was not claimed, accounting for the wasted work"""
+    cancelled = {}
+    
+    def cancel(data):
+        if data.get('speculative') and data['status'] != 'cancelled':
+            data['status'] = 'cancelled'
+            cancelled['questions'] = len(data.get('questions', []))
+            cancelled['seconds'] = time.time() - data['created_at']
+    sessions.update(speculation_id, cancel)
+    if not cancelled:
+        # Already claimed, cancelled or gone
+        return False
+    
+    speculation_tracker.record_waste(reason, cancelled['questions'], cancelled['seconds'])
+    session_expiry.forget(speculation_id)
+    remove_session(speculation_id, reason='speculation')
+    print(f"[DEBUG] Cancelled speculative session {speculation_id} ({reason}, {cancelled['questions']} questions wasted)")
+    return True
+
+@bp.route('/prepare_session', methods=['POST'])
 def prepare_session():
     """
     Prepares an interview session with improved flow
@@ -373,25 +1279,35 @@ def prepare_session():
         config = request.json
         print(f"[DEBUG] Received config: {config}")
         
-        session_id = str(uuid.uuid4())
-        total_questions = int(config.get('num_questions', 5)) + 1  # +1 for introduction
-        
-        sessions[session_id] = {
-            'config': config,
-            'status': 'initializing',
-            'questions': [],
-            'user_answers': {},
-            'total_questions': total_questions,
-            'created_at': time.time()
-        }
+        # A session speculatively prepared from the setup page is used if it matches
+        speculation_id = config.pop('speculation_id', None)
+        session_id = claim_speculation(speculation_id, config) if speculation_id else None
+        if session_id:
+            return jsonify({
+                'session_id': session_id,
+                'num_questions': int(config.get('num_questions', 5)) + 1,
+                'status': 'preparing',
+                'queue_position': generation_executor.position(session_id),
+                'speculative': True,
+                'message': 'Session was prepared while you were choosing'
+            })
         
-        # Start preparation of introduction question
-        threading.Thread(target=prepare_introduction_question, args=(session_id, config), daemon=True).start()
+        try:
+            session_id, queue_position = start_session(config)
+        except QueueFull as e:
+            print(f"[WARNING] Generation queue full, rejecting session (retry after {e.retry_after}s)")
+            response = jsonify({
+                'error': 'All interviewers are busy right now. Please try again shortly.',
+                'retry_after': e.retry_after
+            })
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, 503
         
         return jsonify({
             'session_id': session_id,
-            'num_questions': total_questions,
+            'num_questions': int(config.get('num_questions', 5)) + 1,
             'status': 'preparing',
+            'queue_position': queue_position,
             'message': 'Session is being prepared with introduction'
         })
         
@@ -400,35 +1316,141 @@ def prepare_session():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
-@app.route('/session_status/<session_id>')
+@bp.route('/speculate_session', methods=['POST'])
+def speculate_session():
+    """
+    Start preparing a provisional session while the setup form is being filled in
+    
+    Only uses idle generation capacity; real sessions are never queued behind speculation.
+    """
+    try:
+        config = request.json or {}
+        if not config.get('skills') and not (config.get('company') and config.get('role')):
+            return jsonify({'error': 'Incomplete config'}), 400
+        
+        if generation_executor.idle_workers() <= SPECULATION_RESERVED_WORKERS:
+            speculation_tracker.record_skip()
+            return jsonify({'status': 'skipped'})
+        
+        try:
+            speculation_id, _ = start_session(config, speculative=True)
+        except QueueFull:
+            speculation_tracker.record_skip()
+            return jsonify({'status': 'skipped'})
+        
+        speculation_tracker.record_start()
+        print(f"[DEBUG] Speculatively preparing session {speculation_id} for {speculation_key(config)}")
+        return jsonify({'status': 'preparing', 'speculation_id': speculation_id})
+        
+    except Exception as e:
+        print(f"[ERROR] Failed to start speculative session: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/speculate_session/<speculation_id>/cancel', methods=['POST'])
+def cancel_speculative_session(speculation_id):
+    """Cancel a speculative session whose config changed or whose page was left"""
+    return jsonify({'cancelled': cancel_speculation(speculation_id, 'abandoned')})
+
+@bp.route('/session_status/<session_id>')
 def session_status(session_id):
     """Enhanced session status with introduction info"""
-    if session_id not in sessions:
+    session_data = sessions.get(session_id)
+    if session_data is None:
         return jsonify({'status': 'not_found'}), 404
     
-    session_data = sessions[session_id]
-    
     if session_data['status'] == 'intro_ready':
         return jsonify({
             'status': 'intro_ready',
             'recon_intro_audio': session_data.get('recon_intro_audio'),
+            'recon_intro_audio_variants': session_data.get('recon_intro_audio_variants'),
             'intro_question': session_data.get('intro_question'),
-            'questions_ready': len(session_data.get('questions', []))
+            'questions_ready': len(session_data.get('questions', [])),
+            'queue_position': generation_executor.position(session_id)
         })
     
     return jsonify({
         'status': session_data['status'],
-        'questions_ready': len(session_data.get('questions', []))
+        'questions_ready': len(session_data.get('questions', [])),
+        'queue_position': generation_executor.position(session_id)
+    })
+
+@bp.route('/generation_stats')
+def generation_stats():
+    """Generation and transcription queue lengths, wait times and admission counters"""
+    stats = generation_executor.stats()
+    stats['transcription'] = transcription_executor.stats()
+    stats['reports'] = report_executor.stats()
+    stats['audio_variants'] = variant_executor.stats()
+    stats['feedback_cache'] = feedback_cache.stats()
+    stats['speculation'] = speculation_tracker.stats()
+    stats['llm'] = llm_gateway.stats()
+    return jsonify(stats)
+
+@bp.route('/metrics')
+def metrics():
+    """Latency histograms and outcome counters in Prometheus text format"""
+    for name, executor in (('generation', generation_executor), ('transcription', transcription_executor),
+                           ('reports', report_executor), ('audio_variants', variant_executor)):
+        stats = executor.stats()
+        executor_jobs.set(stats['running'], executor=name, state='running')
+        executor_jobs.set(stats['queued'], executor=name, state='queued')
+    executor_jobs.set(llm_gateway.stats()['in_flight'], executor='llm', state='running')
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@bp.route('/session_events/<session_id>')
+def session_events(session_id):
+    """Server-Sent Events stream of session preparation progress"""
+    if session_id not in sessions:
+        return jsonify({'status': 'not_found'}), 404
+    if not SSE_ENABLED:
+        # EventSource does not reconnect after a 204, the client falls back to long polling
+        return '', 204
+    
+    last_id = request.headers.get('Last-Event-ID', type=int) or request.args.get('after', 0, type=int)
+    
+    def stream():
+        event_id = last_id
+        yield "retry: 2000\n\n"
+        while True:
+            events = event_bus.wait(session_id, event_id, timeout=SSE_HEARTBEAT_SECONDS)
+            if not events:
+                if session_id not in sessions or event_bus.is_finished(session_id):
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                event_id = event['id']
+                yield format_sse(event)
+            if events[-1]['event'] in TERMINAL_EVENTS:
+                return
+    
+    return Response(stream_with_context(stream()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
     })
 
-@app.route('/get_question/<session_id>/<int:index>')
+@bp.route('/session_events/<session_id>/poll')
+def poll_session_events(session_id):
+    """Long-poll variant of the session event stream"""
+    if session_id not in sessions:
+        return jsonify({'status': 'not_found'}), 404
+    
+    after = request.args.get('after', 0, type=int)
+    timeout = min(request.args.get('timeout', 25, type=float), 25)
+    events = event_bus.wait(session_id, after, timeout=timeout)
+    return jsonify({
+        'events': events,
+        'finished': event_bus.is_finished(session_id)
+    })
+
+@bp.route('/get_question/<session_id>/<int:index>')
 def get_question(session_id, index):
     """Get specific question by index"""
-    if session_id not in sessions:
+    session_data = sessions.get(session_id)
+    if session_data is None:
         return jsonify({'error': 'Session not found'}), 404
     
-    session_data = sessions[session_id]
-    
     if index == 0:
         # Return introduction question
         intro_question = session_data.get('intro_question')
@@ -446,14 +1468,136 @@ def get_question(session_id, index):
     
     return jsonify(session_data['questions'][actual_index])
 
-@app.route('/interview/<session_id>')
+@bp.route('/get_questions/<session_id>')
+def get_questions(session_id):
+    """
+    Every question that is ready from ?from= onward, for the page to prefetch
+
+    `preload` (mirrored in a Link header) is the audio of the first returned
+    question in the client's format, so its download can start early.
+    """
+    session_data = sessions.get(session_id)
+    if session_data is None:
+        return jsonify({'error': 'Session not found'}), 404
+    
+    start = max(0, request.args.get('from', 0, type=int))
+    questions = []
+    if start == 0 and session_data.get('intro_question'):
+        questions.append(session_data['intro_question'])
+    questions.extend(session_data['questions'][max(0, start - 1):])
+    
+    audio_format = preferred_audio_format()
+    preload = [question_audio_source(question, audio_format) for question in questions[:1] if question.get('audio_url')]
+    response = jsonify({
+        'questions': questions,
+        'from': start,
+        'total_questions': session_data['total_questions'],
+        'all_questions_ready': session_data['status'] == 'all_questions_ready',
+        'preload': preload
+    })
+    if preload:
+        response.headers['Link'] = ', '.join(f'<{url}>; rel=preload; as=audio' for url in preload)
+    # Readiness changes from one call to the next
+    response.cache_control.no_store = True
+    return response
+
+def question_audio_source(question, audio_format):
+    """The audio URL interview.js plays for a question in a format (see audioSource there)"""
+    variants = question.get('audio_variants') or {}
+    if audio_format in variants:
+        return variants[audio_format]
+    if question['audio_url'].startswith('/audio_stream/'):
+        return f"{question['audio_url']}?format={audio_format}"
+    return question['audio_url']
+
+@bp.route('/audio_stream/<session_id>/<int:index>')
+def audio_stream(session_id, index):
+    """
+    Stream a question's audio while it is synthesized, or redirect to the cached clip
+
+    Cached clips are negotiated: Opus for clients that ask for it, else MP3.
+    Audio that is still being synthesized is relayed as MP3.
+    """
+    session_data = sessions.get(session_id)
+    if session_data is None:
+        return jsonify({'error': 'Session not found'}), 404
+    audio_format = preferred_audio_format()
+    
+    if index == 0:
+        # Introduction clips are pre-generated static files
+        intro_question = session_data.get('intro_question')
+        if not intro_question:
+            return jsonify({'status': 'not_ready'}), 202
+        variants = intro_question.get('audio_variants') or {}
+        return redirect_to_audio(variants.get(audio_format) or intro_question['audio_url'])
+    
+    questions = session_data.get('questions', [])
+    if index - 1 >= len(questions):
+        return jsonify({'error': 'Question not ready'}), 404
+    text = questions[index - 1]['text']
+    
+    # Replays and questions whose audio was pre-generated go to the cacheable URL
+    variants = audio_variants(text)
+    if audio_format in variants:
+        return redirect_to_audio(variants[audio_format])
+    cached = audio_store.get(AudioStore.make_key(text, TTS_VOICE, TTS_PROSODY_RATE, STREAM_AUDIO_FORMAT))
+    if cached:
+        return redirect_to_audio(audio_versions.url(cached))
+    
+    chunks = stream_tts(text)
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        print(f"[WARNING] Streaming TTS failed for question {index}, trying fallback...")
+        audio_path = generate_tts_fallback(text)
+        if not audio_path:
+            return jsonify({'error': 'Audio not available'}), 404
+        return redirect(audio_versions.url(audio_path))
+    
+    return Response(
+        stream_with_context(itertools.chain([first_chunk], chunks)),
+        mimetype='audio/mpeg',
+        direct_passthrough=True
+    )
+
+@bp.route('/audio/v/<version>/<root>/<path:filename>')
+def versioned_audio(version, root, filename):
+    """
+    Serve a clip from its content-versioned URL, cacheable forever
+
+    send_file answers If-None-Match/If-Modified-Since and Range requests;
+    with AUDIO_OFFLOAD the proxy sends the bytes instead of the worker.
+    """
+    path = audio_versions.resolve(root, filename)
+    if path is None:
+        return jsonify({'error': 'Audio not found'}), 404
+
+    current = audio_versions.version(path)
+    if version != current:
+        # The clip was rebuilt since this URL was handed out
+        response = redirect(audio_versions.url(path))
+        response.cache_control.no_store = True
+        return response
+
+    if AUDIO_OFFLOAD == 'nginx':
+        response = Response(mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = f"{AUDIO_ACCEL_PREFIX}/{root}/{filename}"
+        response.set_etag(current)
+        response.make_conditional(request)
+    else:
+        response = send_file(path, conditional=True, etag=current, max_age=AUDIO_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.max_age = AUDIO_MAX_AGE
+    response.cache_control.immutable = True
+    return response
+
+@bp.route('/interview/<session_id>')
 def interview_session(session_id):
     """Render interview session page"""
     if session_id not in sessions:
-        return redirect(url_for('home'))
+        return redirect(url_for('main.home'))
     return render_template('interview.html', session_id=session_id)
 
-@app.route('/interview_session/<session_id>/submit_answer', methods=['POST'])
+@bp.route('/interview_session/<session_id>/submit_answer', methods=['POST'])
 def submit_answer(session_id):
     """Handle user answer submission"""
     try:
@@ -464,13 +1608,19 @@ def submit_answer(session_id):
         audio_file = request.files.get('audio')
         
         if audio_file:
-            filename = f"user_answer_{session_id}_q_{q_index}.webm"
-            filepath = os.path.join('static', 'user_answers', filename)
+            answers_dir = session_dir(SESSION_DATA_DIR, session_id, 'answers')
+            os.makedirs(answers_dir, exist_ok=True)
+            filepath = os.path.join(answers_dir, f"q_{q_index}.webm")
+            previous_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
             audio_file.save(filepath)
+            sessions.add_usage(session_id, os.path.getsize(filepath) - previous_size)
             
-            if 'user_answers' not in sessions[session_id]:
-                sessions[session_id]['user_answers'] = {}
-            sessions[session_id]['user_answers'][q_index] = {'audio_path': filepath}
+            def record_answer(data):
+                data.setdefault('user_answers', {})[str(q_index)] = {'audio_path': filepath}
+            session_data = sessions.update(session_id, record_answer)
+            enqueue_transcription(session_id, q_index, filepath)
+            if session_data and q_index >= session_data.get('total_questions', 0) - 1:
+                start_report(session_id)
             
             print(f"[DEBUG] Saved user answer for question {q_index} in session {session_id}")
         
@@ -480,34 +1630,175 @@ def submit_answer(session_id):
         print(f"[ERROR] Failed to submit answer: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/report/<session_id>')
-def generate_report(session_id):
-    """Generate evaluation report using Gemini"""
+def answer_upload_paths(session_id, q_index):
+    """Final and in-progress paths of an answer recording"""
+    answers_dir = session_dir(SESSION_DATA_DIR, session_id, 'answers')
+    filepath = os.path.join(answers_dir, f"q_{q_index}.webm")
+    return answers_dir, filepath, f"{filepath}.part"
+
+def enqueue_transcription(session_id, q_index, audio_path):
+    """Queue a submitted answer for background transcription"""
+    def mark(status):
+        def apply(data):
+            answer = data.get('user_answers', {}).get(str(q_index))
+            if answer is not None:
+                answer['transcript_status'] = status
+        sessions.update(session_id, apply)
+    
+    mark('pending')
     try:
-        if session_id not in sessions:
-            return redirect(url_for('home'))
+        transcription_executor.submit(f"{session_id}:{q_index}", transcribe_answer, session_id, q_index, audio_path)
+    except QueueFull:
+        print(f"[WARNING] Transcription queue full, answer {q_index} of session {session_id} is not transcribed")
+        mark('skipped')
+
+def transcribe_answer(session_id, q_index, audio_path):
+    """
+    Transcribe one answer and store the transcript with the session
+    """
+    print(f"[DEBUG] Transcribing answer {q_index} for session {session_id}")
+    try:
+        transcript = get_stt_engine().transcribe(audio_path)
+        status = 'done'
+    except Exception as e:
+        print(f"[ERROR] Transcription failed for answer {q_index} of session {session_id}: {str(e)}")
+        transcript, status = '', 'failed'
+    
+    def record_transcript(data):
+        answer = data.get('user_answers', {}).get(str(q_index))
+        if answer is not None:
+            answer['transcript'] = transcript
+            answer['transcript_status'] = status
+    if sessions.update(session_id, record_transcript) is None:
+        # Session expired while the answer was being transcribed
+        return
+    
+    if status == 'done':
+        transcripts_dir = session_dir(SESSION_DATA_DIR, session_id, 'transcripts')
+        os.makedirs(transcripts_dir, exist_ok=True)
+        atomic_write(os.path.join(transcripts_dir, f"q_{q_index}.txt"), transcript.encode('utf-8'))
+        sessions.add_usage(session_id, len(transcript.encode('utf-8')))
+        print(f"[SUCCESS] Transcribed answer {q_index} for session {session_id}")
+
+@bp.route('/interview_session/<session_id>/answer_chunk', methods=['POST'])
+def answer_chunk(session_id):
+    """
+    Append one timesliced recording chunk to an answer while it is recorded
+
+    The raw chunk is the request body; question_index and seq (0, 1, ...) are
+    query parameters. Each chunk is written at the offset recorded for its
+    sequence number, so a retried chunk overwrites itself instead of being
+    appended twice. Sequence 0 starts the answer over.
+    """
+    try:
+        session_data = sessions.get(session_id)
+        if session_data is None:
+            return jsonify({'error': 'Invalid session ID'}), 404
         
-        session_data = sessions[session_id]
-        config = session_data['config']
+        q_index = int(request.args.get('question_index'))
+        seq = int(request.args.get('seq'))
+        upload = session_data.get('answer_uploads', {}).get(str(q_index), {'next_seq': 0, 'bytes': 0})
+        if seq == 0:
+            upload = {'next_seq': 0, 'bytes': 0}
         
-        total_questions = len(session_data.get('questions', []))
-        answered_count = len([k for k in session_data.get('user_answers', {}).keys() if k > 0])
+        if seq < upload['next_seq']:
+            # Already stored, the client retried after a lost response
+            return jsonify({'status': 'duplicate', 'next_seq': upload['next_seq']})
+        if seq > upload['next_seq']:
+            return jsonify({'error': 'Chunk out of order', 'next_seq': upload['next_seq']}), 409
         
-        # Create context for feedback
-        if 'skills' in config and config['skills']:
-            topic_str = f"the skills: {', '.join(config['skills'])}"
-        elif 'company' in config and config['company']:
-            topic_str = f"a {config.get('role', 'Software Engineer')} role at {config['company']}"
-        else:
-            topic_str = "general interview skills"
+        answers_dir, _, part_path = answer_upload_paths(session_id, q_index)
+        os.makedirs(answers_dir, exist_ok=True)
+        offset = upload['bytes']
+        # Streamed from the request body straight to disk, never held as a whole upload
+        with open(part_path, 'r+b' if os.path.exists(part_path) else 'wb') as f:
+            previous_size = os.fstat(f.fileno()).st_size
+            f.seek(offset)
+            shutil.copyfileobj(request.stream, f, 64 * 1024)
+            size = f.tell()
+            f.truncate()
+        sessions.add_usage(session_id, size - previous_size)
+        
+        def record_chunk(data):
+            uploads = data.setdefault('answer_uploads', {})
+            current = uploads.get(str(q_index), {'next_seq': 0, 'bytes': 0})
+            if seq == 0 or current['next_seq'] == seq:
+                uploads[str(q_index)] = {'next_seq': seq + 1, 'bytes': size}
+        sessions.update(session_id, record_chunk)
+        
+        return jsonify({'status': 'received', 'next_seq': seq + 1})
+        
+    except Exception as e:
+        print(f"[ERROR] Failed to store answer chunk: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/interview_session/<session_id>/commit_answer', methods=['POST'])
+def commit_answer(session_id):
+    """Finalize an answer uploaded with answer_chunk once every chunk has arrived"""
+    try:
+        session_data = sessions.get(session_id)
+        if session_data is None:
+            return jsonify({'error': 'Invalid session ID'}), 404
+        
+        payload = request.get_json() or {}
+        q_index = int(payload.get('question_index'))
+        chunks = int(payload.get('chunks'))
+        upload = session_data.get('answer_uploads', {}).get(str(q_index))
+        if not upload or upload['next_seq'] != chunks:
+            received = upload['next_seq'] if upload else 0
+            return jsonify({'error': 'Answer is incomplete', 'next_seq': received}), 409
         
-        # Generate feedback using Gemini
-        feedback_prompt = f"""Generate constructive interview feedback for a practice session on {topic_str}.
+        _, filepath, part_path = answer_upload_paths(session_id, q_index)
+        previous_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+        os.replace(part_path, filepath)
+        sessions.add_usage(session_id, -previous_size)
+        
+        def record_answer(data):
+            data.get('answer_uploads', {}).pop(str(q_index), None)
+            data.setdefault('user_answers', {})[str(q_index)] = {'audio_path': filepath}
+        session_data = sessions.update(session_id, record_answer)
+        enqueue_transcription(session_id, q_index, filepath)
+        if session_data and q_index >= session_data.get('total_questions', 0) - 1:
+            # Last answer is in, have the report ready before the browser asks for it
+            start_report(session_id)
+        
+        print(f"[DEBUG] Committed user answer for question {q_index} in session {session_id} ({upload['bytes']} bytes)")
+        return jsonify({'status': 'received'})
+        
+    except Exception as e:
+        print(f"[ERROR] Failed to commit answer: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+# --- REPORTS ---
+def report_inputs(session_data):
+    """Everything the feedback depends on: (topic, level, session type, answered, total)"""
+    config = session_data['config']
+    
+    total_questions = len(session_data.get('questions', []))
+    # Stored answer keys are strings, the introduction (0) does not count
+    answered_count = len([k for k in session_data.get('user_answers', {}).keys() if int(k) > 0])
+    
+    # Create context for feedback
+    if 'skills' in config and config['skills']:
+        topic_str = f"the skills: {', '.join(config['skills'])}"
+    elif 'company' in config and config['company']:
+        topic_str = f"a {config.get('role', 'Software Engineer')} role at {config['company']}"
+    else:
+        topic_str = "general interview skills"
+    
+    session_type = 'Skills-based' if 'skills' in config else 'Company-based' if 'company' in config else 'General'
+    return topic_str, config.get('level', 'mid'), session_type, answered_count, total_questions
+
+def generate_feedback(topic_str, level, session_type, answered_count, total_questions):
+    """
+    Generate feedback using Gemini, returns None if the call failed
+    """
+    feedback_prompt = f"""Generate constructive interview feedback for a practice session on {topic_str}.
         
         Session Details:
-        - Experience Level: {config.get('level', 'mid')}
+        - Experience Level: {level}
         - Questions Attempted: {answered_count} out of {total_questions}
-        - Session Type: {'Skills-based' if 'skills' in config else 'Company-based' if 'company' in config else 'General'}
+        - Session Type: {session_type}
         
         Please provide:
         1. Overall performance assessment
@@ -518,14 +1809,81 @@ def generate_report(session_id):
         
         Keep the feedback constructive, specific, and motivating. Write in a professional but encouraging tone.
         """
+    
+    feedback = get_gemini_response(feedback_prompt, max_tokens=600)
+    return None if feedback == GEMINI_ERROR_RESPONSE else feedback
+
+def build_report(session_id):
+    """
+    Background job: produce the report feedback and memoize it on the session
+    """
+    session_data = sessions.get(session_id)
+    if session_data is None:
+        return
+    inputs = report_inputs(session_data)
+    
+    key = FeedbackCache.make_key(*inputs)
+    feedback, cached = feedback_cache.get_or_create(key, lambda: generate_feedback(*inputs))
+    report = {
+        'status': 'ready' if feedback is not None else 'failed',
+        'feedback': feedback,
+        'answered': inputs[3],
+        'total_questions': inputs[4],
+        'cached': cached,
+        'finished_at': time.time()
+    }
+    sessions.set_fields(session_id, report=report)
+    print(f"[DEBUG] Report for session {session_id}: {report['status']} (cached feedback: {cached})")
+
+def report_is_current(report, answered_count):
+    """Whether a stored report matches the session's answers and is ready or being built"""
+    if not report or report.get('answered') != answered_count:
+        return False
+    if report['status'] == 'ready':
+        return True
+    return report['status'] == 'pending' and time.time() - report.get('started_at', 0) < REPORT_STALE_SECONDS
+
+def start_report(session_id):
+    """Queue report generation unless a current report exists or is already being built"""
+    claimed = {}
+    
+    def claim(data):
+        answered = report_inputs(data)[3]
+        if not report_is_current(data.get('report'), answered):
+            data['report'] = {'status': 'pending', 'answered': answered, 'started_at': time.time()}
+            claimed['ok'] = True
+    if sessions.update(session_id, claim) is None or not claimed:
+        return
+    
+    try:
+        report_executor.submit(f"report:{session_id}", build_report, session_id)
+    except QueueFull:
+        print(f"[WARNING] Report queue full, report for session {session_id} will be retried")
+        sessions.set_fields(session_id, report={'status': 'failed'})
+
+@bp.route('/report/<session_id>')
+def generate_report(session_id):
+    """Render the evaluation report, from the memoized feedback when it is ready"""
+    try:
+        session_data = sessions.get(session_id)
+        if session_data is None:
+            return redirect(url_for('main.home'))
+        
+        _, _, _, answered_count, total_questions = report_inputs(session_data)
+        report = session_data.get('report')
+        if not report_is_current(report, answered_count):
+            start_report(session_id)
+            report = None
         
-        feedback = get_gemini_response(feedback_prompt, max_tokens=600)
+        pending = not report or report['status'] != 'ready'
         accuracy = (answered_count / total_questions) * 100 if total_questions > 0 else 0
         
         return render_template('report.html', 
             session=session_data,
             accuracy=accuracy,
-            feedback=feedback,
+            feedback=None if pending else report['feedback'],
+            pending=pending,
+            session_id=session_id,
             answered=answered_count,
             total_questions=total_questions
         )
@@ -533,32 +1891,101 @@ def generate_report(session_id):
     except Exception as e:
         print(f"[ERROR] Failed to generate report: {str(e)}")
         traceback.print_exc()
-        return redirect(url_for('home'))
+        return redirect(url_for('main.home'))
+
+@bp.route('/report_status/<session_id>')
+def report_status(session_id):
+    """Progress of a session's report, polled by the report page while feedback is generated"""
+    session_data = sessions.get(session_id)
+    if session_data is None:
+        return jsonify({'error': 'Session not found'}), 404
+    
+    report = session_data.get('report')
+    if report and report['status'] == 'failed':
+        # Retried when the page is reloaded, not on every poll
+        return jsonify({'status': 'failed'})
+    if not report_is_current(report, report_inputs(session_data)[3]):
+        start_report(session_id)
+        return jsonify({'status': 'pending'})
+    return jsonify({'status': report['status']})
 
 # --- CLEANUP FUNCTION ---
+def remove_session(session_id, reason='removed'):
+    """Delete a session's state, pending work and artifacts"""
+    generation_executor.cancel(session_id, reason)
+    report_executor.cancel(f"report:{session_id}")
+    for q_index in (sessions.get(session_id) or {}).get('user_answers', {}):
+        transcription_executor.cancel(f"{session_id}:{q_index}")
+    sessions.delete(session_id)
+    event_bus.discard(session_id)
+    # Question audio lives in the shared audio cache, everything else is in one directory
+    remove_session_dir(SESSION_DATA_DIR, session_id)
+
+def index_existing_sessions():
+    """Register sessions already in a shared store (e.g. after a restart) with the expiry heap"""
+    for session_id, last_active, ttl, _ in sessions.all_activity():
+        session_expiry.touch(session_id, now=last_active, ttl=ttl)
+
+def expire_session(session_id):
+    if not cancel_speculation(session_id, 'expired'):
+        remove_session(session_id)
+    print(f"[DEBUG] Cleaned up old session: {session_id}")
+
 def cleanup_old_sessions():
-    """Remove old sessions to prevent memory bloat"""
-    current_time = time.time()
-    old_sessions = [sid for sid, data in sessions.items() 
-                   if current_time - data.get('created_at', 0) > 3600]  # 1 hour
+    """Remove idle sessions and evict the least recently active ones when over budget"""
+    now = time.time()
+    for session_id in session_expiry.due(now):
+        # Another worker may have served the session since this one last saw it
+        activity = sessions.activity(session_id)
+        if activity is not None and session_expiry.adopt(session_id, *activity, now=now):
+            continue
+        expire_session(session_id)
     
-    for session_id in old_sessions:
-        # Clean up audio files
-        try:
-            import glob
-            audio_files = glob.glob(f"static/audio/session_{session_id}_*.mp3")
-            for file in audio_files:
-                os.remove(file)
-        except:
-            pass
-        
-        del sessions[session_id]
-        print(f"[DEBUG] Cleaned up old session: {session_id}")
+    enforce_session_budgets()
+
+def enforce_session_budgets():
+    """Evict the least recently active sessions while the session count or disk budget is exceeded"""
+    while True:
+        # Running totals over every worker's sessions, so this check is cheap
+        count, disk_bytes = sessions.totals()
+        if count <= MAX_ACTIVE_SESSIONS and disk_bytes <= SESSION_DISK_BUDGET_BYTES:
+            return
+        oldest = sessions.oldest(max(count - MAX_ACTIVE_SESSIONS, SESSION_EVICTION_BATCH))
+        evicted = select_evictions(oldest, count, disk_bytes, MAX_ACTIVE_SESSIONS, SESSION_DISK_BUDGET_BYTES)
+        for session_id in evicted:
+            session_expiry.forget(session_id)
+            expire_session(session_id)
+        if not evicted or len(evicted) < len(oldest):
+            return
 
-# Run cleanup every hour
+# Sweep expired sessions every SESSION_SWEEP_INTERVAL seconds
 def schedule_cleanup():
     cleanup_old_sessions()
-    threading.Timer(3600, schedule_cleanup).start()
+    timer = threading.Timer(SESSION_SWEEP_INTERVAL, schedule_cleanup)
+    timer.daemon = True
+    timer.start()
+
+def start_background_services():
+    """Introduction audio precompute and the session sweeper, once per worker"""
+    if AUDIO_OPUS and not ffmpeg_available():
+        print("[WARNING] ffmpeg not found, Opus variants are synthesized by Azure separately "
+              "(a second synthesis per clip); install ffmpeg or set AUDIO_OPUS=false")
+    # Ensure introduction audios are generated
+    if INTRO_AUDIO_MODE == 'eager':
+        # Sessions only need the MP3 clips; other variants are served once they are built
+        print("[DEBUG] Initializing introduction audios...")
+        ensure_introduction_audios(formats=('mp3',))
+        if AUDIO_FORMATS[1:]:
+            threading.Thread(target=ensure_introduction_audios, args=(AUDIO_FORMATS[1:],), daemon=True).start()
+    elif INTRO_AUDIO_MODE == 'background':
+        print("[DEBUG] Initializing introduction audios in the background...")
+        threading.Thread(target=ensure_introduction_audios, daemon=True).start()
+    else:
+        print("[DEBUG] Introduction audios will be generated on first use")
+    
+    # Start cleanup scheduler
+    index_existing_sessions()
+    schedule_cleanup()
 
 # --- STARTUP ---
 if __name__ == '__main__':
@@ -573,13 +2000,7 @@ if __name__ == '__main__':
     except ImportError:
         print("[WARNING] Pydub not available. Install with: pip install pydub")
     
-    print("[DEBUG] Initializing introduction audios...")
-    
-    # Ensure introduction audios are generated
-    ensure_introduction_audios()
-    
-    # Start cleanup scheduler
-    schedule_cleanup()
+    app = create_app()
     
     print("[DEBUG] Flask app starting on port 5000...")
     app.run(debug=True, port=5000, threaded=True)
\ No newline at end of file
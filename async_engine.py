@@ -0,0 +1,147 @@
+"""
+Asyncio engine for session generation jobs.
+
+Every preparing session is a task on one event loop running in a background
+thread, instead of an OS thread blocked on Gemini and TTS requests. Routes
+submit jobs from any thread; removing a session cancels its task. The
+interface matches GenerationExecutor so app.py can use either.
+"""
+
+import asyncio
+import threading
+import time
+import traceback
+from collections import deque
+
+from generation_executor import QueueFull
+
+
+class AsyncGenerationEngine:
+    """
+    Event-loop thread running up to `max_sessions` generation coroutines at once
+    """
+
+    def __init__(self, max_sessions=500, sample_size=200):
+        self.max_sessions = max_sessions
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._tasks = {}  # job_id -> asyncio.Task, None until the loop has started it
+        self._tokens = {}  # job_id -> CancellationToken
+        self._run_times = deque(maxlen=sample_size)
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def _ensure_loop_locked(self):
+        # Started on first use, so a forking server gets one loop per worker
+        if self._thread is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name='generation-loop', daemon=True)
+            self._thread.start()
+        return self._loop
+
+    def submit(self, job_id, coro_fn, *args, token=None):
+        """
+        Start coro_fn(*args) as a task, returns its queue position (always 0)
+
+        cancel(job_id) cancels the task and the token, if given.
+        Raises QueueFull when max_sessions jobs are already running.
+        """
+        with self._lock:
+            if len(self._tasks) >= self.max_sessions:
+                self.rejected += 1
+                raise QueueFull(self._retry_after_locked())
+            loop = self._ensure_loop_locked()
+            self._tasks[job_id] = None
+            if token is not None:
+                self._tokens[job_id] = token
+            self.submitted += 1
+
+        loop.call_soon_threadsafe(self._start, job_id, coro_fn, args)
+        return 0
+
+    def run(self, coro):
+        """Run a coroutine on the engine's loop from another thread, returns a concurrent Future"""
+        with self._lock:
+            loop = self._ensure_loop_locked()
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def position(self, job_id):
+        """Jobs never wait for a worker, so there is no queue position"""
+        return 0
+
+    def idle_workers(self):
+        """Sessions that could start right away"""
+        with self._lock:
+            return max(0, self.max_sessions - len(self._tasks))
+
+    def cancel(self, job_id, reason='cancelled'):
+        """Cancel a job, running or not, returns True if it was still active"""
+        with self._lock:
+            if job_id not in self._tasks:
+                return False
+            task = self._tasks.pop(job_id)
+            token = self._tokens.pop(job_id, None)
+            self.cancelled += 1
+        if token is not None:
+            token.cancel(reason)
+        if task is not None:
+            self._loop.call_soon_threadsafe(task.cancel)
+        return True
+
+    def stats(self):
+        with self._lock:
+            runs = list(self._run_times)
+            return {
+                'engine': 'asyncio',
+                'workers': self.max_sessions,
+                'running': len(self._tasks),
+                'queued': 0,
+                'max_queue': 0,
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'completed': self.completed,
+                'failed': self.failed,
+                'cancelled': self.cancelled,
+                'wait_seconds_avg': 0.0,
+                'wait_seconds_max': 0.0,
+                'run_seconds_avg': round(sum(runs) / len(runs), 3) if runs else 0.0
+            }
+
+    def _retry_after_locked(self):
+        runs = list(self._run_times)
+        avg_run = sum(runs) / len(runs) if runs else 10.0
+        return max(1, int(avg_run))
+
+    def _start(self, job_id, coro_fn, args):
+        # Runs on the loop thread
+        with self._lock:
+            if job_id not in self._tasks:
+                # Cancelled before the loop got to it
+                return
+            self._tasks[job_id] = self._loop.create_task(self._run(job_id, coro_fn, args))
+
+    async def _run(self, job_id, coro_fn, args):
+        started = time.monotonic()
+        outcome = 'completed'
+        try:
+            await coro_fn(*args)
+        except asyncio.CancelledError:
+            outcome = None
+            print(f"[DEBUG] Generation job {job_id} cancelled")
+        except Exception as e:
+            outcome = 'failed'
+            print(f"[ERROR] Generation job {job_id} failed: {str(e)}")
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._tasks.pop(job_id, None)
+                self._tokens.pop(job_id, None)
+                self._run_times.append(time.monotonic() - started)
+                if outcome == 'completed':
+                    self.completed += 1
+                elif outcome == 'failed':
+                    self.failed += 1
@@ -0,0 +1,146 @@
+"""
+Output stages that turn a TTS service response into the final audio file.
+
+Where the service can produce the target format directly the response is
+written as-is; otherwise PCM is piped through ffmpeg (stdin to stdout, no
+temp files). Either way the final file is written atomically, so readers
+never see a partial clip.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+from metrics import registry
+
+audio_encode_seconds = registry.histogram(
+    'recon_audio_encode_seconds', 'Time to transcode synthesized PCM to the served format', ['format'])
+audio_encodes = registry.counter(
+    'recon_audio_encodes_total', 'Transcodes by outcome (success, wav_fallback)', ['format', 'outcome'])
+
+# Azure TTS output formats for each file extension we serve; .ogg is Opus,
+# several times smaller than MP3 for speech
+AZURE_OUTPUT_FORMATS = {
+    'mp3': 'audio-24khz-48kbitrate-mono-mp3',
+    'ogg': 'ogg-24khz-16bit-mono-opus',
+    'wav': 'riff-24khz-16bit-mono-pcm'
+}
+# ffmpeg output arguments for formats that are encoded locally
+TRANSCODE_ARGS = {
+    'mp3': ['-f', 'mp3', '-codec:a', 'libmp3lame', '-b:a', '48k'],
+    'ogg': ['-f', 'ogg', '-codec:a', 'libopus', '-b:a', '24k', '-application', 'voip']
+}
+PCM_OUTPUT_FORMAT = AZURE_OUTPUT_FORMATS['wav']
+FFMPEG = os.getenv("FFMPEG_BINARY", "ffmpeg")
+TRANSCODE_TIMEOUT = 60
+
+
+class TranscodeError(Exception):
+    """ffmpeg is missing or could not encode the audio"""
+
+
+def transcode(audio_bytes, ext, input_format='wav'):
+    """
+    Encode audio bytes (WAV by default, or e.g. 'mp3') to ext, returns the encoded bytes
+
+    The audio goes through ffmpeg's stdin and stdout, nothing touches the disk.
+    """
+    command = [FFMPEG, '-hide_banner', '-loglevel', 'error', '-f', input_format, '-i', 'pipe:0',
+               '-vn', *TRANSCODE_ARGS[ext], 'pipe:1']
+    try:
+        result = subprocess.run(command, input=audio_bytes, capture_output=True, timeout=TRANSCODE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise TranscodeError(f"Could not run {FFMPEG}: {e}")
+    if result.returncode != 0 or not result.stdout:
+        detail = result.stderr.decode('utf-8', 'replace').strip()[-300:]
+        raise TranscodeError(f"{FFMPEG} exited with {result.returncode}: {detail}")
+    return result.stdout
+
+
+def ffmpeg_available():
+    return shutil.which(FFMPEG) is not None
+
+
+def transcode_file(source_path, output_file, ext):
+    """
+    Encode an audio file (format taken from its extension) to ext at output_file
+
+    Returns output_file. Raises TranscodeError, or OSError if the source is gone.
+    """
+    input_format = os.path.splitext(source_path)[1].lstrip('.').lower()
+    with open(source_path, 'rb') as f:
+        source = f.read()
+    with audio_encode_seconds.time(format=ext):
+        encoded = transcode(source, ext, input_format)
+    audio_encodes.inc(format=ext, outcome='success')
+    return atomic_write(output_file, encoded)
+
+
+def atomic_write(path, data):
+    """Write bytes to a temp file in the target directory, then rename into place"""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.splitext(path)[1])
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path
+
+
+class AudioOutputStage:
+    """
+    Base output stage: which format to request, and how to write the response
+    """
+    request_format = PCM_OUTPUT_FORMAT
+
+    def write(self, audio_bytes, output_file):
+        """Write the service response to output_file, returns the path actually written"""
+        return atomic_write(output_file, audio_bytes)
+
+
+class NativeOutputStage(AudioOutputStage):
+    """Request the target format from the service and write it unchanged"""
+
+    def __init__(self, ext):
+        self.request_format = AZURE_OUTPUT_FORMATS[ext]
+
+
+class TranscodeOutputStage(AudioOutputStage):
+    """Request PCM and encode it with ffmpeg over pipes, keeping WAV if encoding fails"""
+
+    def __init__(self, ext, input_format='wav'):
+        self.ext = ext
+        self.input_format = input_format
+
+    def write(self, audio_bytes, output_file):
+        try:
+            with audio_encode_seconds.time(format=self.ext):
+                encoded = transcode(audio_bytes, self.ext, self.input_format)
+            written = atomic_write(output_file, encoded)
+            audio_encodes.inc(format=self.ext, outcome='success')
+            return written
+        except Exception as e:
+            wav_file = os.path.splitext(output_file)[0] + '.wav'
+            print(f"[WARNING] Could not convert to {self.ext.upper()}: {e}. Saving as WAV.")
+            audio_encodes.inc(format=self.ext, outcome='wav_fallback')
+            return atomic_write(wav_file, audio_bytes)
+
+
+def get_output_stage(output_file, mode='native'):
+    """
+    Pick the output stage for a target file
+
+    mode 'native' asks the service for the final format when it supports it,
+    'transcode' always requests PCM and encodes locally.
+    """
+    ext = os.path.splitext(output_file)[1].lstrip('.').lower() or 'wav'
+    if ext == 'wav':
+        return AudioOutputStage()
+    if mode == 'native' and ext in AZURE_OUTPUT_FORMATS:
+        return NativeOutputStage(ext)
+    return TranscodeOutputStage(ext)
@@ -0,0 +1,71 @@
+"""
+Content-versioned URLs for served audio.
+
+Clips are addressed as /audio/v/<version>/<root>/<filename>, where version is
+a hash of the file's content. A URL therefore never changes meaning, and
+browsers and the CDN can cache it forever; a rebuilt clip gets a new URL.
+"""
+
+import hashlib
+import os
+import threading
+
+from werkzeug.security import safe_join
+
+URL_PREFIX = '/audio/v'
+
+
+class AudioVersions:
+    """
+    Maps audio files under named root directories to versioned URLs and back
+
+    Content hashes are computed once per file and reused while its mtime and
+    size are unchanged.
+    """
+
+    def __init__(self, roots):
+        self.roots = {name: os.path.abspath(directory) for name, directory in roots.items()}
+        self._lock = threading.Lock()
+        self._versions = {}  # absolute path -> (mtime_ns, size, version)
+
+    def version(self, path):
+        """Short content hash of a file, None if it does not exist"""
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            known = self._versions.get(path)
+        if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        version = digest.hexdigest()[:16]
+        with self._lock:
+            self._versions[path] = (stat.st_mtime_ns, stat.st_size, version)
+        return version
+
+    def url(self, path):
+        """Versioned URL for a file, or its plain static URL when it is outside every root"""
+        absolute = os.path.abspath(path)
+        for name, root in self.roots.items():
+            if absolute.startswith(root + os.sep):
+                version = self.version(absolute)
+                if version:
+                    relative = os.path.relpath(absolute, root).replace(os.sep, '/')
+                    return f"{URL_PREFIX}/{version}/{name}/{relative}"
+        return f"/{path}"
+
+    def resolve(self, name, filename):
+        """Absolute path of a file under a named root, None if unknown or missing"""
+        root = self.roots.get(name)
+        if root is None:
+            return None
+        path = safe_join(root, filename)
+        if path is None or not os.path.isfile(path):
+            return None
+        return path
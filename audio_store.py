@@ -0,0 +1,369 @@
+"""
+Content-addressed TTS audio cache shared across sessions.
+
+Audio is stored under a hash of everything that affects the synthesized
+output (text, voice, prosody rate and output format), so identical questions
+asked in different sessions are only synthesized once. The cache is capped in
+size and evicts the least recently used clips first, but never a clip used
+within `min_age` seconds, which live sessions may still link to. File mtimes
+record the last use, and the index is rebuilt from the directory every
+`rescan_interval` seconds, so worker processes sharing the directory agree on
+its size and LRU order.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, wait as wait_futures
+
+
+class SynthesisAbandoned(Exception):
+    """Set on an in-flight synthesis whose owner gave up (e.g. was cancelled), waiters retry it"""
+
+
+class AudioStore:
+    """
+    Size-capped LRU store of synthesized audio with in-flight request deduplication
+    """
+
+    KNOWN_EXTENSIONS = ('mp3', 'ogg', 'wav')
+    # Seconds between checks while following a clip that is still being written
+    POLL_INTERVAL = 0.02
+
+    def __init__(self, root='static/audio/cache', max_bytes=512 * 1024 * 1024, min_age=0, rescan_interval=60):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.min_age = min_age
+        self.rescan_interval = rescan_interval
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (filename, size), oldest first
+        self._inflight = {}
+        self._partials = {}  # key -> partial file of a streamed synthesis in flight
+        self._total_bytes = 0
+        self._scanned_at = 0
+        os.makedirs(root, exist_ok=True)
+        with self._lock:
+            self._scan()
+            self._evict()
+
+    @staticmethod
+    def make_key(text, voice, rate, fmt):
+        """Hash of every input that changes the synthesized audio"""
+        material = '\x1f'.join([voice, str(rate), fmt, text.strip()])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached file path for a key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+            else:
+                # Another worker process may have written it to the shared directory
+                entry = self._adopt(key)
+        if not entry:
+            return None
+
+        path = os.path.join(self.root, entry[0])
+        try:
+            os.utime(path)  # Keep LRU order across restarts
+        except OSError:
+            with self._lock:
+                self._forget(key)
+            return None
+        return path
+
+    def fetch(self, text, synthesize, voice, rate, fmt, ext):
+        """
+        Return the cached audio for these inputs, synthesizing it on a miss
+
+        `synthesize(target_path)` must write the audio to `target_path` and
+        return the path it actually wrote (which may use a different
+        extension), or a falsy value on failure. Concurrent requests for the
+        same key wait for a single synthesis.
+        """
+        key = self.make_key(text, voice, rate, fmt)
+        while True:
+            path = self.get(key)
+            if path:
+                print(f"[DEBUG] Audio cache hit: {key[:12]}")
+                return path
+
+            future, owner = self.reserve(key)
+            if owner:
+                return self.complete(key, ext, synthesize)
+            print(f"[DEBUG] Waiting for in-flight synthesis: {key[:12]}")
+            try:
+                return future.result()
+            except SynthesisAbandoned:
+                continue
+
+    def reserve(self, key):
+        """
+        Claim the synthesis of a key that is not cached, returns (future, owner)
+
+        The owner must settle the reservation with complete() or abandon();
+        everyone else waits on the future, which gives the cached path, or
+        None if the synthesis failed.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            return future, owner
+
+    def complete(self, key, ext, synthesize):
+        """Run the owner's synthesis (see fetch) into the store and settle the reservation"""
+        path = None
+        try:
+            path = self._synthesize_into_store(key, ext, synthesize)
+        except Exception as e:
+            print(f"[ERROR] Audio synthesis for cache failed: {str(e)}")
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                future = self._inflight.pop(key)
+            future.set_result(path)
+        return path
+
+    def abandon(self, key):
+        """Give up a reservation without a result, waiters retry it"""
+        with self._lock:
+            future = self._inflight.pop(key)
+        future.set_exception(SynthesisAbandoned())
+
+    def stream(self, text, open_stream, voice, rate, fmt, ext, chunk_size=16384):
+        """
+        Yield audio chunks for these inputs, teeing a miss into the store
+
+        Cached clips are read back from disk, and a clip that another caller
+        is streaming into the store is followed from its partial file as it
+        grows. On a miss `open_stream()` must return an iterator of audio
+        chunks, which are relayed as they arrive and written to the store
+        once complete.
+        """
+        key = self.make_key(text, voice, rate, fmt)
+        while True:
+            path = self.get(key)
+            if path:
+                break
+            future, owner = self.reserve(key)
+            if owner:
+                yield from self._stream_into_store(key, ext, open_stream, future)
+                return
+
+            # A streamed synthesis registers its partial file once it is open
+            while not future.done():
+                with self._lock:
+                    partial = self._partials.get(key)
+                if partial:
+                    try:
+                        f = open(partial, 'rb')
+                    except OSError:
+                        # Renamed into place or removed in the meantime
+                        break
+                    with f:
+                        yield from self._follow(f, future, chunk_size)
+                    return
+                wait_futures([future], timeout=self.POLL_INTERVAL)
+            try:
+                path = future.result()
+                break
+            except SynthesisAbandoned:
+                continue
+
+        if path:
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    def fetch_stream(self, text, open_stream, voice, rate, fmt, ext):
+        """
+        fetch() through a streamed synthesis, returns the cached path or None
+
+        Used when nobody is listening yet: the clip is written through a
+        partial file, so stream() callers for the same inputs can follow it
+        instead of waiting for the whole clip.
+        """
+        key = self.make_key(text, voice, rate, fmt)
+        while True:
+            path = self.get(key)
+            if path:
+                return path
+            future, owner = self.reserve(key)
+            if owner:
+                for _ in self._stream_into_store(key, ext, open_stream, future):
+                    pass
+            try:
+                return future.result()
+            except SynthesisAbandoned:
+                continue
+
+    def _follow(self, f, future, chunk_size):
+        # The open file survives the partial being renamed into place or removed
+        while True:
+            chunk = f.read(chunk_size)
+            if chunk:
+                yield chunk
+                continue
+            if future.done():
+                # Written to the end; a failed synthesis leaves the clip truncated
+                chunk = f.read()
+                if chunk:
+                    yield chunk
+                return
+            wait_futures([future], timeout=self.POLL_INTERVAL)
+
+    def _stream_into_store(self, key, ext, open_stream, future):
+        target = os.path.join(self.root, f"{key}.{uuid.uuid4().hex}.partial.{ext}")
+        path = None
+        client_gone = False
+        try:
+            with open(target, 'wb') as f:
+                with self._lock:
+                    self._partials[key] = target
+                for chunk in open_stream():
+                    f.write(chunk)
+                    # Followers read the partial file as it grows
+                    f.flush()
+                    if not client_gone:
+                        try:
+                            yield chunk
+                        except GeneratorExit:
+                            # Client went away, finish the clip anyway so replays hit the cache
+                            client_gone = True
+
+            if os.path.getsize(target) > 0:
+                filename = f"{key}.{ext}"
+                path = os.path.join(self.root, filename)
+                os.replace(target, path)
+                with self._lock:
+                    self._record(key, filename, os.path.getsize(path))
+                    self._evict()
+        except Exception as e:
+            print(f"[ERROR] Streaming synthesis failed: {str(e)}")
+            traceback.print_exc()
+            path = None
+        finally:
+            if os.path.exists(target):
+                os.remove(target)
+            with self._lock:
+                del self._inflight[key]
+                self._partials.pop(key, None)
+            future.set_result(path)
+
+    def place(self, path, dest):
+        """Expose a cached file at another path, hard-linking where possible"""
+        tmp = f"{dest}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.link(path, tmp)
+        except OSError:
+            shutil.copyfile(path, tmp)
+        os.replace(tmp, dest)
+        return dest
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'in_flight': len(self._inflight)
+            }
+
+    def _synthesize_into_store(self, key, ext, synthesize):
+        target = os.path.join(self.root, f"{key}.{uuid.uuid4().hex}.partial.{ext}")
+        try:
+            written = synthesize(target)
+            if not written:
+                return None
+            written = target if written is True else written
+
+            final_ext = os.path.splitext(written)[1] or f".{ext}"
+            filename = f"{key}{final_ext}"
+            final_path = os.path.join(self.root, filename)
+            os.replace(written, final_path)
+        finally:
+            for leftover in (target, os.path.splitext(target)[0] + '.wav'):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+        with self._lock:
+            self._record(key, filename, os.path.getsize(final_path))
+            if time.monotonic() - self._scanned_at > self.rescan_interval:
+                # Other workers write to the same directory
+                self._scan()
+            self._evict()
+        return final_path
+
+    def _record(self, key, filename, size):
+        self._forget(key)
+        self._entries[key] = (filename, size)
+        self._total_bytes += size
+
+    def _forget(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._total_bytes -= entry[1]
+
+    def _adopt(self, key):
+        for ext in self.KNOWN_EXTENSIONS:
+            name = f"{key}.{ext}"
+            path = os.path.join(self.root, name)
+            if os.path.exists(path):
+                self._record(key, name, os.path.getsize(path))
+                return self._entries[key]
+        return None
+
+    def _evict(self):
+        checked = 0
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1 and checked < len(self._entries):
+            key, (filename, _) = next(iter(self._entries.items()))
+            path = os.path.join(self.root, filename)
+            try:
+                used = os.path.getmtime(path)
+            except OSError:
+                # Evicted by another worker
+                self._forget(key)
+                continue
+            if time.time() - used < self.min_age:
+                # Used recently, maybe by another worker, so still linked from live sessions
+                self._entries.move_to_end(key)
+                checked += 1
+                continue
+            self._forget(key)
+            try:
+                os.remove(path)
+                print(f"[DEBUG] Evicted cached audio: {filename}")
+            except OSError:
+                pass
+
+    def _scan(self):
+        """Rebuild the index from the directory, oldest use first; called with the lock held"""
+        files = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if '.partial.' in name:
+                # Leftovers from a crashed synthesis, other workers may still own recent ones
+                if time.time() - os.path.getmtime(path) > 600:
+                    os.remove(path)
+                continue
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, name, stat.st_size))
+
+        self._entries.clear()
+        self._total_bytes = 0
+        for _, name, size in sorted(files):
+            self._record(name.split('.', 1)[0], name, size)
+        self._scanned_at = time.monotonic()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the TTS audio output stage
+
+Compares the legacy path (temp WAV on disk, re-read, export MP3, remove) with
+the transcode stage (PCM piped through ffmpeg) and the native passthrough
+stage, using a synthetic 24kHz 16-bit mono PCM clip like the one Azure
+returns. The transcode paths need ffmpeg, the legacy one pydub as well.
+
+Usage: python benchmarks/bench_audio_output.py [--seconds 8] [--iterations 20]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_output import AudioOutputStage, TranscodeOutputStage  # noqa: E402
+from fakes import sine_wav  # noqa: E402
+
+SAMPLE_MP3 = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'static', 'audio', 'introductions', 'recon_intro_1.mp3')
+
+
+def legacy_write(audio_bytes, output_file):
+    """The original generate_tts path: temp WAV on disk, decode, export, remove"""
+    from pydub import AudioSegment
+
+    temp_wav = output_file.replace('.mp3', '.wav')
+    with open(temp_wav, 'wb') as f:
+        f.write(audio_bytes)
+    audio = AudioSegment.from_wav(temp_wav)
+    audio.export(output_file, format="mp3")
+    os.remove(temp_wav)
+    return output_file
+
+
+def time_path(fn, audio_bytes, directory, iterations):
+    timings = []
+    for i in range(iterations):
+        output_file = os.path.join(directory, f"bench_{i}.mp3")
+        start = time.perf_counter()
+        fn(audio_bytes, output_file)
+        timings.append((time.perf_counter() - start) * 1000)
+        for leftover in (output_file, output_file.replace('.mp3', '.wav')):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    return {
+        'mean_ms': round(statistics.mean(timings), 3),
+        'p50_ms': round(statistics.median(timings), 3),
+        'max_ms': round(max(timings), 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=8.0, help='length of the synthetic clip')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--dir', default=None, help='directory to write to (defaults to a temp dir)')
+    args = parser.parse_args()
+
+    pcm = sine_wav(args.seconds)
+    directory = args.dir or tempfile.mkdtemp(prefix='bench-audio-')
+    results = {'clip_seconds': args.seconds, 'pcm_bytes': len(pcm), 'iterations': args.iterations}
+
+    if shutil.which('ffmpeg'):
+        results['legacy_temp_wav'] = time_path(legacy_write, pcm, directory, args.iterations)
+        results['piped_transcode'] = time_path(TranscodeOutputStage('mp3').write, pcm, directory, args.iterations)
+    else:
+        results['transcode'] = 'skipped: ffmpeg not found'
+
+    # Native mode receives MP3 from the service, so the stage only writes bytes
+    with open(SAMPLE_MP3, 'rb') as f:
+        mp3 = f.read()
+    results['native_passthrough'] = time_path(AudioOutputStage().write, mp3, directory, args.iterations)
+
+    if not args.dir:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Load test with local Gemini and Azure TTS stand-ins
+
+Starts a fake Azure TTS server and the app (LLM_BACKEND=fake) in a
+subprocess, then drives N concurrent candidates through /prepare_session,
+/session_status, /get_question (with the question audio), submit_answer and
+the report. Reports time-to-intro, time-to-each-question, report time and
+throughput as JSON so runs can be compared across changes.
+
+Usage: python benchmarks/bench_load.py [--candidates 20] [--questions 3]
+       [--llm-latency 0.5] [--tts-latency 0.3] [--engine threads] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fakes import FakeAzureTTSServer  # noqa: E402
+
+SAMPLE_MP3 = os.path.join(ROOT, 'static', 'audio', 'introductions', 'recon_intro_1.mp3')
+SKILLS = ['Python', 'SQL', 'JavaScript', 'System Design', 'Docker', 'Go', 'React', 'Kubernetes']
+
+SERVER = """
+import sys, app
+app.create_app().run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True)
+"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def http(method, url, body=None, headers=None, timeout=120):
+    """Returns (status, response body)"""
+    req = urllib.request.Request(url, data=body, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def http_json(method, url, payload=None):
+    body = json.dumps(payload).encode('utf-8') if payload is not None else None
+    status, data = http(method, url, body, {'Content-Type': 'application/json'} if body else None)
+    try:
+        return status, json.loads(data)
+    except ValueError:
+        return status, None
+
+
+def multipart(fields, files):
+    """Encode form fields and (name, filename, bytes) files as multipart/form-data"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, filename, content in files:
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: audio/webm\r\n\r\n'.encode() + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+
+def poll(fetch, done, interval, timeout):
+    """Call fetch() until done(result) or timeout, returns the last result"""
+    deadline = time.monotonic() + timeout
+    while True:
+        result = fetch()
+        if done(result) or time.monotonic() > deadline:
+            return result
+        time.sleep(interval)
+
+
+def make_config(candidate, args):
+    if args.shared_config:
+        skills = SKILLS[:2]
+    else:
+        skills = random.Random(candidate).sample(SKILLS, 2) + [f"Topic {candidate}"]
+    return {'skills': skills, 'level': 'mid', 'num_questions': args.questions}
+
+
+def run_candidate(base, candidate, args):
+    """One candidate's interview, returns its timings in seconds"""
+    time.sleep(args.ramp * candidate / max(1, args.candidates))
+    result = {'questions': {}, 'audio': {}, 'audio_bytes': 0, 'errors': []}
+    started = time.monotonic()
+
+    status, data = http_json('POST', f"{base}/prepare_session", make_config(candidate, args))
+    result['prepare'] = time.monotonic() - started
+    if status != 200:
+        result['errors'].append(f"prepare_session {status}: {data}")
+        return result
+    session_id = data['session_id']
+
+    status, data = poll(lambda: http_json('GET', f"{base}/session_status/{session_id}"),
+                        lambda r: r[1] and r[1].get('status') != 'initializing',
+                        args.poll_interval, args.timeout)
+    if status != 200 or data.get('status') in ('error', 'initializing'):
+        result['errors'].append(f"session_status {status}: {data}")
+        return result
+    result['intro'] = time.monotonic() - started
+
+    answer = os.urandom(args.answer_bytes)
+    for index in range(args.questions + 1):
+        status, question = poll(lambda: http_json('GET', f"{base}/get_question/{session_id}/{index}"),
+                                lambda r: r[0] != 202, args.poll_interval, args.timeout)
+        if status != 200 or not question or 'text' not in question:
+            result['errors'].append(f"get_question {index} {status}: {question}")
+            return result
+        if index:
+            result['questions'][index] = time.monotonic() - started
+
+        # The candidate listens to the question before answering
+        if question.get('audio_url'):
+            audio_started = time.monotonic()
+            status, audio = http('GET', f"{base}{question['audio_url']}")
+            if status == 200:
+                result['audio'][index] = time.monotonic() - audio_started
+                result['audio_bytes'] += len(audio)
+            else:
+                result['errors'].append(f"audio {index} {status}")
+
+        body, headers = multipart({'question_index': index}, [('audio', f'q_{index}.webm', answer)])
+        status, _ = http('POST', f"{base}/interview_session/{session_id}/submit_answer", body, headers)
+        if status != 200:
+            result['errors'].append(f"submit_answer {index} {status}")
+
+    answered = time.monotonic()
+    http('GET', f"{base}/report/{session_id}")
+    status, data = poll(lambda: http_json('GET', f"{base}/report_status/{session_id}"),
+                        lambda r: r[1] and r[1].get('status') in ('ready', 'failed'),
+                        args.poll_interval, args.timeout)
+    if not data or data.get('status') != 'ready':
+        result['errors'].append(f"report {status}: {data}")
+        return result
+    result['report'] = time.monotonic() - answered
+    result['total'] = time.monotonic() - started
+    return result
+
+
+def summarize(samples):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return {
+        'count': len(samples),
+        'mean_ms': round(statistics.mean(samples) * 1000, 1),
+        'median_ms': round(statistics.median(samples) * 1000, 1),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 1),
+        'max_ms': round(samples[-1] * 1000, 1)
+    }
+
+
+def start_app(port, tts, workdir, args):
+    env = dict(
+        os.environ,
+        LLM_BACKEND='fake',
+        LLM_FAKE_LATENCY=str(args.llm_latency),
+        LLM_FAKE_JITTER=str(args.llm_jitter),
+        LLM_FAKE_ERROR_RATE=str(args.llm_error_rate),
+        AZURE_SPEECH_KEY='load-test',
+        AZURE_SPEECH_REGION='local',
+        AZURE_TTS_ENDPOINT=tts.endpoint,
+        AZURE_TTS_TOKEN_ENDPOINT=tts.token_endpoint,
+        STT_ENGINE='offline',
+        GENERATION_ENGINE=args.engine,
+        AUDIO_OPUS='true' if args.opus_sample else 'false',
+        INTRO_AUDIO_MODE='lazy',
+        SESSION_DATA_DIR=os.path.join(workdir, 'sessions'),
+        AUDIO_CACHE_DIR=os.path.join(workdir, 'audio_cache'),
+        QUESTION_BANK_PATH=os.path.join(workdir, 'question_bank.db')
+    )
+    log = open(os.path.join(workdir, 'server.log'), 'w')
+    process = subprocess.Popen([sys.executable, '-c', SERVER, str(port)], cwd=ROOT, env=env,
+                               stdout=log, stderr=subprocess.STDOUT)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited with {process.returncode}, see {log.name}")
+        try:
+            if http('GET', f"{base}/", timeout=2)[0] == 200:
+                return process, base
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"App did not start within 30s, see {log.name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--candidates', type=int, default=20, help="concurrent candidates")
+    parser.add_argument('--questions', type=int, default=3, help="questions per interview, besides the introduction")
+    parser.add_argument('--ramp', type=float, default=0.0, help="seconds over which candidates start")
+    parser.add_argument('--shared-config', action='store_true', help="every candidate picks the same skills")
+    parser.add_argument('--engine', default='threads', choices=('threads', 'asyncio'))
+    parser.add_argument('--llm-latency', type=float, default=0.5)
+    parser.add_argument('--llm-jitter', type=float, default=0.2)
+    parser.add_argument('--llm-error-rate', type=float, default=0.0)
+    parser.add_argument('--tts-latency', type=float, default=0.3)
+    parser.add_argument('--tts-jitter', type=float, default=0.1)
+    parser.add_argument('--tts-error-rate', type=float, default=0.0)
+    parser.add_argument('--opus-sample', help="Ogg Opus clip for the fake TTS, enables the Opus variant")
+    parser.add_argument('--answer-bytes', type=int, default=32 * 1024, help="size of each uploaded answer")
+    parser.add_argument('--poll-interval', type=float, default=0.1)
+    parser.add_argument('--timeout', type=float, default=120, help="seconds to wait for any one step")
+    parser.add_argument('--keep', action='store_true', help="keep the work directory and server log")
+    parser.add_argument('--output', help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='recon-load-')
+    tts = FakeAzureTTSServer(SAMPLE_MP3, latency=args.tts_latency, jitter=args.tts_jitter,
+                             error_rate=args.tts_error_rate, opus_path=args.opus_sample).start()
+    process, base = start_app(free_port(), tts, workdir, args)
+    try:
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=args.candidates) as pool:
+            results = list(pool.map(lambda c: run_candidate(base, c, args), range(args.candidates)))
+        elapsed = time.monotonic() - started
+        _, server_stats = http_json('GET', f"{base}/generation_stats")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        tts.stop()
+
+    completed = [r for r in results if 'total' in r]
+    report = {
+        'parameters': vars(args),
+        'elapsed_seconds': round(elapsed, 2),
+        'candidates_completed': len(completed),
+        'errors': [error for r in results for error in r['errors']][:20],
+        'error_count': sum(len(r['errors']) for r in results),
+        'throughput': {
+            'interviews_per_minute': round(len(completed) / elapsed * 60, 2),
+            'questions_per_second': round(sum(len(r['questions']) for r in results) / elapsed, 2)
+        },
+        'prepare_session': summarize([r['prepare'] for r in results if 'prepare' in r]),
+        'time_to_intro': summarize([r['intro'] for r in results if 'intro' in r]),
+        'time_to_question': {
+            str(i): summarize([r['questions'][i] for r in results if i in r['questions']])
+            for i in range(1, args.questions + 1)
+        },
+        'question_audio_download': summarize([s for r in results for i, s in r['audio'].items() if i]),
+        'audio_bytes_per_interview': round(statistics.mean(r['audio_bytes'] for r in results)) if results else 0,
+        'time_to_report': summarize([r['report'] for r in results if 'report' in r]),
+        'interview_total': summarize([r['total'] for r in completed]),
+        'fake_tts': tts.stats(),
+        'server': server_stats
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    if args.keep:
+        print(f"Work directory: {workdir}", file=sys.stderr)
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
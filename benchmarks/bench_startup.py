@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for a web worker
+
+Each iteration runs in a fresh interpreter and measures `import app`,
+`create_app()`, the first request to the home page, and the deferred cost
+of loading the Gemini client on first use. It also lists which heavy SDKs
+were already loaded before that first Gemini call (ideally none).
+
+Usage: python benchmarks/bench_startup.py [--iterations 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('google.generativeai', 'azure.cognitiveservices.speech', 'requests', 'pydub')
+
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+flask_app = app.create_app(start_services=False)
+t2 = time.perf_counter()
+status = flask_app.test_client().get('/').status_code
+t3 = time.perf_counter()
+loaded = [name for name in %r if name in sys.modules]
+try:
+    app.get_gemini_model()
+except Exception:
+    pass
+t4 = time.perf_counter()
+print(json.dumps({
+    'import': t1 - t0, 'create_app': t2 - t1, 'first_request': t3 - t2,
+    'first_gemini_client': t4 - t3, 'status': status, 'heavy_loaded_before_use': loaded
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_child(code):
+    env = dict(os.environ, INTRO_AUDIO_MODE='lazy')
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    elapsed = time.perf_counter() - started
+    lines = [line for line in output.splitlines() if line.startswith('{')]
+    return elapsed, json.loads(lines[-1]) if lines else None
+
+
+def summarize(samples):
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 1),
+        'min_ms': round(min(samples) * 1000, 1),
+        'max_ms': round(max(samples) * 1000, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--iterations', type=int, default=5)
+    args = parser.parse_args()
+
+    interpreter = [run_child('pass')[0] for _ in range(args.iterations)]
+    runs = [run_child(CHILD) for _ in range(args.iterations)]
+    metrics = [result for _, result in runs]
+
+    report = {
+        'iterations': args.iterations,
+        'interpreter_startup': summarize(interpreter),
+        'process_total': summarize([elapsed for elapsed, _ in runs]),
+        'first_request_status': metrics[-1]['status'],
+        'heavy_loaded_before_use': metrics[-1]['heavy_loaded_before_use']
+    }
+    for phase in ('import', 'create_app', 'first_request', 'first_gemini_client'):
+        report[phase] = summarize([m[phase] for m in metrics])
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""
+Local stand-ins for external services, used to exercise the generation and
+transcription pipelines without spending Gemini or Azure quota.
+"""
+
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import re
+import struct
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeServiceError(Exception):
+    """Injected failure; the message starts with the HTTP status, like API errors do"""
+
+
+class FakeResponse:
+    """Mimics a google.generativeai response or stream chunk"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """
+    Minimal GenerativeModel replacement with optional streaming
+
+    `responder` maps a prompt to the full response text. When streaming, the
+    text is released `chunk_size` characters at a time with `chunk_delay`
+    seconds between chunks. Each call takes `latency` plus up to `jitter`
+    seconds and fails with `error_status` at `error_rate`.
+    """
+
+    def __init__(self, responder=None, latency=0.0, chunk_size=16, chunk_delay=0.0,
+                 jitter=0.0, error_rate=0.0, error_status=500):
+        self.responder = responder or self.default_responder
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.calls = []
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls.append({'prompt': prompt, 'stream': stream, **kwargs})
+        time.sleep(self._delay())
+        self._maybe_fail()
+        text = self.responder(prompt)
+        if stream:
+            return self._stream(text)
+        return FakeResponse(text)
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls.append({'prompt': prompt, 'stream': False, 'async': True, **kwargs})
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        return FakeResponse(self.responder(prompt))
+
+    def _delay(self):
+        return self.latency + random.uniform(0, self.jitter)
+
+    def _maybe_fail(self):
+        if self.error_rate and random.random() < self.error_rate:
+            raise FakeServiceError(f"{self.error_status} Fake Gemini error")
+
+    def _stream(self, text):
+        for start in range(0, len(text), self.chunk_size):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield FakeResponse(text[start:start + self.chunk_size])
+
+    @staticmethod
+    def default_responder(prompt):
+        # Every call gets fresh question texts, like the real model, so audio is not all cache hits
+        variant = f"{random.getrandbits(32):08x}"
+        if 'JSON' in prompt:
+            count = int(re.search(r'Generate (\d+)', prompt).group(1))
+            return json.dumps([
+                {'question': f"Sample interview question number {i} ({variant})?",
+                 'answer': "A concise, structured sample answer."}
+                for i in range(1, count + 1)
+            ])
+        if prompt.lstrip().startswith('Generate'):
+            return "\n".join(f"{i}. Sample interview question number {i} ({variant})?" for i in range(1, 11))
+        return "A concise, structured sample answer."
+
+
+class FakeSTTEngine:
+    """Offline speech-to-text stand-in, returns a placeholder transcript"""
+    name = 'offline'
+
+    def __init__(self, latency=0.0, text=None):
+        self.latency = latency
+        self.text = text
+        self.calls = []
+
+    def transcribe(self, audio_path):
+        self.calls.append(audio_path)
+        time.sleep(self.latency)
+        if self.text is not None:
+            return self.text
+        size = os.path.getsize(audio_path)
+        return f"[offline transcript of {os.path.basename(audio_path)}, {size} bytes]"
+
+
+def sine_wav(seconds, sample_rate=24000, frequency=220.0):
+    """A 16-bit mono PCM WAV tone, the shape of Azure's riff-24khz-16bit-mono-pcm output"""
+    frames = int(seconds * sample_rate)
+    samples = (int(8000 * math.sin(2 * math.pi * frequency * i / sample_rate)) for i in range(frames))
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(struct.pack(f'<{frames}h', *samples))
+    return buffer.getvalue()
+
+
+class FakeAzureTTSServer:
+    """
+    Local HTTP stand-in for the Azure TTS REST and issueToken endpoints
+
+    Point the app at it with AZURE_TTS_ENDPOINT and AZURE_TTS_TOKEN_ENDPOINT.
+    PCM requests get a WAV tone as long as the text would take to speak;
+    MP3 and Ogg Opus requests get the real clips at `mp3_path` and
+    `opus_path` (Opus is rejected like an unknown format without one). Each synthesis takes
+    `latency` plus up to `jitter` seconds and fails with `error_status` at
+    `error_rate`. Token requests take `token_latency` seconds and answer
+    `token_status` (settable while running).
+    """
+
+    def __init__(self, mp3_path, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 host='127.0.0.1', port=0, opus_path=None, token_latency=0.0, token_status=200):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token_latency = token_latency
+        self.token_status = token_status
+        with open(mp3_path, 'rb') as f:
+            self.mp3 = f.read()
+        self.opus = None
+        if opus_path:
+            with open(opus_path, 'rb') as f:
+                self.opus = f.read()
+        self._lock = threading.Lock()
+        self.counters = {'tokens': 0, 'syntheses': 0, 'errors': 0, 'bytes': 0}
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def endpoint(self):
+        return f"{self.url}/cognitiveservices/v1"
+
+    @property
+    def token_endpoint(self):
+        return f"{self.url}/sts/v1.0/issuetoken"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-azure-tts', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def synthesize(self, ssml, output_format):
+        """Returns (status, content type, body) for a synthesis request"""
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        if self.error_rate and random.random() < self.error_rate:
+            self._count('errors')
+            return self.error_status, 'text/plain', b'Fake Azure TTS error'
+        if output_format.startswith('riff-'):
+            text = re.sub(r'<[^>]+>', ' ', ssml)
+            return 200, 'audio/wav', sine_wav(max(0.5, len(text.split()) / 2.5))
+        if output_format.endswith('-mp3'):
+            return 200, 'audio/mpeg', self.mp3
+        if output_format.startswith('ogg-') and self.opus:
+            return 200, 'audio/ogg', self.opus
+        return 400, 'text/plain', b'Unsupported output format'
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                if self.path.startswith('/sts/'):
+                    fake._count('tokens')
+                    time.sleep(fake.token_latency)
+                    if fake.token_status != 200:
+                        self._reply(fake.token_status, 'text/plain', b'Fake token error')
+                        return
+                    self._reply(200, 'text/plain', b'fake-token')
+                    return
+                fake._count('syntheses')
+                status, content_type, payload = fake.synthesize(
+                    body.decode('utf-8', 'replace'), self.headers.get('X-Microsoft-OutputFormat', ''))
+                if status == 200:
+                    fake._count('bytes', len(payload))
+                self._reply(status, content_type, payload)
+
+            def _reply(self, status, content_type, payload):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
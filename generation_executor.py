@@ -0,0 +1,183 @@
+"""
+Bounded executor for session generation jobs, with admission control.
+
+A fixed number of workers run generation jobs; at most `max_queue` more may
+wait. Past that, submissions are rejected so the caller can answer with a 503
+and Retry-After instead of letting every session slow down together.
+
+Cancelling a job drops it if it is still queued. A running job can't be
+interrupted; it is asked to stop through its CancellationToken, which it
+checks between units of work.
+"""
+
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    """Raised when the generation queue is saturated"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Generation queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobCancelled(Exception):
+    """Raised by a job's unit of work that was skipped because the job was cancelled"""
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation for a running job
+
+    Jobs check cancelled() between units of work and count the units that
+    were already running at cancel() and finished anyway (late_work), which
+    is work thrown away.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self.reason = None
+        self.cancelled_at = None
+        self.late_work = 0
+
+    def cancel(self, reason='cancelled'):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self.cancelled_at = time.time()
+            self._event.set()
+
+    def cancelled(self):
+        return self._event.is_set()
+
+    def record_late_work(self, units=1):
+        with self._lock:
+            self.late_work += units
+
+
+class GenerationExecutor:
+    """
+    Fixed worker pool with a bounded wait queue and queue/wait-time metrics
+    """
+
+    def __init__(self, max_workers=8, max_queue=32, sample_size=200):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='generation')
+        self._lock = threading.Lock()
+        self._queued = OrderedDict()  # job_id -> enqueue time, in FIFO order
+        self._tokens = {}  # job_id -> CancellationToken of a queued or running job
+        self._running = 0
+        self._wait_times = deque(maxlen=sample_size)
+        self._run_times = deque(maxlen=sample_size)
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, job_id, fn, *args, token=None):
+        """
+        Queue a job, returns its queue position (0 means a worker is free)
+
+        A token is cancelled by cancel(job_id) once the job is running.
+        Raises QueueFull when max_queue jobs are already waiting.
+        """
+        with self._lock:
+            if self._running + len(self._queued) >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise QueueFull(self._retry_after_locked())
+            self._queued[job_id] = time.monotonic()
+            if token is not None:
+                self._tokens[job_id] = token
+            self.submitted += 1
+            position = self._position_locked(job_id)
+
+        self._executor.submit(self._run, job_id, fn, args)
+        return position
+
+    def position(self, job_id):
+        """Queue position of a waiting job, 0 if it is running or unknown"""
+        with self._lock:
+            return self._position_locked(job_id)
+
+    def _position_locked(self, job_id):
+        if job_id not in self._queued:
+            return 0
+        ahead = list(self._queued).index(job_id)
+        return max(0, ahead + 1 - (self.max_workers - self._running))
+
+    def idle_workers(self):
+        """Workers that would start a new job right away"""
+        with self._lock:
+            return max(0, self.max_workers - self._running - len(self._queued))
+
+    def cancel(self, job_id, reason='cancelled'):
+        """
+        Drop a job that has not started yet, or cancel the token of a running one
+
+        Returns True if the job was dropped or asked to stop.
+        """
+        with self._lock:
+            dropped = self._queued.pop(job_id, None) is not None
+            token = self._tokens.pop(job_id, None)
+        if token is not None:
+            token.cancel(reason)
+        return dropped or token is not None
+
+    def stats(self):
+        with self._lock:
+            waits = list(self._wait_times)
+            runs = list(self._run_times)
+            return {
+                'workers': self.max_workers,
+                'running': self._running,
+                'queued': len(self._queued),
+                'max_queue': self.max_queue,
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'completed': self.completed,
+                'failed': self.failed,
+                'wait_seconds_avg': round(sum(waits) / len(waits), 3) if waits else 0.0,
+                'wait_seconds_max': round(max(waits), 3) if waits else 0.0,
+                'run_seconds_avg': round(sum(runs) / len(runs), 3) if runs else 0.0
+            }
+
+    def _retry_after_locked(self):
+        # Rough time until a queue slot frees up, from recent job durations
+        runs = list(self._run_times)
+        avg_run = sum(runs) / len(runs) if runs else 10.0
+        return max(1, int(avg_run * (len(self._queued) + 1) / self.max_workers))
+
+    def _run(self, job_id, fn, args):
+        with self._lock:
+            enqueued = self._queued.pop(job_id, None)
+            if enqueued is None:
+                # Cancelled while waiting
+                self._tokens.pop(job_id, None)
+                return
+            self._wait_times.append(time.monotonic() - enqueued)
+            self._running += 1
+
+        started = time.monotonic()
+        ok = True
+        try:
+            fn(*args)
+        except Exception as e:
+            ok = False
+            print(f"[ERROR] Generation job {job_id} failed: {str(e)}")
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._tokens.pop(job_id, None)
+                self._run_times.append(time.monotonic() - started)
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
@@ -0,0 +1,170 @@
+"""
+Introduction audio precompute, shared by the app and audio_generator.py.
+
+The introduction texts live here only. A manifest next to the clips records a
+hash of the text and voice settings each clip was built from, so edited texts
+are rebuilt incrementally. Missing or stale clips can be synthesized in
+parallel up front, or lazily the first time a session needs them.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+INTRO_DIR = "static/audio/introductions"
+MANIFEST_NAME = "manifest.json"
+
+# Recon AI introductions
+RECON_INTRODUCTIONS = [
+    "Welcome to Recon AI, your personal coach for interview success. Think of me as your practice partner, here to boost your confidence, sharpen your skills, and help you shine in every answer. This is your time to take the spotlight.",
+    "Hello and welcome to Recon AI. You're not alone in this, I'm here to support you every step of the way. This is your space to practice, grow, and prepare with confidence. Let's begin on a strong note.",
+    "Welcome to Recon AI, where preparation meets progress. Whether you're just starting out or polishing your skills, I'm here to help you bring out your best. Let's ease into this experience together.",
+    "Hi there, and welcome aboard Recon AI, your smart partner in nailing every interview. Today is about growth, self-belief, and getting one step closer to your goals. You're in the perfect place to begin.",
+    "Hey, and welcome to Recon AI, your space to prepare, practice, and gain confidence. No pressure, no rush, just a relaxed environment focused on you and your journey."
+]
+
+# User introduction prompts
+USER_INTRODUCTIONS = [
+    "To begin, please tell me a little about yourself and what interests you about this opportunity.",
+    "Let's start with you introducing yourself. What's your background and what draws you to this field?",
+    "I'd love to hear about you first. Could you share your background and what excites you about this role?",
+    "Let's kick off with introductions. Tell me about yourself and what motivates you in your career.",
+    "To get us started, please introduce yourself and share what passionate you about this industry."
+]
+
+
+def intro_clips(formats=('mp3',)):
+    """Every introduction clip in every format as {filename: text}"""
+    clips = {}
+    for ext in formats:
+        for i, text in enumerate(RECON_INTRODUCTIONS, 1):
+            clips[f"recon_intro_{i}.{ext}"] = text
+        for i, text in enumerate(USER_INTRODUCTIONS, 1):
+            clips[f"user_intro_{i}.{ext}"] = text
+    return clips
+
+
+class IntroAudioPrecompute:
+    """
+    Manifest-driven, parallel builder for the introduction clips
+
+    `synthesize(text, path)` writes one clip and returns a truthy value on
+    success. `settings` should describe everything else that changes the
+    audio (voice, prosody) so a settings change rebuilds every clip. Each
+    clip is built in every one of `formats`.
+    """
+
+    def __init__(self, synthesize, directory=INTRO_DIR, settings='', max_workers=4, formats=('mp3',)):
+        self.synthesize = synthesize
+        self.directory = directory
+        self.settings = settings
+        self.max_workers = max_workers
+        self.clips = intro_clips(formats)
+        self._manifest_lock = threading.Lock()
+        self._manifest_cache = None  # (mtime_ns, size, manifest)
+        self._clip_locks = {name: threading.Lock() for name in self.clips}
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def clip_hash(self, text):
+        return hashlib.sha256(f"{self.settings}\x1f{text}".encode('utf-8')).hexdigest()
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def load_manifest(self):
+        """The manifest, read again only when the file changed; callers must not modify it"""
+        try:
+            stat = os.stat(self.manifest_path)
+        except OSError:
+            return {}
+        cached = self._manifest_cache
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        self._manifest_cache = (stat.st_mtime_ns, stat.st_size, manifest)
+        return manifest
+
+    def is_fresh(self, filename, manifest=None):
+        manifest = self.load_manifest() if manifest is None else manifest
+        if not os.path.exists(self.path(filename)):
+            return False
+        recorded = manifest.get(filename)
+        # Clips from before the manifest existed are adopted as they are
+        return recorded is None or recorded == self.clip_hash(self.clips[filename])
+
+    def stale_clips(self, force=False, formats=None):
+        manifest = self.load_manifest()
+        return [name for name in self.clips
+                if (formats is None or name.rsplit('.', 1)[1] in formats)
+                and (force or not self.is_fresh(name, manifest))]
+
+    def precompute(self, force=False, formats=None):
+        """
+        Build every missing or stale clip in parallel, returns (built, failed)
+
+        `formats` limits the build to clips with those extensions.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self.adopt_existing()
+        stale = self.stale_clips(force, formats)
+        if not stale:
+            print("[DEBUG] Introduction audios are up to date")
+            return [], []
+
+        print(f"[DEBUG] Building {len(stale)} introduction audios with {self.max_workers} workers...")
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='intro-audio') as pool:
+            results = dict(zip(stale, pool.map(lambda name: self._build(name, force), stale)))
+
+        built = [name for name, ok in results.items() if ok]
+        failed = [name for name, ok in results.items() if not ok]
+        for name in failed:
+            print(f"[ERROR] Both TTS methods failed for {name}")
+        return built, failed
+
+    def ensure(self, filename, manifest=None):
+        """Return the path of a clip, synthesizing it now if it is missing or stale"""
+        if self.is_fresh(filename, manifest) or self._build(filename):
+            return self.path(filename)
+        return None
+
+    def adopt_existing(self):
+        """Record clips that predate the manifest so they are not rebuilt"""
+        with self._manifest_lock:
+            manifest = dict(self.load_manifest())
+            changed = False
+            for name, text in self.clips.items():
+                if name not in manifest and os.path.exists(self.path(name)):
+                    manifest[name] = self.clip_hash(text)
+                    changed = True
+            if changed:
+                self._save_manifest(manifest)
+
+    def _build(self, filename, force=False):
+        # One synthesis per clip even if several sessions need it at once
+        with self._clip_locks[filename]:
+            if not force and self.is_fresh(filename):
+                return True
+            text = self.clips[filename]
+            print(f"[DEBUG] Generating introduction audio {filename}...")
+            if not self.synthesize(text, self.path(filename)):
+                return False
+            with self._manifest_lock:
+                manifest = dict(self.load_manifest())
+                manifest[filename] = self.clip_hash(text)
+                self._save_manifest(manifest)
+            return True
+
+    def _save_manifest(self, manifest):
+        tmp = f"{self.manifest_path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
@@ -0,0 +1,336 @@
+"""
+Gateway for every LLM call the app makes.
+
+Calls are shaped by a token bucket sized to the API quota and a cap on
+concurrent requests, identical shared prompts in flight are coalesced into a
+single call, and results can be cached for a TTL. The output token cap is
+passed to the model as max_output_tokens. The model backend is any object
+with a GenerativeModel-compatible generate_content, so tests and load tests
+can use the local fake.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+
+class RateLimited(Exception):
+    """Raised when no rate-limit token became available in time"""
+
+
+class CallAbandoned(Exception):
+    """Set on a coalesced call whose owner was cancelled, followers retry it"""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, timeout=None):
+        """
+        Take one token now, returns how long to wait before using it
+
+        Returns None (taking nothing) if that wait would exceed timeout.
+        Callers sleep in whatever way suits them, blocking or async.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if timeout is not None and wait > timeout:
+                return None
+            self._tokens -= 1
+            return wait
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting for it if needed. Returns False on timeout."""
+        wait = self.reserve(timeout)
+        if wait is None:
+            return False
+        time.sleep(wait)
+        return True
+
+
+def is_rate_limit_error(error):
+    """Whether the API rejected a call for exceeding the quota (HTTP 429)"""
+    return type(error).__name__ in ('ResourceExhausted', 'TooManyRequests') or '429' in str(error)
+
+
+class LLMGateway:
+    """
+    Rate-shaped, concurrency-limited, coalescing front for a model backend
+
+    `backend` is a zero-argument callable returning the model, so heavy
+    clients are only built on first use.
+    """
+
+    def __init__(self, backend, requests_per_minute=600, burst=20, max_concurrency=16,
+                 acquire_timeout=60, cache_ttl=0, cache_size=512, max_retries=2,
+                 retry_backoff=2.0, sample_size=500):
+        self.backend = backend
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.acquire_timeout = acquire_timeout
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # key -> (expires_at, text)
+        self._inflight = {}
+        self._latencies = deque(maxlen=sample_size)
+        self._waits = deque(maxlen=sample_size)
+        self._in_use = 0
+        self.counters = {'calls': 0, 'coalesced': 0, 'cache_hits': 0, 'errors': 0,
+                         'rate_limited': 0, 'retries': 0, 'streams': 0}
+
+    @staticmethod
+    def make_key(prompt, generation_config):
+        raw = json.dumps([prompt, generation_config], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def build_config(max_tokens, generation_config):
+        config = dict(generation_config or {})
+        if max_tokens:
+            config.setdefault('max_output_tokens', max_tokens)
+        return config
+
+    def generate(self, prompt, max_tokens=None, generation_config=None, shared=True):
+        """
+        Return the response text for a prompt, raises on failure
+
+        Shared calls are coalesced with identical calls in flight and cached
+        for cache_ttl seconds. Pass shared=False for prompts that should
+        give a different answer every time (e.g. sampling questions).
+        """
+        config = self.build_config(max_tokens, generation_config)
+        if not shared:
+            return self._call(prompt, config)
+
+        while True:
+            key, hit, future, owner = self._lookup(prompt, config)
+            if hit is not None:
+                return hit
+            if owner:
+                return self._settle(key, future, lambda: self._call(prompt, config))
+            try:
+                return future.result()
+            except CallAbandoned:
+                # The owner went away, take the call over or join whoever did
+                continue
+
+    async def agenerate(self, prompt, max_tokens=None, generation_config=None, shared=True):
+        """
+        Async generate() for the asyncio generation engine
+
+        Shares the rate limit, concurrency cap, coalescing and cache with the
+        blocking calls, and uses the backend's generate_content_async.
+        """
+        config = self.build_config(max_tokens, generation_config)
+        if not shared:
+            return await self._acall(prompt, config)
+
+        while True:
+            key, hit, future, owner = self._lookup(prompt, config)
+            if hit is not None:
+                return hit
+            if owner:
+                break
+            try:
+                # Shielded, so cancelling a follower leaves the shared call alone
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except CallAbandoned:
+                continue
+        try:
+            text = await self._acall(prompt, config)
+        except Exception as e:
+            # Re-raises e after failing every coalesced caller
+            self._settle(key, future, None, error=e)
+        except BaseException:
+            # Cancelled: only this caller sees it, a follower takes the call over
+            self._abandon(key, future)
+            raise
+        return self._settle(key, future, lambda: text)
+
+    def _lookup(self, prompt, config):
+        """Returns (key, cached text, in-flight future, whether this caller owns the call)"""
+        key = self.make_key(prompt, config)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                self.counters['cache_hits'] += 1
+                return key, cached[1], None, False
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.counters['coalesced'] += 1
+            return key, None, future, owner
+
+    def _settle(self, key, future, produce, error=None):
+        """Run the owner's call and hand its result (or error) to every coalesced caller"""
+        if error is None:
+            try:
+                text = produce()
+            except BaseException as e:
+                error = e
+        with self._lock:
+            del self._inflight[key]
+            if error is None and self.cache_ttl > 0:
+                self._cache[key] = (time.monotonic() + self.cache_ttl, text)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        if error is not None:
+            future.set_exception(error)
+            raise error
+        future.set_result(text)
+        return text
+
+    def _abandon(self, key, future):
+        """Drop an in-flight call without a result, its followers retry"""
+        with self._lock:
+            del self._inflight[key]
+        future.set_exception(CallAbandoned())
+
+    def stream(self, prompt, max_tokens=None, generation_config=None):
+        """Yield response text chunks as they are generated, holding a concurrency slot throughout"""
+        config = self.build_config(max_tokens, generation_config)
+        started = self._acquire()
+        with self._lock:
+            self.counters['streams'] += 1
+        try:
+            response = self.backend().generate_content(prompt, stream=True, **self._config_kwargs(config))
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. safety metadata) are skipped
+                    continue
+                if text:
+                    yield text
+        except Exception:
+            with self._lock:
+                self.counters['errors'] += 1
+            raise
+        finally:
+            self._release(started)
+
+    def _call(self, prompt, config):
+        attempt = 0
+        while True:
+            started = self._acquire()
+            try:
+                response = self.backend().generate_content(prompt, **self._config_kwargs(config))
+                return response.text
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                with self._lock:
+                    self.counters['rate_limited' if rate_limited else 'errors'] += 1
+                if not rate_limited or attempt >= self.max_retries:
+                    raise
+            finally:
+                self._release(started)
+            # Quota exceeded despite the bucket (e.g. shared with other hosts), back off and retry
+            attempt += 1
+            with self._lock:
+                self.counters['retries'] += 1
+            time.sleep(self.retry_backoff * attempt)
+
+    async def _acall(self, prompt, config):
+        attempt = 0
+        while True:
+            started = await self._aacquire()
+            try:
+                model = self.backend()
+                if hasattr(model, 'generate_content_async'):
+                    response = await model.generate_content_async(prompt, **self._config_kwargs(config))
+                else:
+                    response = await asyncio.to_thread(model.generate_content, prompt, **self._config_kwargs(config))
+                return response.text
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                with self._lock:
+                    self.counters['rate_limited' if rate_limited else 'errors'] += 1
+                if not rate_limited or attempt >= self.max_retries:
+                    raise
+            finally:
+                self._release(started)
+            attempt += 1
+            with self._lock:
+                self.counters['retries'] += 1
+            await asyncio.sleep(self.retry_backoff * attempt)
+
+    @staticmethod
+    def _config_kwargs(config):
+        return {'generation_config': config} if config else {}
+
+    def _acquire(self):
+        waiting = time.monotonic()
+        if not self.bucket.acquire(timeout=self.acquire_timeout):
+            raise RateLimited(f"No LLM rate-limit token within {self.acquire_timeout}s")
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise RateLimited(f"No free LLM slot within {self.acquire_timeout}s")
+        started = time.monotonic()
+        with self._lock:
+            self._waits.append(started - waiting)
+            self._in_use += 1
+            self.counters['calls'] += 1
+        return started
+
+    async def _aacquire(self):
+        waiting = time.monotonic()
+        wait = self.bucket.reserve(self.acquire_timeout)
+        if wait is None:
+            raise RateLimited(f"No LLM rate-limit token within {self.acquire_timeout}s")
+        await asyncio.sleep(wait)
+        # The slot semaphore is shared with blocking callers, so poll it instead of blocking the loop
+        while not self._slots.acquire(blocking=False):
+            if time.monotonic() - waiting > self.acquire_timeout:
+                raise RateLimited(f"No free LLM slot within {self.acquire_timeout}s")
+            await asyncio.sleep(0.02)
+        started = time.monotonic()
+        with self._lock:
+            self._waits.append(started - waiting)
+            self._in_use += 1
+            self.counters['calls'] += 1
+        return started
+
+    def _release(self, started):
+        self._slots.release()
+        with self._lock:
+            self._in_use -= 1
+            self._latencies.append(time.monotonic() - started)
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            waits = list(self._waits)
+            stats = dict(self.counters)
+            stats.update({
+                'in_flight': self._in_use,
+                'max_concurrency': self.max_concurrency,
+                'cache_entries': len(self._cache),
+                'latency_avg': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+                'latency_p50': round(latencies[len(latencies) // 2], 3) if latencies else 0.0,
+                'latency_p95': round(latencies[int(len(latencies) * 0.95)], 3) if latencies else 0.0,
+                'wait_avg': round(sum(waits) / len(waits), 3) if waits else 0.0
+            })
+            return stats
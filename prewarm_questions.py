@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Question Bank Prewarmer for Recon AI
+Fills the question bank for common interview configs ahead of time, so their
+sessions are ready without any Gemini or TTS calls.
+
+The configs file is a JSON list of setup payloads, for example:
+    [
+        {"skills": ["Python", "SQL"], "level": "mid"},
+        {"company": "Google", "role": "Software Engineer", "level": "senior"}
+    ]
+
+Usage: python prewarm_questions.py configs.json [--size 30] [--batch 10] [--workers 4]
+"""
+
+import argparse
+import json
+import sys
+
+
+def prewarm_config(app, config, size, batch, workers, max_rounds):
+    """Add questions (with answers and cached audio) until the config has `size`, returns how many were added"""
+    bank_key = app.normalize_config(config)
+    level = config.get('level', 'mid')
+    added = 0
+
+    def bank_question(question):
+        nonlocal added
+        if not question['answer'] or question['answer'] == app.GEMINI_ERROR_RESPONSE:
+            return
+        audio_path = question['audio_url'][1:] if question['audio_url'] else None
+        if app.question_bank.add(bank_key, question['text'], question['answer'], audio_path):
+            added += 1
+
+    for _ in range(max_rounds):
+        missing = size - app.question_bank.count(bank_key)
+        if missing <= 0:
+            break
+        prompt = app.build_batch_prompt(config, min(batch, missing), level)
+        response = app.get_gemini_response(prompt, max_tokens=300 * batch,
+                                           generation_config={'response_mime_type': 'application/json'},
+                                           shared=False)
+        items = app.parse_question_batch(response, min(batch, missing))
+        if not items:
+            print(f"[WARNING] No questions returned for {bank_key}")
+            continue
+
+        pipeline = app.QuestionPipeline(
+            answer_fn=lambda text: app.generate_model_answer(text, level),
+            audio_fn=lambda index, text: app.generate_question_audio('prewarm', index, text),
+            on_ready=bank_question,
+            max_workers=workers
+        )
+        try:
+            for item in items:
+                pipeline.submit(item['question'], answer=item['answer'])
+            pipeline.wait()
+        finally:
+            pipeline.shutdown()
+
+    return added
+
+
+def main():
+    """Main function to prewarm the question bank"""
+    parser = argparse.ArgumentParser(description="Prewarm the Recon AI question bank")
+    parser.add_argument('configs', help="JSON file with a list of interview configs")
+    parser.add_argument('--size', type=int, help="questions per config (default: QUESTION_BANK_WARM_SIZE)")
+    parser.add_argument('--batch', type=int, default=10, help="questions requested per Gemini call")
+    parser.add_argument('--workers', type=int, default=4, help="concurrent answer/audio generations")
+    parser.add_argument('--max-rounds', type=int, default=10, help="Gemini calls per config at most")
+    args = parser.parse_args()
+
+    import app
+    app.create_app(start_services=False)
+    if app.question_bank is None:
+        print("ERROR: The question bank is disabled (QUESTION_BANK=false)")
+        return False
+
+    with open(args.configs) as f:
+        configs = json.load(f)
+    size = args.size or app.QUESTION_BANK_WARM_SIZE
+
+    complete = True
+    for config in configs:
+        bank_key = app.normalize_config(config)
+        added = prewarm_config(app, config, size, args.batch, args.workers, args.max_rounds)
+        total = app.question_bank.count(bank_key)
+        print(f"[DEBUG] {bank_key}: {total}/{size} questions ({added} added)")
+        complete = complete and total >= size
+
+    if complete:
+        print("[SUCCESS] Question bank is warm for every config")
+    else:
+        print("[WARNING] Some configs are still below the warm size")
+    return complete
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
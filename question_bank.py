@@ -0,0 +1,127 @@
+"""
+Persistent bank of generated interview questions, keyed by normalized config.
+
+Questions, their model answers and the path of their cached audio are kept
+per config key. Sessions for a config whose bank is warm are served from it
+without any Gemini or TTS call; sampling prefers the least served questions
+so consecutive sessions get varied sets.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+def _normalize(value):
+    return ' '.join(str(value).split()).casefold()
+
+
+def normalize_config(config):
+    """
+    Bank key for an interview config
+
+    Skills sessions are keyed by their sorted, case-folded skills and level;
+    company sessions by company, role and level.
+    """
+    level = _normalize(config.get('level', 'mid'))
+    if config.get('skills'):
+        skills = sorted({_normalize(skill) for skill in config['skills'] if str(skill).strip()})
+        return f"skills:{','.join(skills)}|level:{level}"
+    if config.get('company'):
+        role = _normalize(config.get('role') or 'Software Engineer')
+        return f"company:{_normalize(config['company'])}|role:{role}|level:{level}"
+    return f"general|level:{level}"
+
+
+class QuestionBank:
+    """
+    SQLite-backed question bank, safe to share between threads and processes
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "id INTEGER PRIMARY KEY, config_key TEXT NOT NULL, text_hash TEXT NOT NULL, "
+            "question TEXT NOT NULL, answer TEXT NOT NULL, audio_path TEXT, "
+            "served INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, "
+            "UNIQUE (config_key, text_hash))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS questions_by_key ON questions (config_key, served)")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _text_hash(question):
+        return hashlib.sha256(_normalize(question).encode('utf-8')).hexdigest()
+
+    def add(self, config_key, question, answer, audio_path=None):
+        """Store a question, returns False if the config already has it"""
+        cursor = self._connection().execute(
+            "INSERT OR IGNORE INTO questions (config_key, text_hash, question, answer, audio_path, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (config_key, self._text_hash(question), question, answer, audio_path, time.time())
+        )
+        return cursor.rowcount > 0
+
+    def set_audio(self, config_key, question, audio_path):
+        self._connection().execute(
+            "UPDATE questions SET audio_path = ? WHERE config_key = ? AND text_hash = ?",
+            (audio_path, config_key, self._text_hash(question))
+        )
+
+    def count(self, config_key):
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM questions WHERE config_key = ?", (config_key,)
+        ).fetchone()[0]
+
+    def sample(self, config_key, n):
+        """
+        Draw n distinct questions, least served first, and count them as served
+
+        Returns dicts with question, answer and audio_path (None when the
+        cached audio is gone and has to be synthesized again).
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT id, question, answer, audio_path FROM questions WHERE config_key = ? "
+                "ORDER BY served, RANDOM() LIMIT ?", (config_key, n)
+            ).fetchall()
+            conn.executemany("UPDATE questions SET served = served + 1 WHERE id = ?",
+                             [(row[0],) for row in rows])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        return [
+            {
+                'question': question,
+                'answer': answer,
+                'audio_path': audio_path if audio_path and os.path.exists(audio_path) else None
+            }
+            for _, question, answer, audio_path in rows
+        ]
+
+    def stats(self):
+        rows = self._connection().execute(
+            "SELECT config_key, COUNT(*), SUM(served) FROM questions GROUP BY config_key"
+        ).fetchall()
+        return {key: {'questions': count, 'served': served} for key, count, served in rows}
@@ -0,0 +1,277 @@
+"""
+Pipelined question preparation for Recon AI interview sessions.
+
+Model answers and question audio are produced concurrently on a small
+per-session worker pool, but questions are always published in order so the
+interview can start as soon as question 1 is ready.
+"""
+
+import json
+import re
+import threading
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+
+from generation_executor import JobCancelled
+
+
+class QuestionPipeline:
+    """
+    Bounded worker pool that prepares questions concurrently and publishes them in order
+    """
+
+    def __init__(self, answer_fn, audio_fn, on_ready, max_workers=4, wait_for_audio=True, on_complete=None,
+                 token=None):
+        self.answer_fn = answer_fn
+        self.audio_fn = audio_fn
+        self.on_ready = on_ready
+        # Called with each question once its audio is done too, which may be after on_ready
+        self.on_complete = on_complete
+        # Once the token is cancelled nothing new starts and nothing more is published
+        self.token = token
+        # When audio is streamed on demand, questions are published as soon as
+        # their answer is ready and audio keeps warming the cache in the background
+        self.wait_for_audio = wait_for_audio
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                            thread_name_prefix='question-prep')
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._pending = {}
+        self._submitted = 0
+        self._next_index = 1
+        self._futures = []
+        # Texts of the submitted questions, in order
+        self.texts = []
+
+    def submit(self, text, answer=None, audio_url=None):
+        """
+        Schedule answer and audio generation for the next question, returns its index
+
+        A model answer or audio that is already known (e.g. from a batched
+        response or the question bank) is used as-is and not generated again.
+        Returns None without scheduling anything once the token is cancelled.
+        """
+        if self._cancelled():
+            return None
+        with self._lock:
+            self._submitted += 1
+            index = self._submitted
+            self.texts.append(text)
+            entry = {'text': text}
+            self._pending[index] = entry
+
+        # Submission order is FIFO, so question 1 always gets the first free workers
+        if answer:
+            entry['answer'] = Future()
+            entry['answer'].set_result(answer)
+        else:
+            entry['answer'] = self._executor.submit(self.run, self.answer_fn, text)
+        if audio_url:
+            entry['audio'] = Future()
+            entry['audio'].set_result(audio_url)
+        else:
+            entry['audio'] = self._executor.submit(self.run, self.audio_fn, index, text)
+        self._futures.extend([entry['answer'], entry['audio']])
+        entry['answer'].add_done_callback(lambda _: self._publish_ready())
+        entry['audio'].add_done_callback(lambda _: self._publish_ready())
+        return index
+
+    def wait(self):
+        """Block until every submitted question has been published and its audio generated"""
+        with self._done:
+            while self._next_index <= self._submitted:
+                self._done.wait()
+        wait_futures(list(self._futures))
+        return self._submitted
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _cancelled(self):
+        return self.token is not None and self.token.cancelled()
+
+    def run(self, fn, *args, **kwargs):
+        """
+        Run one unit of the session's work (e.g. an LLM call) under the token
+
+        Raises JobCancelled instead of starting after a cancel; work that was
+        already running is counted as late work on the token.
+        """
+        if self._cancelled():
+            raise JobCancelled()
+        result = fn(*args, **kwargs)
+        if self._cancelled():
+            self.token.record_late_work()
+        return result
+
+    def _publish_ready(self):
+        with self._done:
+            if self._cancelled():
+                self._pending.clear()
+                self._next_index = self._submitted + 1
+            while True:
+                entry = self._pending.get(self._next_index)
+                if not entry or 'audio' not in entry:
+                    break
+                if not entry['answer'].done():
+                    break
+                if self.wait_for_audio and not entry['audio'].done():
+                    break
+
+                index = self._next_index
+                del self._pending[index]
+                self._next_index += 1
+
+                question = {
+                    'text': entry['text'],
+                    'answer': self._result(entry['answer'], index, 'answer'),
+                    'audio_url': self._result(entry['audio'], index, 'audio') if entry['audio'].done() else None,
+                    'index': index
+                }
+                # on_ready may change the question it is given
+                completed = dict(question)
+                try:
+                    self.on_ready(question)
+                except Exception as e:
+                    print(f"[ERROR] Failed to publish question {index}: {str(e)}")
+                    traceback.print_exc()
+                if self.on_complete:
+                    entry['audio'].add_done_callback(lambda future, completed=completed: self._complete(future, completed))
+
+            self._done.notify_all()
+
+    def _complete(self, future, question):
+        question['audio_url'] = self._result(future, question['index'], 'audio')
+        try:
+            self.on_complete(question)
+        except Exception as e:
+            print(f"[ERROR] Failed to complete question {question['index']}: {str(e)}")
+            traceback.print_exc()
+
+    @staticmethod
+    def _result(future, index, stage):
+        try:
+            return future.result()
+        except JobCancelled:
+            return None
+        except Exception as e:
+            print(f"[ERROR] {stage} generation failed for question {index}: {str(e)}")
+            return None
+
+
+_NUMBERED_LINE = re.compile(r'^\s*(?:\*\*)?\s*(?:Q(?:uestion)?\s*)?\d+\s*[.):-]\s*(?:\*\*)?\s*', re.IGNORECASE)
+
+
+def normalize_question(text):
+    """Comparison form of a question: whitespace collapsed and case folded"""
+    return ' '.join(text.split()).casefold()
+
+
+def unique_questions(questions, seen):
+    """
+    Yield the questions whose normalized text is not in `seen` yet, adding them to it
+
+    Keeps a re-request from repeating questions of the batch it completes.
+    """
+    for text in questions:
+        key = normalize_question(text)
+        if key in seen:
+            print(f"[DEBUG] Skipping repeated question: {text[:50]}")
+            continue
+        seen.add(key)
+        yield text
+
+
+def clean_question_line(line):
+    """Strip list numbering and markdown emphasis from a question line, None if not numbered"""
+    match = _NUMBERED_LINE.match(line)
+    if not match:
+        return None
+    text = line[match.end():].strip().strip('*').strip()
+    return text or None
+
+
+def iter_numbered_questions(chunks, limit=None):
+    """
+    Yield each numbered question as soon as its line is complete in a stream of text chunks
+    """
+    buffer = ''
+    plain_lines = []
+    emitted = 0
+
+    def handle(line):
+        line = line.strip()
+        if not line:
+            return None
+        question = clean_question_line(line)
+        if question is None:
+            plain_lines.append(line)
+        return question
+
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            question = handle(line)
+            if question:
+                yield question
+                emitted += 1
+                if limit and emitted >= limit:
+                    return
+
+    question = handle(buffer)
+    if question:
+        yield question
+        emitted += 1
+    elif emitted == 0:
+        # The model ignored the numbering instruction, treat every line as a question
+        for line in plain_lines[:limit]:
+            yield line
+
+
+def parse_question_batch(raw, limit):
+    """
+    Validate a batched JSON response of questions and model answers
+
+    Accepts either a list of {"question", "answer"} objects or an object with a
+    "questions" list. Invalid items are dropped and items without a usable
+    answer keep answer=None so only those are filled in separately.
+    """
+    text = (raw or '').strip()
+    if text.startswith('```'):
+        text = text.strip('`')
+        if text.lower().startswith('json'):
+            text = text[4:]
+
+    try:
+        payload = json.loads(text)
+    except ValueError as e:
+        print(f"[WARNING] Batched question response is not valid JSON: {str(e)}")
+        return []
+
+    if isinstance(payload, dict):
+        payload = payload.get('questions')
+    if not isinstance(payload, list):
+        print("[WARNING] Batched question response does not contain a question list")
+        return []
+
+    items = []
+    seen = set()
+    for item in payload:
+        if not isinstance(item, dict):
+            continue
+        question = item.get('question')
+        if not isinstance(question, str) or not question.strip():
+            continue
+        question = clean_question_line(question) or question.strip()
+        if normalize_question(question) in seen:
+            continue
+        seen.add(normalize_question(question))
+
+        answer = item.get('answer')
+        if not isinstance(answer, str) or not answer.strip():
+            answer = None
+        items.append({'question': question, 'answer': answer and answer.strip()})
+        if len(items) >= limit:
+            break
+    return items
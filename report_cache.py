@@ -0,0 +1,72 @@
+"""
+Cache of generated report feedback, keyed by the inputs of the feedback prompt.
+
+The feedback prompt only depends on the topic, level, session type and the
+answered/total counts, so sessions that share those reuse one Gemini call.
+Concurrent misses for the same key wait for a single generation.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class FeedbackCache:
+    """
+    Process-local LRU of feedback text with singleflight generation
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(topic, level, session_type, answered, total):
+        """Hash of every input of the feedback prompt"""
+        raw = json.dumps([topic, level, session_type, answered, total])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get_or_create(self, key, generate):
+        """
+        Return (feedback, cached) for a key, calling generate() on a miss
+
+        generate() returns the feedback text, or None on failure. Failures
+        are handed back to the caller (as None) but never cached.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key], True
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+
+        if not owner:
+            return future.result(), True
+
+        feedback = None
+        try:
+            feedback = generate()
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if feedback is not None:
+                    self._entries[key] = feedback
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            future.set_result(feedback)
+        return feedback, False
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
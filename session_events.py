@@ -0,0 +1,132 @@
+"""
+Per-session event bus used to push preparation progress to the browser.
+
+Background generators publish events (intro_ready, question_ready,
+all_questions_ready, error) as they update session state. Clients consume them
+over Server-Sent Events or a long-poll endpoint instead of polling status.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+
+# Events after which nothing more will be published for a session
+TERMINAL_EVENTS = ('all_questions_ready', 'error')
+
+
+class SessionEventBus:
+    """
+    Thread-safe, replayable event log per session
+    """
+
+    def __init__(self, history_limit=200):
+        self.history_limit = history_limit
+        self._lock = threading.Lock()
+        self._conditions = {}
+        self._events = {}
+        self._last_id = {}
+
+    def _condition(self, session_id):
+        # Called with the lock held, one condition per session avoids waking every subscriber
+        condition = self._conditions.get(session_id)
+        if condition is None:
+            condition = self._conditions[session_id] = threading.Condition(self._lock)
+        return condition
+
+    def publish(self, session_id, event, data=None):
+        """Append an event for a session and wake up its subscribers, returns the event id"""
+        with self._lock:
+            event_id = self._last_id.get(session_id, 0) + 1
+            self._last_id[session_id] = event_id
+            log = self._events.setdefault(session_id, deque(maxlen=self.history_limit))
+            log.append({'id': event_id, 'event': event, 'data': data or {}})
+            self._condition(session_id).notify_all()
+        return event_id
+
+    def events_after(self, session_id, last_id=0):
+        with self._lock:
+            return [e for e in self._events.get(session_id, ()) if e['id'] > last_id]
+
+    def wait(self, session_id, last_id=0, timeout=25):
+        """Return events newer than last_id, blocking up to timeout seconds for the first one"""
+        with self._lock:
+            self._condition(session_id).wait_for(
+                lambda: self._last_id.get(session_id, 0) > last_id,
+                timeout=timeout
+            )
+            return [e for e in self._events.get(session_id, ()) if e['id'] > last_id]
+
+    def is_finished(self, session_id):
+        with self._lock:
+            log = self._events.get(session_id)
+            return bool(log) and log[-1]['event'] in TERMINAL_EVENTS
+
+    def discard(self, session_id):
+        with self._lock:
+            self._events.pop(session_id, None)
+            self._last_id.pop(session_id, None)
+            condition = self._conditions.pop(session_id, None)
+            if condition:
+                condition.notify_all()
+
+
+def format_sse(event):
+    """Serialize an event in Server-Sent Events wire format"""
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+class StoreEventBus(SessionEventBus):
+    """
+    Event log kept inside the shared session record, so every worker process sees it
+
+    Subscribers in the publishing process are woken immediately, subscribers
+    in other processes notice new events within poll_interval seconds.
+    """
+
+    def __init__(self, store, poll_interval=0.5, history_limit=200):
+        super().__init__(history_limit=history_limit)
+        self.store = store
+        self.poll_interval = poll_interval
+
+    def publish(self, session_id, event, data=None):
+        published = {}
+
+        def append(session_data):
+            event_id = session_data.get('event_seq', 0) + 1
+            session_data['event_seq'] = event_id
+            log = session_data.setdefault('events', [])
+            log.append({'id': event_id, 'event': event, 'data': data or {}})
+            del log[:-self.history_limit]
+            published['id'] = event_id
+
+        self.store.update(session_id, append)
+        with self._lock:
+            self._condition(session_id).notify_all()
+        return published.get('id')
+
+    def events_after(self, session_id, last_id=0):
+        session_data = self.store.get(session_id) or {}
+        return [e for e in session_data.get('events', []) if e['id'] > last_id]
+
+    def wait(self, session_id, last_id=0, timeout=25):
+        deadline = time.monotonic() + timeout
+        while True:
+            events = self.events_after(session_id, last_id)
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0:
+                return events
+            with self._lock:
+                self._condition(session_id).wait(min(self.poll_interval, remaining))
+
+    def is_finished(self, session_id):
+        session_data = self.store.get(session_id) or {}
+        log = session_data.get('events')
+        return bool(log) and log[-1]['event'] in TERMINAL_EVENTS
+
+    def discard(self, session_id):
+        # Events are deleted together with the session record
+        with self._lock:
+            condition = self._conditions.pop(session_id, None)
+            if condition:
+                condition.notify_all()
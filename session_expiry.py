@@ -0,0 +1,146 @@
+"""
+Session expiry: a deadline heap checked against shared activity, plus budgets.
+
+Every request for a session pushes its idle deadline forward in this
+worker's heap, and at most every `persist_interval` seconds the activity is
+written to the session store. Sweeps pop only the deadlines that have
+passed, so their cost scales with the number of expired sessions rather than
+with every live session. A popped session may have been active on another
+worker, so the caller re-checks the store's last activity and TTL (`adopt`)
+before removing it. Session count and disk budgets are checked against the
+store's running totals, and only when one is exceeded are the least recently
+active sessions read (oldest first) and evicted.
+"""
+
+import heapq
+import os
+import shutil
+import threading
+import time
+
+
+class SessionExpiry:
+    """
+    This worker's idle-deadline min-heap, with lazy invalidation
+    """
+
+    def __init__(self, ttl=3600, persist_interval=30):
+        self.ttl = ttl
+        self.persist_interval = persist_interval
+        self._lock = threading.Lock()
+        self._heap = []  # (deadline, session_id), may hold stale entries
+        self._deadlines = {}
+        self._ttls = {}  # per-session overrides of ttl
+        self._persisted = {}  # session_id -> when its activity was last written to the store
+
+    def touch(self, session_id, now=None, ttl=None):
+        """
+        Record activity, pushing the session's idle deadline forward
+
+        A ttl given here sticks to the session for later touches (e.g. short
+        lived speculative sessions) until another ttl is given. Returns True
+        when the activity should be written to the session store: on a new
+        ttl, or when the last write is persist_interval seconds old.
+        """
+        now = now or time.time()
+        with self._lock:
+            if ttl is not None:
+                self._ttls[session_id] = ttl
+            self._schedule_locked(session_id, now + self._ttls.get(session_id, self.ttl))
+            if ttl is None and now - self._persisted.get(session_id, 0) < self.persist_interval:
+                return False
+            self._persisted[session_id] = now
+            return True
+
+    def adopt(self, session_id, last_active, ttl=None, now=None):
+        """
+        Reschedule a session from the activity in the session store
+
+        Returns False if that activity is expired too. Shared activity lags
+        the real last request by up to persist_interval, which is allowed for.
+        """
+        ttl = ttl or self.ttl
+        deadline = last_active + ttl + self.persist_interval
+        if deadline <= (now or time.time()):
+            return False
+        with self._lock:
+            self._ttls[session_id] = ttl
+            self._schedule_locked(session_id, deadline)
+        return True
+
+    def forget(self, session_id):
+        with self._lock:
+            self._drop_locked(session_id)
+
+    def due(self, now=None):
+        """
+        Pop every session whose idle deadline in this worker has passed
+
+        They are forgotten by the heap; the caller checks them against the
+        session store (see adopt) and deletes the ones that really expired.
+        """
+        now = now or time.time()
+        removed = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, session_id = heapq.heappop(self._heap)
+                if self._deadlines.get(session_id) == deadline:
+                    removed.append(session_id)
+                    self._drop_locked(session_id)
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._deadlines),
+                'heap_entries': len(self._heap)
+            }
+
+    def __contains__(self, session_id):
+        with self._lock:
+            return session_id in self._deadlines
+
+    def __len__(self):
+        with self._lock:
+            return len(self._deadlines)
+
+    def _schedule_locked(self, session_id, deadline):
+        self._deadlines[session_id] = deadline
+        heapq.heappush(self._heap, (deadline, session_id))
+        # Stale heap entries are skipped lazily; rebuild once they dominate
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(d, sid) for sid, d in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def _drop_locked(self, session_id):
+        self._deadlines.pop(session_id, None)
+        self._ttls.pop(session_id, None)
+        self._persisted.pop(session_id, None)
+
+
+def select_evictions(oldest, count, disk_bytes, max_sessions, disk_budget):
+    """
+    Sessions to evict to get back under the session count and disk budgets
+
+    `oldest` is the session store's oldest() listing and `count` and
+    `disk_bytes` its totals(). May return all of `oldest` and still leave a
+    budget exceeded, then the caller reads the next oldest sessions.
+    """
+    evicted = []
+    for session_id, _, _, used in oldest:
+        if count <= max_sessions and disk_bytes <= disk_budget:
+            break
+        evicted.append(session_id)
+        count -= 1
+        disk_bytes -= used or 0
+    return evicted
+
+
+def session_dir(root, session_id, *parts):
+    """Directory holding all of a session's artifacts (answers, transcripts, ...)"""
+    return os.path.join(root, session_id, *parts)
+
+
+def remove_session_dir(root, session_id):
+    """Delete every artifact of a session with a single tree removal"""
+    shutil.rmtree(session_dir(root, session_id), ignore_errors=True)
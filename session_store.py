@@ -0,0 +1,463 @@
+"""
+Pluggable, thread-safe interview session storage.
+
+All session reads return snapshots and all writes go through `update`, which
+applies a function to the stored data atomically. The in-memory backend is
+the default; the SQLite (WAL) and Redis backends share sessions across
+gunicorn workers and hosts.
+
+Session data must be JSON-serializable. Every backend round-trips it through
+JSON, so dictionary keys always come back as strings.
+
+Alongside the data, every backend keeps each session's last activity, idle
+TTL and disk usage, outside the JSON so they are cheap to write on every
+request and to list for expiry sweeps, plus running totals of sessions and
+disk bytes and an index by last activity, so budget checks never scan every
+session. Every worker sees the same values.
+"""
+
+import copy
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class SessionStore:
+    """
+    Base interface for session storage backends
+    """
+
+    def create(self, session_id, data):
+        raise NotImplementedError
+
+    def get(self, session_id):
+        """Return a snapshot of the session data, or None"""
+        raise NotImplementedError
+
+    def update(self, session_id, fn):
+        """
+        Atomically apply fn(data) to a session and store the result
+
+        fn mutates the data in place. Returns the updated snapshot, or None if
+        the session does not exist.
+        """
+        raise NotImplementedError
+
+    def delete(self, session_id):
+        raise NotImplementedError
+
+    def session_ids(self):
+        raise NotImplementedError
+
+    def touch(self, session_id, now=None, ttl=None):
+        """Record activity for a session; a ttl given here replaces its idle TTL"""
+        raise NotImplementedError
+
+    def add_usage(self, session_id, nbytes):
+        """Account disk bytes written (or, if negative, freed) for a session's artifacts"""
+        raise NotImplementedError
+
+    def activity(self, session_id):
+        """(last_active, ttl) of a session, ttl None for the default, or None if it does not exist"""
+        raise NotImplementedError
+
+    def all_activity(self):
+        """(session_id, last_active, ttl, disk_bytes) of every session"""
+        raise NotImplementedError
+
+    def oldest(self, limit):
+        """all_activity() entries of the `limit` least recently active sessions, oldest first"""
+        raise NotImplementedError
+
+    def totals(self):
+        """(number of sessions, disk bytes of all sessions), kept as running counts"""
+        raise NotImplementedError
+
+    def exists(self, session_id):
+        return self.get(session_id) is not None
+
+    def set_fields(self, session_id, **fields):
+        return self.update(session_id, lambda data: data.update(fields))
+
+    def __contains__(self, session_id):
+        return self.exists(session_id)
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local store, a dict guarded by a lock"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._sessions = {}
+        self._activity = {}  # session_id -> [last_active, ttl, disk_bytes]
+        self._disk_bytes = 0
+
+    def create(self, session_id, data):
+        with self._lock:
+            self._drop_activity(session_id)
+            self._sessions[session_id] = _normalize(data)
+            self._activity[session_id] = [time.time(), None, 0]
+
+    def get(self, session_id):
+        with self._lock:
+            data = self._sessions.get(session_id)
+            return copy.deepcopy(data) if data is not None else None
+
+    def update(self, session_id, fn):
+        with self._lock:
+            data = self._sessions.get(session_id)
+            if data is None:
+                return None
+            working = copy.deepcopy(data)
+            fn(working)
+            self._sessions[session_id] = _normalize(working)
+            return copy.deepcopy(self._sessions[session_id])
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._drop_activity(session_id)
+
+    def _drop_activity(self, session_id):
+        entry = self._activity.pop(session_id, None)
+        if entry:
+            self._disk_bytes -= entry[2]
+
+    def session_ids(self):
+        with self._lock:
+            return list(self._sessions)
+
+    def touch(self, session_id, now=None, ttl=None):
+        with self._lock:
+            entry = self._activity.get(session_id)
+            if entry:
+                entry[0] = now or time.time()
+                if ttl is not None:
+                    entry[1] = ttl
+
+    def add_usage(self, session_id, nbytes):
+        with self._lock:
+            entry = self._activity.get(session_id)
+            if entry:
+                entry[2] += nbytes
+                self._disk_bytes += nbytes
+
+    def activity(self, session_id):
+        with self._lock:
+            entry = self._activity.get(session_id)
+            return (entry[0], entry[1]) if entry else None
+
+    def all_activity(self):
+        with self._lock:
+            return [(session_id, *entry) for session_id, entry in self._activity.items()]
+
+    def oldest(self, limit):
+        with self._lock:
+            entries = heapq.nsmallest(limit, self._activity.items(), key=lambda item: item[1][0])
+            return [(session_id, *entry) for session_id, entry in entries]
+
+    def totals(self):
+        with self._lock:
+            return len(self._sessions), self._disk_bytes
+
+
+class SQLiteSessionStore(SessionStore):
+    """Store shared by every process on a host, SQLite in WAL mode"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL, "
+            "last_active REAL NOT NULL DEFAULT 0, ttl INTEGER, disk_bytes INTEGER NOT NULL DEFAULT 0)"
+        )
+        # Databases created before activity tracking get the columns added
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+        for column, definition in (('last_active', 'REAL NOT NULL DEFAULT 0'), ('ttl', 'INTEGER'),
+                                   ('disk_bytes', 'INTEGER NOT NULL DEFAULT 0')):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE sessions ADD COLUMN {column} {definition}")
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_active ON sessions (last_active)")
+
+        # Running totals kept by triggers; seeded from the table once, in the same
+        # transaction as the triggers so no write is counted twice or missed
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_totals ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), sessions INTEGER NOT NULL, disk_bytes INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS sessions_insert_totals AFTER INSERT ON sessions BEGIN "
+                "UPDATE session_totals SET sessions = sessions + 1, disk_bytes = disk_bytes + NEW.disk_bytes "
+                "WHERE id = 0; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS sessions_delete_totals AFTER DELETE ON sessions BEGIN "
+                "UPDATE session_totals SET sessions = sessions - 1, disk_bytes = disk_bytes - OLD.disk_bytes "
+                "WHERE id = 0; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS sessions_usage_totals AFTER UPDATE OF disk_bytes ON sessions BEGIN "
+                "UPDATE session_totals SET disk_bytes = disk_bytes + NEW.disk_bytes - OLD.disk_bytes "
+                "WHERE id = 0; END"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO session_totals "
+                "SELECT 0, COUNT(*), COALESCE(SUM(disk_bytes), 0) FROM sessions"
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def create(self, session_id, data):
+        now = time.time()
+        # An upsert rather than INSERT OR REPLACE, whose implicit delete skips the totals trigger
+        self._connection().execute(
+            "INSERT INTO sessions (id, data, updated_at, last_active) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at, "
+            "last_active = excluded.last_active, ttl = NULL, disk_bytes = 0",
+            (session_id, json.dumps(data), now, now)
+        )
+
+    def get(self, session_id):
+        row = self._connection().execute(
+            "SELECT data FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, session_id, fn):
+        conn = self._connection()
+        # IMMEDIATE takes the write lock up front, so read-modify-write is atomic across processes
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            data = json.loads(row[0])
+            fn(data)
+            conn.execute(
+                "UPDATE sessions SET data = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(data), time.time(), session_id)
+            )
+            conn.execute("COMMIT")
+            return _normalize(data)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, session_id):
+        self._connection().execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def session_ids(self):
+        return [row[0] for row in self._connection().execute("SELECT id FROM sessions")]
+
+    def touch(self, session_id, now=None, ttl=None):
+        self._connection().execute(
+            "UPDATE sessions SET last_active = ?, ttl = COALESCE(?, ttl) WHERE id = ?",
+            (now or time.time(), ttl, session_id)
+        )
+
+    def add_usage(self, session_id, nbytes):
+        self._connection().execute(
+            "UPDATE sessions SET disk_bytes = disk_bytes + ? WHERE id = ?", (nbytes, session_id)
+        )
+
+    def activity(self, session_id):
+        row = self._connection().execute(
+            "SELECT last_active, ttl FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def all_activity(self):
+        return [tuple(row) for row in self._connection().execute(
+            "SELECT id, last_active, ttl, disk_bytes FROM sessions"
+        )]
+
+    def oldest(self, limit):
+        return [tuple(row) for row in self._connection().execute(
+            "SELECT id, last_active, ttl, disk_bytes FROM sessions ORDER BY last_active LIMIT ?", (limit,)
+        )]
+
+    def totals(self):
+        return tuple(self._connection().execute("SELECT sessions, disk_bytes FROM session_totals").fetchone())
+
+
+class RedisSessionStore(SessionStore):
+    """Store shared across hosts, any Redis-compatible server"""
+
+    def __init__(self, url, prefix='recon:session:', ttl=None):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("Redis session store requires the redis package: pip install redis")
+        self._redis = redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.ttl = ttl
+        # Outside the session key pattern, so session_ids() does not list them
+        base = prefix.rstrip(':')
+        self.activity_key = f"{base}-activity"  # sorted set, session_id scored by last_active
+        self.ttl_key = f"{base}-ttl"  # hash, session_id -> idle TTL
+        self.disk_key = f"{base}-disk"  # hash, session_id -> disk bytes
+        self.disk_total_key = f"{base}-disk-total"  # sum of disk_key
+
+    def _key(self, session_id):
+        return f"{self.prefix}{session_id}"
+
+    def create(self, session_id, data):
+        def apply(pipe):
+            used = int(pipe.hget(self.disk_key, session_id) or 0)
+            pipe.multi()
+            pipe.set(self._key(session_id), json.dumps(data), ex=self.ttl)
+            pipe.zadd(self.activity_key, {session_id: time.time()})
+            pipe.hdel(self.ttl_key, session_id)
+            pipe.hdel(self.disk_key, session_id)
+            pipe.decrby(self.disk_total_key, used)
+        self._transaction(apply, self.disk_key)
+
+    def _transaction(self, fn, *watch):
+        # Optimistic locking, like update(): retry if a watched key changed
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(*watch)
+                    if fn(pipe) is False:
+                        pipe.unwatch()
+                        return
+                    pipe.execute()
+                    return
+                except self._redis.WatchError:
+                    continue
+
+    def get(self, session_id):
+        raw = self.client.get(self._key(session_id))
+        return json.loads(raw) if raw else None
+
+    def update(self, session_id, fn):
+        key = self._key(session_id)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    # Optimistic locking: retry if another writer touched the key
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    if raw is None:
+                        pipe.unwatch()
+                        return None
+                    data = json.loads(raw)
+                    fn(data)
+                    pipe.multi()
+                    pipe.set(key, json.dumps(data), keepttl=True)
+                    pipe.execute()
+                    return _normalize(data)
+                except self._redis.WatchError:
+                    continue
+
+    def delete(self, session_id):
+        def apply(pipe):
+            used = int(pipe.hget(self.disk_key, session_id) or 0)
+            pipe.multi()
+            pipe.delete(self._key(session_id))
+            pipe.zrem(self.activity_key, session_id)
+            pipe.hdel(self.ttl_key, session_id)
+            pipe.hdel(self.disk_key, session_id)
+            pipe.decrby(self.disk_total_key, used)
+        self._transaction(apply, self.disk_key)
+
+    def session_ids(self):
+        return [key.decode()[len(self.prefix):] for key in self.client.scan_iter(f"{self.prefix}*")]
+
+    def touch(self, session_id, now=None, ttl=None):
+        with self.client.pipeline() as pipe:
+            # xx: a session deleted by another worker is not brought back
+            pipe.zadd(self.activity_key, {session_id: now or time.time()}, xx=True)
+            if ttl is not None:
+                pipe.hset(self.ttl_key, session_id, ttl)
+            pipe.execute()
+
+    def add_usage(self, session_id, nbytes):
+        def apply(pipe):
+            # A session deleted by another worker gets no usage (or total) back
+            if pipe.zscore(self.activity_key, session_id) is None:
+                return False
+            pipe.multi()
+            pipe.hincrby(self.disk_key, session_id, int(nbytes))
+            pipe.incrby(self.disk_total_key, int(nbytes))
+        self._transaction(apply, self.activity_key, self.disk_key)
+
+    def activity(self, session_id):
+        with self.client.pipeline() as pipe:
+            pipe.zscore(self.activity_key, session_id)
+            pipe.hget(self.ttl_key, session_id)
+            last_active, ttl = pipe.execute()
+        if last_active is None:
+            return None
+        return last_active, int(ttl) if ttl is not None else None
+
+    def all_activity(self):
+        return self._activity_entries(self.client.zrange(self.activity_key, 0, -1, withscores=True))
+
+    def oldest(self, limit):
+        return self._activity_entries(self.client.zrange(self.activity_key, 0, limit - 1, withscores=True))
+
+    def totals(self):
+        with self.client.pipeline() as pipe:
+            pipe.zcard(self.activity_key)
+            pipe.get(self.disk_total_key)
+            count, disk_bytes = pipe.execute()
+        return count, int(disk_bytes or 0)
+
+    def _activity_entries(self, entries):
+        if not entries:
+            return []
+        ids = [member.decode() for member, _ in entries]
+        ttls = self.client.hmget(self.ttl_key, ids)
+        disk = self.client.hmget(self.disk_key, ids)
+        return [
+            (session_id, last_active, int(ttl) if ttl is not None else None, int(used or 0))
+            for session_id, (_, last_active), ttl, used in zip(ids, entries, ttls, disk)
+        ]
+
+
+def _normalize(data):
+    # Same JSON round trip as the persistent backends, so code behaves identically on all of them
+    return json.loads(json.dumps(data))
+
+
+def create_session_store(url=None):
+    """
+    Build a session store from a URL
+
+    memory://              process-local (default)
+    sqlite:///path/to.db   shared by all workers on one host
+    redis://host:6379/0    shared across hosts
+    """
+    url = url or 'memory://'
+    if url.startswith('memory://'):
+        return MemorySessionStore()
+    if url.startswith('sqlite:///'):
+        return SQLiteSessionStore(url[len('sqlite:///'):])
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisSessionStore(url)
+    raise ValueError(f"Unsupported session store URL: {url}")
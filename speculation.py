@@ -0,0 +1,78 @@
+"""
+Accounting for speculative session preparation.
+
+The setup pages start preparing a session while the candidate is still on
+the form. If the submitted config matches, the provisional session is
+claimed; otherwise it is cancelled. These counters show how much generation
+latency speculation hides and how much work it throws away.
+"""
+
+import threading
+
+from question_bank import normalize_config
+
+
+def speculation_key(config):
+    """Configs with the same key produce interchangeable sessions"""
+    return f"{normalize_config(config)}|n:{int(config.get('num_questions', 5))}"
+
+
+class SpeculationTracker:
+    """
+    Thread-safe counters for started, claimed and wasted speculative sessions
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = 0
+        self.skipped = 0
+        self.claimed = 0
+        self.cancelled = {}  # reason -> count
+        self.lead_seconds = 0.0
+        self.wasted_questions = 0
+        self.wasted_calls = 0
+        self.wasted_seconds = 0.0
+
+    def record_start(self):
+        with self._lock:
+            self.started += 1
+
+    def record_skip(self):
+        """Speculation declined because no generation worker was idle"""
+        with self._lock:
+            self.skipped += 1
+
+    def record_claim(self, lead_seconds):
+        """lead_seconds: how long the session had been preparing before it was claimed"""
+        with self._lock:
+            self.claimed += 1
+            self.lead_seconds += lead_seconds
+
+    def record_waste(self, reason, questions, seconds):
+        """A speculative session was thrown away after generating `questions` over `seconds`"""
+        with self._lock:
+            self.cancelled[reason] = self.cancelled.get(reason, 0) + 1
+            self.wasted_questions += questions
+            self.wasted_seconds += seconds
+
+    def record_late_waste(self, calls, seconds):
+        """A cancelled session's generation finished `calls` LLM/TTS calls over `seconds` before it stopped"""
+        with self._lock:
+            self.wasted_calls += calls
+            self.wasted_seconds += seconds
+
+    def stats(self):
+        with self._lock:
+            cancelled = sum(self.cancelled.values())
+            return {
+                'started': self.started,
+                'skipped': self.skipped,
+                'claimed': self.claimed,
+                'cancelled': dict(self.cancelled),
+                'hit_rate': round(self.claimed / self.started, 3) if self.started else 0.0,
+                'avg_lead_seconds': round(self.lead_seconds / self.claimed, 2) if self.claimed else 0.0,
+                'wasted_questions': self.wasted_questions,
+                'wasted_calls': self.wasted_calls,
+                'wasted_seconds': round(self.wasted_seconds, 1),
+                'avg_wasted_questions': round(self.wasted_questions / cancelled, 2) if cancelled else 0.0
+            }
@@ -10,9 +10,19 @@ document.addEventListener('DOMContentLoaded', function() {
         isRecording: false,
         mediaRecorder: null,
         audioChunks: [],
+        upload: null,
         timerInterval: null,
         userStream: null,
-        introductionPhase: 'waiting' // waiting, recon_intro, user_intro, questions
+        introductionPhase: 'waiting', // waiting, recon_intro, user_intro, questions
+        eventSource: null,
+        eventPolling: false,
+        sessionEvents: {
+            intro: null,
+            readyQuestions: new Set(),
+            allQuestionsReady: false,
+            failed: false,
+            listeners: []
+        }
     };
 
     const ui = {
@@ -30,6 +40,16 @@ document.addEventListener('DOMContentLoaded', function() {
 
     const sleep = ms => new Promise(res => setTimeout(res, ms));
 
+    // Compact Opus audio where the browser can play it, MP3 everywhere else
+    const AUDIO_FORMAT = new Audio().canPlayType('audio/ogg; codecs="opus"') ? 'ogg' : 'mp3';
+
+    // Upcoming questions (and the next one's audio) are fetched while the current one is answered
+    const prefetched = new Map();
+
+    // Recording is uploaded in timesliced chunks while the candidate speaks
+    const CHUNK_INTERVAL_MS = 1000;
+    const CHUNK_RETRIES = 3;
+
     async function init() {
         console.log('[DEBUG] Initializing interview session...');
         setControlState('initializing');
@@ -59,6 +79,19 @@ document.addEventListener('DOMContentLoaded', function() {
     async function waitForSessionReady() {
         console.log('[DEBUG] Waiting for session to be ready...');
         
+        if (window.EventSource || window.fetch) {
+            subscribeToSessionEvents();
+            await waitForSessionEvent(() => state.sessionEvents.intro || state.sessionEvents.failed);
+            if (state.sessionEvents.failed) {
+                console.error('[ERROR] Session preparation failed');
+                updateStatus("Error preparing session. Please refresh the page.");
+                return;
+            }
+            console.log('[DEBUG] Session is ready!');
+            return state.sessionEvents.intro;
+        }
+        
+        // Fallback for browsers without Server-Sent Events or fetch
         while (true) {
             try {
                 const response = await fetch(`/session_status/${state.sessionId}`);
@@ -84,13 +117,132 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    function subscribeToSessionEvents() {
+        if (!window.EventSource) {
+            pollSessionEvents(0);
+            return;
+        }
+        
+        const source = new EventSource(`/session_events/${state.sessionId}`);
+        state.eventSource = source;
+        let lastEventId = 0;
+        
+        ['intro_ready', 'question_ready', 'all_questions_ready'].forEach(name => {
+            source.addEventListener(name, (e) => {
+                lastEventId = parseInt(e.lastEventId, 10) || lastEventId;
+                handleSessionEvent(name, JSON.parse(e.data));
+            });
+        });
+        source.addEventListener('error', (e) => {
+            if (e.data) {
+                // Server-side preparation error (connection errors carry no data and reconnect)
+                handleSessionEvent('error', e.data);
+            } else if (source.readyState === EventSource.CLOSED) {
+                // The server turned the stream down (204 when SSE is disabled): long-poll instead
+                state.eventSource = null;
+                if (!sessionEventsFinished()) {
+                    pollSessionEvents(lastEventId);
+                    return;
+                }
+                notifySessionListeners();
+            }
+        });
+    }
+
+    async function pollSessionEvents(after) {
+        // Long-poll fallback for servers or browsers without Server-Sent Events
+        state.eventPolling = true;
+        let failures = 0;
+        while (state.eventPolling && !sessionEventsFinished()) {
+            try {
+                const response = await fetch(`/session_events/${state.sessionId}/poll?after=${after}`);
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                const result = await response.json();
+                result.events.forEach(event => {
+                    after = event.id;
+                    handleSessionEvent(event.event, event.data);
+                });
+                failures = 0;
+            } catch (error) {
+                console.error('[ERROR] Failed to poll session events:', error);
+                if (++failures >= 5) break;
+                await sleep(2000);
+            }
+        }
+        state.eventPolling = false;
+        notifySessionListeners();
+    }
+
+    function handleSessionEvent(name, data) {
+        const events = state.sessionEvents;
+        if (name === 'intro_ready') {
+            events.intro = data;
+        } else if (name === 'question_ready') {
+            console.log('[DEBUG] Question ready:', data.index);
+            events.readyQuestions.add(data.index);
+            rememberQuestion(data.question);
+            if (state.isRecording && data.index === state.currentQuestionIndex + 1) {
+                prefetchAudio(data.index);
+            }
+        } else if (name === 'all_questions_ready') {
+            events.allQuestionsReady = true;
+        } else if (name === 'error') {
+            console.error('[ERROR] Session error event:', data);
+            events.failed = true;
+        }
+        if (sessionEventsFinished()) {
+            stopSessionEvents();
+        }
+        notifySessionListeners();
+    }
+
+    function sessionEventsFinished() {
+        return state.sessionEvents.allQuestionsReady || state.sessionEvents.failed;
+    }
+
+    function receivingSessionEvents() {
+        return Boolean(state.eventSource) || state.eventPolling;
+    }
+
+    function stopSessionEvents() {
+        if (state.eventSource) {
+            state.eventSource.close();
+            state.eventSource = null;
+        }
+        state.eventPolling = false;
+    }
+
+    function notifySessionListeners() {
+        state.sessionEvents.listeners.slice().forEach(listener => listener());
+    }
+
+    function waitForSessionEvent(predicate) {
+        // Resolves once the predicate holds; falls through when the event stream is gone
+        return new Promise(resolve => {
+            let done = false;
+            const check = () => {
+                if (!done && (predicate() || !receivingSessionEvents())) {
+                    done = true;
+                    const listeners = state.sessionEvents.listeners;
+                    listeners.splice(listeners.indexOf(check), 1);
+                    resolve();
+                }
+            };
+            state.sessionEvents.listeners.push(check);
+            check();
+        });
+    }
+
     async function startIntroductionSequence() {
         console.log('[DEBUG] Starting introduction sequence...');
         
         try {
-            // Get session status to get introduction audios
-            const response = await fetch(`/session_status/${state.sessionId}`);
-            const sessionData = await response.json();
+            // Introduction audios come with the intro_ready event, or from the status endpoint
+            let sessionData = state.sessionEvents.intro;
+            if (!sessionData) {
+                const response = await fetch(`/session_status/${state.sessionId}`);
+                sessionData = await response.json();
+            }
             
             if (!sessionData.recon_intro_audio || !sessionData.intro_question) {
                 throw new Error('Introduction data not available');
@@ -103,7 +255,7 @@ document.addEventListener('DOMContentLoaded', function() {
             updateStatus("Recon AI is introducing itself...");
             
             console.log('[DEBUG] Playing Recon AI introduction:', sessionData.recon_intro_audio);
-            await playAudio(new Audio(sessionData.recon_intro_audio));
+            await playAudio(loadAudio(sessionData.recon_intro_audio, sessionData.recon_intro_audio_variants));
             
             // Phase 2: User Introduction Question
             state.introductionPhase = 'user_intro';
@@ -115,7 +267,7 @@ document.addEventListener('DOMContentLoaded', function() {
             
             updateStatus("AI is asking the introduction question...");
             console.log('[DEBUG] Playing user introduction question:', sessionData.intro_question.audio_url);
-            await playAudio(new Audio(sessionData.intro_question.audio_url));
+            await playAudio(loadAudio(sessionData.intro_question.audio_url, sessionData.intro_question.audio_variants));
             
             // Start recording for user introduction
             state.introductionPhase = 'questions';
@@ -141,10 +293,30 @@ document.addEventListener('DOMContentLoaded', function() {
         const q_num_display = isIntro ? 'Introduction' : `Question ${state.currentQuestionIndex}`;
         updateStatus(`Loading ${q_num_display.toLowerCase()}...`);
 
+        // Prefetched while the previous answer was recorded, so it can be asked right away
+        const questionIndex = state.currentQuestionIndex;
+        const ready = prefetched.get(questionIndex);
+        if (ready) {
+            prefetched.delete(questionIndex);
+            console.log('[DEBUG] Using prefetched question', questionIndex);
+            await presentQuestion(ready.question, ready.audio, q_num_display, isIntro);
+            return;
+        }
+
         // Poll for question with timeout and retry logic
         let retryCount = 0;
         const maxRetries = 5;
         
+        // Wait for the server to push question readiness instead of polling
+        if (receivingSessionEvents() && questionIndex > 0) {
+            updateStatus("Preparing your questions... Please wait.");
+            await waitForSessionEvent(() =>
+                state.sessionEvents.readyQuestions.has(questionIndex) ||
+                state.sessionEvents.allQuestionsReady ||
+                state.sessionEvents.failed
+            );
+        }
+
         while (retryCount < maxRetries) {
             try {
                 console.log(`[DEBUG] Fetching question ${state.currentQuestionIndex}, attempt ${retryCount + 1}`);
@@ -192,24 +364,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 
                 // We have a valid question
                 console.log('[DEBUG] Question received successfully');
-                
-                // Update UI
-                ui.questionNumber.textContent = `${q_num_display}${isIntro ? '' : ` of ${state.totalQuestions - 1}`}`;
-                ui.questionText.textContent = question.text;
-                updateProgressDots('active');
-                
-                // Play question audio
-                if (question.audio_url) {
-                    updateStatus('AI is asking a question...');
-                    await playAudio(new Audio(question.audio_url));
-                } else {
-                    console.warn('[WARNING] No audio URL for question');
-                    updateStatus('Question ready - audio not available');
-                    await sleep(1000);
-                }
-                
-                // Start recording
-                startRecording();
+                await presentQuestion(question, null, q_num_display, isIntro);
                 return;
                 
             } catch (error) {
@@ -233,6 +388,59 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    async function presentQuestion(question, audio, q_num_display, isIntro) {
+        // Update UI
+        ui.questionNumber.textContent = `${q_num_display}${isIntro ? '' : ` of ${state.totalQuestions - 1}`}`;
+        ui.questionText.textContent = question.text;
+        updateProgressDots('active');
+        
+        // Play question audio
+        if (question.audio_url) {
+            updateStatus('AI is asking a question...');
+            await playAudio(audio || loadAudio(question.audio_url, question.audio_variants));
+        } else {
+            console.warn('[WARNING] No audio URL for question');
+            updateStatus('Question ready - audio not available');
+            await sleep(1000);
+        }
+        
+        // Start recording, and get the next question ready meanwhile
+        startRecording();
+        prefetchNextQuestion();
+    }
+
+    function rememberQuestion(question) {
+        if (question && question.index > state.currentQuestionIndex && !prefetched.has(question.index)) {
+            prefetched.set(question.index, { question: question, audio: null });
+        }
+    }
+
+    function prefetchAudio(index) {
+        // Only the next question's audio is buffered, later ones would compete for bandwidth
+        const entry = prefetched.get(index);
+        if (entry && !entry.audio && entry.question.audio_url) {
+            entry.audio = loadAudio(entry.question.audio_url, entry.question.audio_variants);
+        }
+    }
+
+    async function prefetchNextQuestion() {
+        const next = state.currentQuestionIndex + 1;
+        if (next >= state.totalQuestions) return;
+        
+        if (!prefetched.has(next)) {
+            try {
+                const response = await fetch(`/get_questions/${state.sessionId}?from=${next}&format=${AUDIO_FORMAT}`);
+                if (!response.ok) return;
+                const batch = await response.json();
+                batch.questions.forEach(rememberQuestion);
+            } catch (error) {
+                console.warn('[WARNING] Could not prefetch questions:', error);
+                return;
+            }
+        }
+        prefetchAudio(next);
+    }
+
     // Event Listeners
     ui.recordBtn.addEventListener('click', () => {
         if (state.isRecording) {
@@ -259,7 +467,7 @@ document.addEventListener('DOMContentLoaded', function() {
             
             if (question.audio_url) {
                 updateStatus('Repeating the question...');
-                await playAudio(new Audio(question.audio_url));
+                await playAudio(loadAudio(question.audio_url, question.audio_variants));
                 startRecording();
             } else {
                 updateStatus('Audio not available for this question');
@@ -283,26 +491,42 @@ document.addEventListener('DOMContentLoaded', function() {
         startTimer(120); // 2 minutes
         state.isRecording = true;
         state.audioChunks = [];
+        const upload = state.upload = {
+            questionIndex: state.currentQuestionIndex,
+            seq: 0,
+            bytes: 0,
+            failed: false,
+            chain: Promise.resolve()
+        };
         
         try {
             state.mediaRecorder = new MediaRecorder(state.userStream);
             
             state.mediaRecorder.ondataavailable = (event) => {
                 if (event.data.size > 0) {
+                    // Chunks are kept until the answer is committed, in case the upload has to fall back
                     state.audioChunks.push(event.data);
+                    const seq = upload.seq++;
+                    upload.bytes += event.data.size;
+                    upload.chain = upload.chain.then(() => uploadChunk(upload, seq, event.data));
                 }
             };
             
-            state.mediaRecorder.onstop = () => {
+            state.mediaRecorder.onstop = async () => {
                 console.log('[DEBUG] Recording stopped');
-                const audioBlob = new Blob(state.audioChunks, { type: 'audio/webm' });
                 state.isRecording = false;
                 
-                if (audioBlob.size > 1000) { // Minimum size check
+                if (upload.bytes > 1000) { // Minimum size check
                     console.log('[DEBUG] Valid recording, submitting...');
                     setControlState('loading');
                     updateProgressDots('completed');
-                    submitAnswer(audioBlob);
+                    await upload.chain;
+                    if (!upload.failed && await commitAnswer(upload)) {
+                        askNextQuestion();
+                    } else {
+                        console.warn('[WARNING] Chunked upload failed, sending the whole recording');
+                        submitAnswer(new Blob(state.audioChunks, { type: 'audio/webm' }));
+                    }
                 } else {
                     console.log('[DEBUG] Recording too small, treating as skip');
                     updateProgressDots('skipped');
@@ -310,7 +534,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 }
             };
             
-            state.mediaRecorder.start();
+            state.mediaRecorder.start(CHUNK_INTERVAL_MS);
             console.log('[DEBUG] MediaRecorder started');
             
         } catch (error) {
@@ -329,6 +553,48 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    async function uploadChunk(upload, seq, blob) {
+        if (upload.failed) return;
+        const url = `/interview_session/${state.sessionId}/answer_chunk` +
+            `?question_index=${upload.questionIndex}&seq=${seq}`;
+        
+        for (let attempt = 1; attempt <= CHUNK_RETRIES; attempt++) {
+            try {
+                const response = await fetch(url, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/octet-stream' },
+                    body: blob
+                });
+                if (response.ok) return;
+                // Out of order means an earlier chunk was lost, retrying this one cannot help
+                if (response.status === 409 || response.status === 404) break;
+            } catch (error) {
+                console.warn(`[WARNING] Chunk ${seq} upload attempt ${attempt} failed:`, error);
+            }
+            await sleep(300 * attempt);
+        }
+        console.error(`[ERROR] Giving up on chunk ${seq}`);
+        upload.failed = true;
+    }
+
+    async function commitAnswer(upload) {
+        try {
+            const response = await fetch(`/interview_session/${state.sessionId}/commit_answer`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ question_index: upload.questionIndex, chunks: upload.seq })
+            });
+            if (!response.ok) {
+                throw new Error(`Server error: ${response.status}`);
+            }
+            console.log('[DEBUG] Answer committed:', await response.json());
+            return true;
+        } catch (error) {
+            console.error('[ERROR] Failed to commit answer:', error);
+            return false;
+        }
+    }
+
     async function submitAnswer(audioBlob) {
         console.log('[DEBUG] Submitting answer...');
         updateStatus('Processing your answer...');
@@ -399,6 +665,8 @@ document.addEventListener('DOMContentLoaded', function() {
         setControlState('finished');
         updateStatus("Interview completed! Generating your personalized report...");
         
+        stopSessionEvents();
+        
         // Stop all media streams
         if (state.userStream) {
             state.userStream.getTracks().forEach(track => track.stop());
@@ -415,11 +683,30 @@ document.addEventListener('DOMContentLoaded', function() {
         }, 3000);
     }
 
+    function audioSource(url, variants) {
+        if (variants && variants[AUDIO_FORMAT]) return variants[AUDIO_FORMAT];
+        // The stream route picks the cached variant once the clip is done
+        if (url.startsWith('/audio_stream/')) return `${url}?format=${AUDIO_FORMAT}`;
+        return url;
+    }
+
+    function loadAudio(url, variants) {
+        // Streamed question audio starts playing as soon as the first chunks arrive
+        const audio = new Audio();
+        audio.preload = 'auto';
+        audio.src = audioSource(url, variants);
+        return audio;
+    }
+
     function playAudio(audioObject) {
         return new Promise((resolve) => {
             console.log('[DEBUG] Playing audio...');
             setControlState('ai_speaking');
             
+            audioObject.onplaying = () => {
+                console.log('[DEBUG] Audio playback started');
+            };
+            
             // Mute user microphone during AI speech
             if (state.userStream) {
                 state.userStream.getAudioTracks().forEach(track => {
@@ -10,6 +10,56 @@ document.addEventListener('DOMContentLoaded', function () {
     }
 });
 
+/**
+ * Speculative preparation: once the form has settled, the server starts
+ * preparing a session for it. Submitting the same config claims it.
+ */
+const SPECULATION_DELAY_MS = 1500;
+const speculation = { id: null, key: null, timer: null, claimed: false };
+
+function scheduleSpeculation(configData) {
+    clearTimeout(speculation.timer);
+    speculation.timer = setTimeout(() => speculate(configData), SPECULATION_DELAY_MS);
+}
+
+async function speculate(configData) {
+    const key = JSON.stringify(configData);
+    if (speculation.claimed || key === speculation.key) return;
+    cancelSpeculation();
+    speculation.key = key;
+
+    try {
+        const response = await fetch('/speculate_session', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(configData)
+        });
+        if (!response.ok) return;
+        const result = await response.json();
+        if (!result.speculation_id) return;
+
+        if (speculation.claimed || speculation.key !== key) {
+            // The form changed or was submitted while this was starting
+            navigator.sendBeacon(`/speculate_session/${result.speculation_id}/cancel`);
+            return;
+        }
+        speculation.id = result.speculation_id;
+        console.log('[DEBUG] Speculative session started:', speculation.id);
+    } catch (error) {
+        console.warn('[WARNING] Speculative preparation failed:', error);
+    }
+}
+
+function cancelSpeculation() {
+    if (speculation.id && !speculation.claimed) {
+        navigator.sendBeacon(`/speculate_session/${speculation.id}/cancel`);
+    }
+    speculation.id = null;
+    speculation.key = null;
+}
+
+window.addEventListener('pagehide', cancelSpeculation);
+
 /**
  * Initializes the logic for the "Practice by Skill" page.
  */
@@ -22,6 +72,21 @@ function initSkillSetupPage() {
     const sliderValue = document.getElementById('skill-questions-value');
     let skills = [];
 
+    function currentConfig() {
+        const configData = Object.fromEntries(new FormData(form).entries());
+        configData.skills = skills;
+        return configData;
+    }
+
+    function configChanged() {
+        if (skills.length > 0) {
+            scheduleSpeculation(currentConfig());
+        } else {
+            clearTimeout(speculation.timer);
+            cancelSpeculation();
+        }
+    }
+
     function updateTagsUI() {
         // Clear existing tags
         tagContainer.querySelectorAll('.skill-tag').forEach(tag => tag.remove());
@@ -46,6 +111,7 @@ function initSkillSetupPage() {
         }
 
         submitButton.disabled = skills.length === 0;
+        configChanged();
     }
 
     skillInput.addEventListener('keydown', (e) => {
@@ -66,13 +132,11 @@ function initSkillSetupPage() {
             sliderValue.textContent = slider.value;
         });
     }
+    form.addEventListener('change', configChanged);
 
     form.addEventListener('submit', (e) => {
         e.preventDefault();
-        const formData = new FormData(form);
-        const configData = Object.fromEntries(formData.entries());
-        configData.skills = skills;
-        startPracticeSession(configData);
+        startPracticeSession(currentConfig());
     });
 }
 
@@ -87,6 +151,13 @@ function initCompanySetupPage() {
     const slider = document.getElementById('company-questions');
     const sliderValue = document.getElementById('company-questions-value');
 
+    function configChanged() {
+        const configData = Object.fromEntries(new FormData(form).entries());
+        if (configData.company && configData.role && configData.role.trim() && configData.level) {
+            scheduleSpeculation(configData);
+        }
+    }
+
     companyCards.forEach(card => {
         card.addEventListener('click', () => {
             const companyName = card.dataset.company;
@@ -104,6 +175,7 @@ function initCompanySetupPage() {
             formTitle.textContent = `Details for ${companyName}`;
             form.classList.remove('hidden');
             form.scrollIntoView({ behavior: 'smooth', block: 'start' });
+            configChanged();
         });
     });
 
@@ -113,6 +185,8 @@ function initCompanySetupPage() {
             sliderValue.textContent = slider.value;
         });
     }
+    form.addEventListener('input', configChanged);
+    form.addEventListener('change', configChanged);
 
     form.addEventListener('submit', (e) => {
         e.preventDefault();
@@ -129,6 +203,13 @@ async function startPracticeSession(configData) {
     const loadingOverlay = document.getElementById('loading-overlay');
     if (loadingOverlay) loadingOverlay.classList.remove('hidden');
 
+    // Claim the speculatively prepared session; the server checks the config still matches
+    clearTimeout(speculation.timer);
+    if (speculation.id) {
+        configData.speculation_id = speculation.id;
+        speculation.claimed = true;
+    }
+
     try {
         const response = await fetch('/prepare_session', {
             method: 'POST',
@@ -136,6 +217,17 @@ async function startPracticeSession(configData) {
             body: JSON.stringify(configData)
         });
 
+        if (response.status === 503) {
+            // Generation queue is saturated, retry once the server says there is room
+            const retryAfter = parseInt(response.headers.get('Retry-After'), 10) || 5;
+            const loadingText = loadingOverlay && loadingOverlay.querySelector('.loading-text');
+            if (loadingText) {
+                loadingText.textContent = `Our interviewers are busy. Retrying in ${retryAfter}s...`;
+            }
+            setTimeout(() => startPracticeSession(configData), retryAfter * 1000);
+            return;
+        }
+
         if (!response.ok) {
             const errorData = await response.json();
             throw new Error(errorData.error || 'Failed to prepare session.');
@@ -0,0 +1,126 @@
+"""
+Tests for the chunked answer upload protocol (answer_chunk / commit_answer).
+"""
+
+import os
+import time
+
+import pytest
+
+import app as recon
+from fakes import FakeSTTEngine
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(recon, 'SESSION_DATA_DIR', str(tmp_path / 'sessions'))
+    monkeypatch.setattr(recon, 'AUDIO_CACHE_DIR', str(tmp_path / 'audio_cache'))
+    monkeypatch.setattr(recon, 'SESSION_STORE_URL', 'memory://')
+    monkeypatch.setattr(recon, 'QUESTION_BANK_ENABLED', False)
+    monkeypatch.setattr(recon, '_stt_engine', FakeSTTEngine(text="my answer"))
+    flask_app = recon.create_app(start_services=False)
+    recon.sessions.create('s1', {'config': {}, 'status': 'ready', 'questions': [],
+                                 'user_answers': {}, 'total_questions': 3, 'created_at': time.time()})
+    yield flask_app.test_client()
+    recon.sessions.delete('s1')
+
+
+def send_chunk(client, seq, body, question_index=1):
+    return client.post(f"/interview_session/s1/answer_chunk?question_index={question_index}&seq={seq}",
+                       data=body, content_type='application/octet-stream')
+
+
+def commit(client, chunks, question_index=1):
+    return client.post("/interview_session/s1/commit_answer",
+                       json={'question_index': question_index, 'chunks': chunks})
+
+
+def answer_path(question_index=1):
+    return recon.answer_upload_paths('s1', question_index)[1]
+
+
+def wait_for_transcript(question_index=1, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        answer = recon.sessions.get('s1')['user_answers'].get(str(question_index), {})
+        if answer.get('transcript_status') == 'done':
+            return answer['transcript']
+        time.sleep(0.02)
+    return None
+
+
+def test_chunks_are_committed_as_one_answer(client):
+    for seq, body in enumerate([b'aaa', b'bbb', b'cc']):
+        response = send_chunk(client, seq, body)
+        assert response.status_code == 200
+        assert response.get_json() == {'status': 'received', 'next_seq': seq + 1}
+
+    assert commit(client, 3).status_code == 200
+    with open(answer_path(), 'rb') as f:
+        assert f.read() == b'aaabbbcc'
+    session_data = recon.sessions.get('s1')
+    assert session_data['answer_uploads'] == {}
+    assert session_data['user_answers']['1']['audio_path'] == answer_path()
+    assert wait_for_transcript() == "my answer"
+
+
+def test_sequence_gap_is_rejected(client):
+    send_chunk(client, 0, b'aaa')
+    response = send_chunk(client, 2, b'ccc')
+    assert response.status_code == 409
+    assert response.get_json()['next_seq'] == 1
+
+    # The client resends from the first missing chunk
+    send_chunk(client, 1, b'bbb')
+    send_chunk(client, 2, b'ccc')
+    assert commit(client, 3).status_code == 200
+    with open(answer_path(), 'rb') as f:
+        assert f.read() == b'aaabbbccc'
+
+
+def test_duplicate_chunk_is_not_appended_twice(client):
+    send_chunk(client, 0, b'aaa')
+    send_chunk(client, 1, b'bbb')
+    response = send_chunk(client, 1, b'bbb')
+    assert response.get_json() == {'status': 'duplicate', 'next_seq': 2}
+
+    assert commit(client, 2).status_code == 200
+    with open(answer_path(), 'rb') as f:
+        assert f.read() == b'aaabbb'
+
+
+def test_commit_of_an_incomplete_answer_is_rejected(client):
+    send_chunk(client, 0, b'aaa')
+    response = commit(client, 2)
+    assert response.status_code == 409
+    assert response.get_json()['next_seq'] == 1
+    assert not os.path.exists(answer_path())
+
+    assert commit(client, 1, question_index=2).get_json()['next_seq'] == 0
+
+
+def test_sequence_zero_starts_the_answer_over(client):
+    send_chunk(client, 0, b'first take, longer')
+    send_chunk(client, 1, b'...')
+    send_chunk(client, 0, b'retake')
+    assert commit(client, 1).status_code == 200
+    with open(answer_path(), 'rb') as f:
+        assert f.read() == b'retake'
+
+
+def test_disk_usage_is_accounted(client):
+    send_chunk(client, 0, b'a' * 100)
+    send_chunk(client, 1, b'b' * 50)
+    send_chunk(client, 0, b'c' * 20)
+    commit(client, 1)
+    wait_for_transcript()
+    usage = {entry[0]: entry[3] for entry in recon.sessions.all_activity()}
+    assert usage['s1'] == 20 + len("my answer")
+
+
+def test_unknown_session(client):
+    response = client.post("/interview_session/missing/answer_chunk?question_index=1&seq=0", data=b'aaa')
+    assert response.status_code == 404
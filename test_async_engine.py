@@ -0,0 +1,120 @@
+"""
+Tests for the asyncio generation engine and the async question preparation path.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+import app as recon
+from async_engine import AsyncGenerationEngine
+from generation_executor import CancellationToken, QueueFull
+from speculation import SpeculationTracker
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CONFIG = {'skills': ['Python'], 'level': 'mid', 'num_questions': 3}
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_jobs_run_as_tasks_up_to_max_sessions():
+    engine = AsyncGenerationEngine(max_sessions=2)
+    done = []
+
+    async def job(name, delay):
+        await asyncio.sleep(delay)
+        done.append(name)
+
+    engine.submit('a', job, 'a', 0.2)
+    engine.submit('b', job, 'b', 0.2)
+    with pytest.raises(QueueFull):
+        engine.submit('c', job, 'c', 0)
+    assert wait_until(lambda: engine.stats()['completed'] == 2)
+    assert sorted(done) == ['a', 'b']
+    assert engine.stats()['rejected'] == 1
+
+
+def test_cancel_stops_the_task_and_its_token():
+    engine = AsyncGenerationEngine()
+    token = CancellationToken()
+    started = []
+
+    async def job():
+        started.append(True)
+        await asyncio.sleep(5)
+
+    engine.submit('a', job, token=token)
+    assert wait_until(lambda: started)
+    assert engine.cancel('a', reason='expired')
+    assert token.reason == 'expired'
+    assert wait_until(lambda: engine.stats()['running'] == 0)
+    stats = engine.stats()
+    assert (stats['cancelled'], stats['completed']) == (1, 0)
+    assert not engine.cancel('a')
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(recon, 'SESSION_DATA_DIR', str(tmp_path / 'sessions'))
+    monkeypatch.setattr(recon, 'AUDIO_CACHE_DIR', str(tmp_path / 'audio_cache'))
+    monkeypatch.setattr(recon, 'SESSION_STORE_URL', 'memory://')
+    monkeypatch.setattr(recon, 'QUESTION_BANK_ENABLED', False)
+    monkeypatch.setattr(recon, 'QUESTION_GENERATION_MODE', 'batch')
+    monkeypatch.setattr(recon, 'AUDIO_STREAMING', False)
+    monkeypatch.setattr(recon, 'speculation_tracker', SpeculationTracker())
+    engine = AsyncGenerationEngine()
+    engine.delays = {'answer': 0.0, 'audio': 0.0}
+
+    async def fake_gemini(prompt, max_tokens=None, **kwargs):
+        # Batch items without answers, so every answer is its own call
+        return json.dumps([{'question': f"Question {i}?"} for i in range(1, max_tokens // 300 + 1)])
+
+    async def fake_answer(question_text, level):
+        await asyncio.sleep(engine.delays['answer'])
+        return f"Answer to {question_text}"
+
+    async def fake_audio(session_id, index, question_text):
+        await asyncio.sleep(engine.delays['audio'])
+        return f"/static/audio/q{index}.mp3"
+    monkeypatch.setattr(recon, 'get_gemini_response_async', fake_gemini)
+    monkeypatch.setattr(recon, 'generate_model_answer_async', fake_answer)
+    monkeypatch.setattr(recon, 'generate_question_audio_async', fake_audio)
+    recon.create_app(start_services=False)
+    recon.sessions.create('s1', {'config': CONFIG, 'status': 'intro_ready', 'questions': [], 'user_answers': {},
+                                 'total_questions': 4, 'created_at': time.time(), 'speculative': True})
+    yield engine
+    recon.sessions.delete('s1')
+
+
+def test_questions_are_published_in_order(engine):
+    engine.delays['answer'] = 0.05
+    engine.submit('s1', recon.prepare_remaining_questions_async, 's1', CONFIG, CancellationToken())
+    assert wait_until(lambda: engine.stats()['completed'] == 1)
+
+    session_data = recon.sessions.get('s1')
+    assert session_data['status'] == 'all_questions_ready'
+    assert [(q['index'], q['text'], q['answer']) for q in session_data['questions']] == [
+        (i, f"Question {i}?", f"Answer to Question {i}?") for i in range(1, 4)
+    ]
+
+
+def test_cancelled_speculation_records_the_calls_in_flight_as_waste(engine):
+    engine.delays.update(answer=5, audio=5)
+    token = CancellationToken()
+    engine.submit('s1', recon.prepare_remaining_questions_async, 's1', CONFIG, token, token=token)
+    time.sleep(0.1)
+    engine.cancel('s1', reason='speculation')
+
+    # Three answers and three clips were in flight
+    assert wait_until(lambda: recon.speculation_tracker.stats()['wasted_calls'] == 6)
+    assert token.late_work == 6
+    assert recon.sessions.get('s1')['questions'] == []
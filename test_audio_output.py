@@ -0,0 +1,55 @@
+"""
+Tests for the TTS output stages; ffmpeg is replaced by a script that only reads pipes.
+"""
+
+import os
+import stat
+import sys
+
+import pytest
+
+import audio_output
+from audio_output import AudioOutputStage, NativeOutputStage, TranscodeOutputStage, get_output_stage
+
+# Fails unless the audio comes in on stdin and goes out on stdout
+FAKE_FFMPEG = f"""#!{sys.executable}
+import sys
+args = sys.argv[1:]
+assert args[args.index('-i') + 1] == 'pipe:0' and args[-1] == 'pipe:1', args
+fmt = args[args.index('-f', args.index('-i')) + 1]
+sys.stdout.buffer.write(b'encoded-' + fmt.encode() + b':' + sys.stdin.buffer.read())
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    path = tmp_path / 'ffmpeg'
+    path.write_text(FAKE_FFMPEG)
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setattr(audio_output, 'FFMPEG', str(path))
+    return path
+
+
+def test_stage_selection():
+    assert type(get_output_stage('q.wav')) is AudioOutputStage
+    assert isinstance(get_output_stage('q.mp3'), NativeOutputStage)
+    assert get_output_stage('q.ogg').request_format == 'ogg-24khz-16bit-mono-opus'
+    stage = get_output_stage('q.mp3', mode='transcode')
+    assert isinstance(stage, TranscodeOutputStage)
+    assert stage.request_format == audio_output.PCM_OUTPUT_FORMAT
+
+
+def test_transcode_goes_through_pipes(fake_ffmpeg, tmp_path):
+    target = str(tmp_path / 'q.ogg')
+    assert TranscodeOutputStage('ogg').write(b'RIFFpcm', target) == target
+    with open(target, 'rb') as f:
+        assert f.read() == b'encoded-ogg:RIFFpcm'
+    assert sorted(os.listdir(tmp_path)) == ['ffmpeg', 'q.ogg']
+
+
+def test_failed_transcode_keeps_wav(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_output, 'FFMPEG', str(tmp_path / 'missing-ffmpeg'))
+    written = TranscodeOutputStage('mp3').write(b'RIFFpcm', str(tmp_path / 'q.mp3'))
+    assert written == str(tmp_path / 'q.wav')
+    with open(written, 'rb') as f:
+        assert f.read() == b'RIFFpcm'
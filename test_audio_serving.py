@@ -0,0 +1,106 @@
+"""
+Tests for versioned, immutable audio URLs and Ogg/MP3 negotiation.
+"""
+
+import os
+import time
+
+import pytest
+
+import app as recon
+from audio_serving import AudioVersions
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+QUESTION = "What is a closure?"
+
+
+def test_version_follows_the_content(tmp_path):
+    versions = AudioVersions({'cache': str(tmp_path)})
+    clip = tmp_path / 'clip.mp3'
+    clip.write_bytes(b'first')
+    url = versions.url(str(clip))
+    assert url.startswith('/audio/v/') and url.endswith('/cache/clip.mp3')
+    assert versions.url(str(clip)) == url
+
+    clip.write_bytes(b'second take')
+    assert versions.url(str(clip)) != url
+    assert versions.resolve('cache', '../outside.mp3') is None
+    assert versions.url('elsewhere/clip.mp3') == '/elsewhere/clip.mp3'
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(recon, 'SESSION_DATA_DIR', str(tmp_path / 'sessions'))
+    monkeypatch.setattr(recon, 'AUDIO_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(recon, 'SESSION_STORE_URL', 'memory://')
+    monkeypatch.setattr(recon, 'QUESTION_BANK_ENABLED', False)
+    monkeypatch.setattr(recon, 'AUDIO_OFFLOAD', 'none')
+    monkeypatch.setattr(recon, 'AUDIO_FORMATS', ('mp3', 'ogg'))
+    monkeypatch.setattr(recon, 'audio_versions', AudioVersions({'cache': str(tmp_path / 'cache')}))
+    flask_app = recon.create_app(start_services=False)
+    recon.sessions.create('s1', {'config': {}, 'status': 'all_questions_ready', 'user_answers': {},
+                                 'questions': [{'text': QUESTION, 'index': 1}],
+                                 'total_questions': 2, 'created_at': time.time()})
+    yield flask_app.test_client()
+    recon.sessions.delete('s1')
+
+
+def cache_clip(ext, content):
+    def write(target):
+        with open(target, 'wb') as f:
+            f.write(content)
+        return target
+    return recon.audio_store.fetch(QUESTION, write, voice=recon.TTS_VOICE, rate=recon.TTS_PROSODY_RATE,
+                                   fmt=f"rest-{recon.AUDIO_OUTPUT_MODE}-{ext}", ext=ext)
+
+
+def test_versioned_clip_is_immutable_and_conditional(client):
+    url = recon.audio_versions.url(cache_clip('mp3', b'mp3 audio bytes'))
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data == b'mp3 audio bytes'
+    assert response.cache_control.immutable and response.cache_control.public
+    assert response.cache_control.max_age == recon.AUDIO_MAX_AGE
+
+    etag = response.headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    partial = client.get(url, headers={'Range': 'bytes=0-2'})
+    assert (partial.status_code, partial.data) == (206, b'mp3')
+
+
+def test_stale_version_redirects_to_the_current_clip(client):
+    path = cache_clip('mp3', b'mp3 audio')
+    current = recon.audio_versions.url(path)
+    stale = current.replace(current.split('/')[3], '0' * 16)
+    response = client.get(stale)
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith(current)
+    assert response.cache_control.no_store
+
+    assert client.get('/audio/v/0/cache/missing.mp3').status_code == 404
+
+
+def test_format_is_negotiated_from_accept_and_the_format_parameter(client):
+    mp3 = recon.audio_versions.url(cache_clip('mp3', b'mp3 audio'))
+    ogg = recon.audio_versions.url(cache_clip('ogg', b'ogg audio'))
+
+    def location(**kwargs):
+        response = client.get('/audio_stream/s1/1', **kwargs)
+        assert response.status_code == 302
+        assert 'Accept' in response.headers['Vary']
+        return response.headers['Location']
+
+    # Audio elements send */*, which keeps MP3
+    assert location(headers={'Accept': '*/*'}).endswith(mp3)
+    assert location(headers={'Accept': 'audio/ogg, audio/mpeg;q=0.8'}).endswith(ogg)
+    assert location(headers={'Accept': 'audio/mpeg'}).endswith(mp3)
+    # The player's explicit choice wins over Accept
+    assert location(query_string={'format': 'ogg'}, headers={'Accept': 'audio/mpeg'}).endswith(ogg)
+    assert location(query_string={'format': 'flac'}, headers={'Accept': '*/*'}).endswith(mp3)
+
+
+def test_missing_variant_falls_back_to_mp3(client):
+    mp3 = recon.audio_versions.url(cache_clip('mp3', b'mp3 audio'))
+    response = client.get('/audio_stream/s1/1', query_string={'format': 'ogg'})
+    assert response.headers['Location'].endswith(mp3)
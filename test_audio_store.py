@@ -0,0 +1,164 @@
+"""
+Tests for the content-addressed audio cache: in-flight dedupe, streaming followers and LRU eviction.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from audio_store import AudioStore
+
+VOICE = dict(voice='en-US-Test', rate='0%', fmt='rest-native-mp3', ext='mp3')
+
+
+def writer(content, calls=None, gate=None):
+    """synthesize() callback writing fixed content, optionally waiting for a gate first"""
+    def synthesize(target):
+        if calls is not None:
+            calls.append(target)
+        if gate is not None:
+            gate.wait(5)
+        with open(target, 'wb') as f:
+            f.write(content)
+        return target
+    return synthesize
+
+
+def run_threads(count, fn):
+    results = [None] * count
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, fn())) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AudioStore(root=str(tmp_path / 'cache'))
+
+
+def test_concurrent_requests_share_one_synthesis(store):
+    calls = []
+    gate = threading.Event()
+    threads, results = run_threads(5, lambda: store.fetch("Hello", writer(b'audio', calls, gate), **VOICE))
+    time.sleep(0.1)
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(set(results)) == 1
+    with open(results[0], 'rb') as f:
+        assert f.read() == b'audio'
+    assert store.stats()['in_flight'] == 0
+
+
+def test_cache_key_covers_voice_and_format(store):
+    calls = []
+    store.fetch("Hello", writer(b'a', calls), **VOICE)
+    store.fetch("  Hello ", writer(b'a', calls), **VOICE)
+    store.fetch("Hello", writer(b'a', calls), **dict(VOICE, voice='en-GB-Test'))
+    store.fetch("Hello", writer(b'a', calls), **dict(VOICE, fmt='rest-native-ogg', ext='ogg'))
+    assert len(calls) == 3
+
+
+def test_failed_synthesis_is_not_cached(store):
+    assert store.fetch("Hello", lambda target: False, **VOICE) is None
+    assert store.fetch("Hello", writer(b'audio'), **VOICE).endswith('.mp3')
+
+
+def test_abandoned_reservation_is_retried_by_waiters(store):
+    key = store.make_key("Hello", VOICE['voice'], VOICE['rate'], VOICE['fmt'])
+    future, owner = store.reserve(key)
+    assert owner
+    calls = []
+    threads, results = run_threads(1, lambda: store.fetch("Hello", writer(b'audio', calls), **VOICE))
+    time.sleep(0.1)
+    assert calls == []
+    store.abandon(key)
+    threads[0].join()
+
+    assert len(calls) == 1
+    assert results[0] == store.get(key)
+
+
+def test_least_recently_used_clips_are_evicted(store):
+    store.max_bytes = 250
+    first = store.fetch("First", writer(b'1' * 100), **VOICE)
+    second = store.fetch("Second", writer(b'2' * 100), **VOICE)
+    # Reading the first clip makes the second one the oldest
+    assert store.fetch("First", writer(b'x'), **VOICE) == first
+    store.fetch("Third", writer(b'3' * 100), **VOICE)
+
+    stats = store.stats()
+    assert (stats['entries'], stats['bytes']) == (2, 200)
+    assert store.get(store.make_key("Second", VOICE['voice'], VOICE['rate'], VOICE['fmt'])) is None
+    assert store.get(store.make_key("First", VOICE['voice'], VOICE['rate'], VOICE['fmt'])) == first
+    assert not os.path.exists(second)
+
+
+def test_cached_clips_survive_a_restart(store):
+    path = store.fetch("Hello", writer(b'audio'), **VOICE)
+    reopened = AudioStore(root=store.root)
+    assert reopened.fetch("Hello", writer(b'other'), **VOICE) == path
+    assert reopened.stats()['bytes'] == 5
+
+
+def test_stream_followers_read_the_clip_as_it_is_written(store):
+    release = threading.Event()
+    opened = []
+
+    def open_stream():
+        opened.append(True)
+        yield b'first-'
+        release.wait(5)
+        yield b'second'
+
+    owner = store.stream("Hello", open_stream, **VOICE)
+    assert next(owner) == b'first-'
+
+    follower_chunks = []
+    threads, _ = run_threads(1, lambda: follower_chunks.extend(store.stream("Hello", open_stream, **VOICE)))
+    deadline = time.monotonic() + 5
+    while not follower_chunks and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # The follower has the first chunk before the synthesis is done
+    assert follower_chunks == [b'first-']
+
+    release.set()
+    assert b''.join(owner) == b'second'
+    threads[0].join()
+    assert b''.join(follower_chunks) == b'first-second'
+    assert len(opened) == 1
+    assert b''.join(store.stream("Hello", open_stream, **VOICE)) == b'first-second'
+
+
+def test_recently_used_clips_are_kept_over_the_cap(store):
+    store.max_bytes = 150
+    store.min_age = 3600
+    old = store.fetch("Old", writer(b'1' * 100), **VOICE)
+    os.utime(old, (time.time() - 7200, time.time() - 7200))
+    recent = store.fetch("Recent", writer(b'2' * 100), **VOICE)
+    store.fetch("Newest", writer(b'3' * 100), **VOICE)
+
+    # Only the clip unused for longer than min_age goes, the cache stays over the cap
+    assert not os.path.exists(old)
+    assert os.path.exists(recent)
+    assert store.stats()['bytes'] == 200
+
+
+def test_size_is_rebuilt_from_the_shared_directory(store):
+    other = AudioStore(root=store.root)
+    store.rescan_interval = 0
+    store.max_bytes = 250
+    shared = other.fetch("Other worker", writer(b'o' * 100), **VOICE)
+    os.utime(shared, (time.time() - 60, time.time() - 60))
+    store.fetch("Mine", writer(b'm' * 100), **VOICE)
+    assert store.stats()['bytes'] == 200
+
+    # The other worker's clip counts toward the cap and is the least recently used
+    store.fetch("Another", writer(b'a' * 100), **VOICE)
+    assert not os.path.exists(shared)
+    assert store.stats()['bytes'] == 200
@@ -0,0 +1,96 @@
+"""
+Tests for the bounded generation executor and admission control in /prepare_session.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+import app as recon
+from generation_executor import CancellationToken, GenerationExecutor, QueueFull
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_submissions_past_the_queue_are_rejected():
+    executor = GenerationExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+    assert executor.submit('a', release.wait, 5) == 0
+    assert wait_until(lambda: executor.stats()['running'] == 1)
+    assert executor.submit('b', release.wait, 5) == 1
+    with pytest.raises(QueueFull) as raised:
+        executor.submit('c', release.wait, 5)
+    assert raised.value.retry_after >= 1
+
+    release.set()
+    assert wait_until(lambda: executor.stats()['completed'] == 2)
+    stats = executor.stats()
+    assert (stats['submitted'], stats['rejected'], stats['queued']) == (2, 1, 0)
+
+
+def test_cancel_drops_queued_jobs_and_signals_running_ones():
+    executor = GenerationExecutor(max_workers=1, max_queue=4)
+    token = CancellationToken()
+    ran = []
+
+    def running_job():
+        ran.append('running')
+        wait_until(token.cancelled)
+
+    executor.submit('running', running_job, token=token)
+    assert wait_until(lambda: ran == ['running'])
+    executor.submit('queued', ran.append, 'queued')
+    assert executor.idle_workers() == 0
+
+    assert executor.cancel('queued')
+    assert executor.cancel('running', reason='expired')
+    assert token.cancelled() and token.reason == 'expired'
+    assert wait_until(lambda: executor.stats()['running'] == 0)
+    time.sleep(0.05)
+    assert ran == ['running']
+    assert not executor.cancel('unknown')
+
+
+def test_failed_jobs_are_counted():
+    executor = GenerationExecutor(max_workers=1, max_queue=1)
+    executor.submit('bad', lambda: 1 / 0)
+    assert wait_until(lambda: executor.stats()['failed'] == 1)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(recon, 'SESSION_DATA_DIR', str(tmp_path / 'sessions'))
+    monkeypatch.setattr(recon, 'AUDIO_CACHE_DIR', str(tmp_path / 'audio_cache'))
+    monkeypatch.setattr(recon, 'SESSION_STORE_URL', 'memory://')
+    monkeypatch.setattr(recon, 'QUESTION_BANK_ENABLED', False)
+    monkeypatch.setattr(recon, 'GENERATION_ENGINE', 'threads')
+    monkeypatch.setattr(recon, 'prepare_introduction_question', lambda session_id, config: None)
+    release = threading.Event()
+    monkeypatch.setattr(recon, 'prepare_remaining_questions',
+                        lambda session_id, config, token: release.wait(5))
+    monkeypatch.setattr(recon, 'generation_executor', GenerationExecutor(max_workers=1, max_queue=0))
+    flask_app = recon.create_app(start_services=False)
+    yield flask_app.test_client()
+    release.set()
+
+
+def test_prepare_session_answers_503_when_the_queue_is_full(client):
+    first = client.post('/prepare_session', json={'skills': ['Python'], 'num_questions': 2})
+    assert first.status_code == 200
+    assert first.get_json()['queue_position'] == 0
+
+    rejected = client.post('/prepare_session', json={'skills': ['Python'], 'num_questions': 2})
+    assert rejected.status_code == 503
+    assert int(rejected.headers['Retry-After']) >= 1
+    # The rejected session is not left behind
+    assert list(recon.sessions.session_ids()) == [first.get_json()['session_id']]
@@ -0,0 +1,122 @@
+"""
+Tests for the manifest-driven introduction audio precompute.
+"""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from intro_audio import IntroAudioPrecompute, intro_clips
+
+
+class RecordingSynthesizer:
+    """synthesize(text, path) writing the text, optionally failing for some files"""
+
+    def __init__(self, fail=(), delay=0.0):
+        self.fail = set(fail)
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, text, path):
+        with self._lock:
+            self.calls.append(os.path.basename(path))
+        time.sleep(self.delay)
+        if os.path.basename(path) in self.fail:
+            return False
+        with open(path, 'w') as f:
+            f.write(text)
+        return True
+
+
+@pytest.fixture
+def synth():
+    return RecordingSynthesizer()
+
+
+def make_precompute(tmp_path, synth, **kwargs):
+    kwargs.setdefault('settings', 'voice-a')
+    return IntroAudioPrecompute(synth, directory=str(tmp_path / 'intro'), **kwargs)
+
+
+def test_precompute_builds_missing_clips_once(tmp_path, synth):
+    intro = make_precompute(tmp_path, synth, max_workers=4)
+    built, failed = intro.precompute()
+    assert sorted(built) == sorted(intro_clips())
+    assert failed == []
+    assert sorted(synth.calls) == sorted(intro_clips())
+
+    assert intro.precompute() == ([], [])
+    assert len(synth.calls) == len(intro_clips())
+
+
+def test_changed_settings_rebuild_every_clip(tmp_path, synth):
+    make_precompute(tmp_path, synth).precompute()
+    synth.calls.clear()
+    built, _ = make_precompute(tmp_path, synth, settings='voice-b').precompute()
+    assert len(built) == len(synth.calls) == len(intro_clips())
+
+
+def test_failed_clips_are_retried_by_ensure(tmp_path):
+    synth = RecordingSynthesizer(fail={'recon_intro_1.mp3'})
+    intro = make_precompute(tmp_path, synth)
+    _, failed = intro.precompute()
+    assert failed == ['recon_intro_1.mp3']
+
+    synth.fail.clear()
+    assert intro.ensure('recon_intro_1.mp3') == intro.path('recon_intro_1.mp3')
+    assert intro.stale_clips() == []
+
+
+def test_concurrent_ensure_synthesizes_once(tmp_path):
+    synth = RecordingSynthesizer(delay=0.1)
+    intro = make_precompute(tmp_path, synth)
+    os.makedirs(intro.directory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(intro.ensure('user_intro_2.mp3')))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert synth.calls == ['user_intro_2.mp3']
+    assert set(results) == {intro.path('user_intro_2.mp3')}
+
+
+def test_formats_limit_the_build(tmp_path, synth):
+    intro = make_precompute(tmp_path, synth, formats=('mp3', 'ogg'))
+    built, _ = intro.precompute(formats=('ogg',))
+    assert built and all(name.endswith('.ogg') for name in built)
+    assert len(intro.stale_clips()) == len(built)
+
+
+def test_clips_from_before_the_manifest_are_adopted(tmp_path, synth):
+    intro = make_precompute(tmp_path, synth)
+    os.makedirs(intro.directory)
+    with open(intro.path('recon_intro_1.mp3'), 'w') as f:
+        f.write('old clip')
+    intro.precompute()
+    assert 'recon_intro_1.mp3' not in synth.calls
+    assert 'recon_intro_1.mp3' in intro.load_manifest()
+
+
+def test_manifest_is_read_again_only_when_it_changes(tmp_path, monkeypatch):
+    synth = RecordingSynthesizer(fail={'user_intro_5.mp3'})
+    intro = make_precompute(tmp_path, synth)
+    intro.precompute()
+    reads = []
+    real_load = json.load
+    monkeypatch.setattr(json, 'load', lambda f: reads.append(f.name) or real_load(f))
+
+    first = intro.load_manifest()
+    assert intro.load_manifest() is first
+    assert intro.stale_clips() == ['user_intro_5.mp3']
+    assert len(reads) == 1
+
+    synth.fail.clear()
+    intro.ensure('user_intro_5.mp3')
+    assert intro.load_manifest() is not first
+    assert len(reads) == 2
@@ -0,0 +1,174 @@
+"""
+Tests for the LLM gateway: coalescing, caching, 429 retries and the token bucket.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fakes import FakeGeminiModel, FakeResponse, FakeServiceError
+from llm_gateway import LLMGateway, TokenBucket
+
+
+def make_gateway(model, **kwargs):
+    kwargs.setdefault('requests_per_minute', 60000)
+    kwargs.setdefault('burst', 1000)
+    return LLMGateway(lambda: model, **kwargs)
+
+
+def test_identical_shared_prompts_are_coalesced():
+    model = FakeGeminiModel(responder=lambda prompt: f"reply to {prompt}", latency=0.2)
+    gateway = make_gateway(model)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(gateway.generate("prompt"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["reply to prompt"] * 5
+    assert len(model.calls) == 1
+    assert gateway.stats()['coalesced'] == 4
+
+
+def test_unshared_prompts_are_not_coalesced():
+    model = FakeGeminiModel(responder=lambda prompt: "reply", latency=0.1)
+    gateway = make_gateway(model)
+    threads = [threading.Thread(target=gateway.generate, args=("prompt",), kwargs={'shared': False})
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(model.calls) == 3
+
+
+def test_responses_are_cached_for_the_ttl():
+    model = FakeGeminiModel(responder=lambda prompt: "reply")
+    gateway = make_gateway(model, cache_ttl=60)
+    assert gateway.generate("prompt", max_tokens=100) == "reply"
+    assert gateway.generate("prompt", max_tokens=100) == "reply"
+    # A different output cap is a different call
+    gateway.generate("prompt", max_tokens=200)
+
+    assert len(model.calls) == 2
+    assert model.calls[0]['generation_config'] == {'max_output_tokens': 100}
+    assert gateway.stats()['cache_hits'] == 1
+
+
+def test_failures_are_shared_and_not_cached():
+    model = FakeGeminiModel(error_rate=1.0)
+    gateway = make_gateway(model, cache_ttl=60)
+    for _ in range(2):
+        with pytest.raises(FakeServiceError):
+            gateway.generate("prompt")
+    assert len(model.calls) == 2
+
+
+class FlakyModel:
+    """Fails with `error` for the first `failures` calls"""
+
+    def __init__(self, failures, error):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return FakeResponse("reply")
+
+
+def test_rate_limit_errors_are_retried():
+    model = FlakyModel(2, FakeServiceError("429 Resource exhausted"))
+    gateway = make_gateway(model, max_retries=2, retry_backoff=0)
+    assert gateway.generate("prompt") == "reply"
+    assert model.calls == 3
+    stats = gateway.stats()
+    assert (stats['rate_limited'], stats['retries']) == (2, 2)
+
+
+def test_rate_limit_retries_are_bounded():
+    model = FlakyModel(5, FakeServiceError("429 Resource exhausted"))
+    gateway = make_gateway(model, max_retries=1, retry_backoff=0)
+    with pytest.raises(FakeServiceError):
+        gateway.generate("prompt")
+    assert model.calls == 2
+
+
+def test_other_errors_are_not_retried():
+    model = FlakyModel(1, FakeServiceError("500 Internal error"))
+    gateway = make_gateway(model, retry_backoff=0)
+    with pytest.raises(FakeServiceError):
+        gateway.generate("prompt")
+    assert model.calls == 1
+    assert gateway.stats()['errors'] == 1
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+    # Too long a wait takes nothing
+    assert bucket.reserve(timeout=0.05) is None
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.02)
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(rate=50, capacity=1)
+    assert bucket.acquire()
+    time.sleep(0.05)
+    assert bucket.reserve() == pytest.approx(0, abs=0.01)
+
+
+def test_async_calls_share_coalescing_with_blocking_ones():
+    model = FakeGeminiModel(responder=lambda prompt: "reply", latency=0.2)
+    gateway = make_gateway(model)
+
+    async def main():
+        return await asyncio.gather(*(gateway.agenerate("prompt") for _ in range(3)))
+
+    assert asyncio.run(main()) == ["reply"] * 3
+    assert len(model.calls) == 1
+    assert model.calls[0]['async']
+
+
+def test_cancelled_owner_hands_the_call_to_a_follower():
+    model = FakeGeminiModel(responder=lambda prompt: "reply", latency=0.2)
+    gateway = make_gateway(model)
+
+    async def main():
+        owner = asyncio.create_task(gateway.agenerate("prompt"))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.create_task(gateway.agenerate("prompt")) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        owner.cancel()
+        return await asyncio.gather(owner, *followers, return_exceptions=True)
+
+    owner, *followers = asyncio.run(main())
+    assert isinstance(owner, asyncio.CancelledError)
+    assert followers == ["reply", "reply"]
+    # The owner's call was abandoned and one follower made it again
+    assert len(model.calls) == 2
+
+
+def test_cancelled_follower_leaves_the_shared_call_alone():
+    model = FakeGeminiModel(responder=lambda prompt: "reply", latency=0.1)
+    gateway = make_gateway(model)
+
+    async def main():
+        owner = asyncio.create_task(gateway.agenerate("prompt"))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(gateway.agenerate("prompt"))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        return await asyncio.gather(owner, follower, return_exceptions=True)
+
+    owner, follower = asyncio.run(main())
+    assert owner == "reply"
+    assert isinstance(follower, asyncio.CancelledError)
+    assert len(model.calls) == 1
@@ -0,0 +1,140 @@
+"""
+Tests for the question bank, serving warm configs from it and prewarming it.
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+import app as recon
+import prewarm_questions
+from generation_executor import CancellationToken
+from question_bank import QuestionBank, normalize_config
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CONFIG = {'skills': ['Python', 'SQL'], 'level': 'mid', 'num_questions': 3}
+
+
+def test_config_key_ignores_skill_order_case_and_spacing():
+    key = normalize_config({'skills': ['Python', 'SQL'], 'level': 'mid'})
+    assert normalize_config({'skills': [' sql', 'PYTHON  '], 'level': 'Mid'}) == key
+    assert normalize_config({'skills': ['Python'], 'level': 'mid'}) != key
+    assert normalize_config({'company': 'Acme', 'level': 'mid'}) == \
+        normalize_config({'company': ' acme ', 'role': 'software engineer', 'level': 'mid'})
+
+
+def test_questions_are_deduplicated_by_normalized_text(tmp_path):
+    bank = QuestionBank(str(tmp_path / 'bank.db'))
+    assert bank.add('k', "What is a closure?", "An answer")
+    assert not bank.add('k', "what is a  CLOSURE?", "Another answer")
+    assert bank.add('other', "What is a closure?", "An answer")
+    assert bank.count('k') == 1
+
+
+def test_sampling_prefers_the_least_served_questions(tmp_path):
+    bank = QuestionBank(str(tmp_path / 'bank.db'))
+    for i in range(4):
+        bank.add('k', f"Question {i}?", f"Answer {i}")
+    first = {item['question'] for item in bank.sample('k', 2)}
+    second = {item['question'] for item in bank.sample('k', 2)}
+    assert len(first) == len(second) == 2
+    assert not first & second
+    assert bank.stats() == {'k': {'questions': 4, 'served': 4}}
+
+
+def test_evicted_audio_is_dropped_from_samples(tmp_path):
+    bank = QuestionBank(str(tmp_path / 'bank.db'))
+    clip = tmp_path / 'clip.mp3'
+    clip.write_bytes(b'audio')
+    bank.add('k', "Kept?", "Answer", str(clip))
+    bank.add('k', "Evicted?", "Answer", str(tmp_path / 'gone.mp3'))
+    audio = {item['question']: item['audio_path'] for item in bank.sample('k', 2)}
+    assert audio == {"Kept?": str(clip), "Evicted?": None}
+
+    # A new synthesis puts the clip back
+    bank.set_audio('k', "Evicted?", str(clip))
+    assert all(item['audio_path'] for item in bank.sample('k', 2))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(recon, 'SESSION_DATA_DIR', str(tmp_path / 'sessions'))
+    monkeypatch.setattr(recon, 'AUDIO_CACHE_DIR', str(tmp_path / 'audio_cache'))
+    monkeypatch.setattr(recon, 'SESSION_STORE_URL', 'memory://')
+    monkeypatch.setattr(recon, 'QUESTION_BANK_ENABLED', True)
+    monkeypatch.setattr(recon, 'QUESTION_BANK_PATH', str(tmp_path / 'bank.db'))
+    monkeypatch.setattr(recon, 'QUESTION_BANK_WARM_SIZE', 3)
+    monkeypatch.setattr(recon, 'QUESTION_GENERATION_MODE', 'batch')
+    calls = {'gemini': [], 'audio': []}
+
+    def fake_gemini(prompt, max_tokens=None, **kwargs):
+        calls['gemini'].append(prompt)
+        # Batch prompts ask for 300 tokens per question
+        size = max_tokens // 300
+        offset = len(calls['gemini']) * 10
+        return json.dumps([{'question': f"Generated question {offset + i}?", 'answer': f"Answer {i}"}
+                           for i in range(size)])
+
+    def fake_audio(session_id, index, text):
+        calls['audio'].append(text)
+        clip = tmp_path / f"clip_{len(calls['audio'])}.mp3"
+        clip.write_bytes(b'audio')
+        return f"/{clip}"
+    monkeypatch.setattr(recon, 'get_gemini_response', fake_gemini)
+    monkeypatch.setattr(recon, 'generate_question_audio', fake_audio)
+    flask_app = recon.create_app(start_services=False)
+    client = flask_app.test_client()
+    client.calls = calls
+    yield client
+    recon.sessions.delete('s1')
+
+
+def run_session(config):
+    recon.sessions.create('s1', {'config': config, 'status': 'intro_ready', 'questions': [], 'user_answers': {},
+                                 'total_questions': config['num_questions'] + 1, 'created_at': time.time()})
+    recon.prepare_remaining_questions('s1', config, CancellationToken())
+    return recon.sessions.get('s1')
+
+
+def test_warm_config_is_served_from_the_bank(client, tmp_path):
+    bank_key = normalize_config(CONFIG)
+    for i in range(3):
+        clip = tmp_path / f"banked_{i}.mp3"
+        clip.write_bytes(b'audio')
+        recon.question_bank.add(bank_key, f"Banked question {i}?", f"Banked answer {i}", str(clip))
+    os.remove(tmp_path / 'banked_0.mp3')
+
+    # The same skills in another order are the same config
+    session_data = run_session(dict(CONFIG, skills=['sql', 'Python']))
+    assert session_data['status'] == 'all_questions_ready'
+    assert sorted(question['text'] for question in session_data['questions']) == \
+        [f"Banked question {i}?" for i in range(3)]
+    assert client.calls['gemini'] == []
+    # Only the question whose clip was evicted is synthesized again
+    assert client.calls['audio'] == ["Banked question 0?"]
+
+
+def test_cold_config_is_generated_and_banked(client):
+    session_data = run_session(CONFIG)
+    assert session_data['status'] == 'all_questions_ready'
+    assert len(session_data['questions']) == 3
+    assert len(client.calls['gemini']) == 1
+
+    deadline = time.monotonic() + 5
+    while recon.question_bank.count(normalize_config(CONFIG)) < 3 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert recon.question_bank.count(normalize_config(CONFIG)) == 3
+
+
+def test_prewarm_fills_the_bank_up_to_its_size(client):
+    added = prewarm_questions.prewarm_config(recon, CONFIG, size=4, batch=3, workers=2, max_rounds=5)
+    assert added == 4
+    assert recon.question_bank.count(normalize_config(CONFIG)) == 4
+    assert len(client.calls['gemini']) == 2
+
+    # A warm config costs nothing more
+    assert prewarm_questions.prewarm_config(recon, CONFIG, size=4, batch=3, workers=2, max_rounds=5) == 0
+    assert len(client.calls['gemini']) == 2
@@ -0,0 +1,234 @@
+"""
+Tests for the question list streaming, batch parsing and in-order publishing.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import app as recon
+from generation_executor import CancellationToken
+from question_pipeline import QuestionPipeline, iter_numbered_questions, parse_question_batch, unique_questions
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_questions_split_across_chunks_inside_a_number():
+    chunks = ["Here are your questions:\n1", "0. What is a closure?\n1",
+              "1. Explain the GIL.", "\n12. What is a decorator?"]
+    assert list(iter_numbered_questions(chunks)) == [
+        "What is a closure?", "Explain the GIL.", "What is a decorator?"
+    ]
+
+
+def test_question_is_yielded_as_soon_as_its_line_is_complete():
+    seen = []
+
+    def chunks():
+        yield "1. First?\n2. Sec"
+        seen.append('second chunk requested')
+        yield "ond?\n"
+
+    stream = iter_numbered_questions(chunks())
+    assert next(stream) == "First?"
+    assert seen == []
+    assert next(stream) == "Second?"
+
+
+def test_numbering_styles_and_limit():
+    text = "**1.** Bold?\nQ2) Prefixed?\nQuestion 3: Long prefix?\n4 - Dashed?"
+    assert list(iter_numbered_questions([text])) == ["Bold?", "Prefixed?", "Long prefix?", "Dashed?"]
+    assert list(iter_numbered_questions([text], limit=2)) == ["Bold?", "Prefixed?"]
+
+
+def test_unnumbered_response_falls_back_to_lines():
+    assert list(iter_numbered_questions(["First?\n\nSecond?\nThird?"], limit=2)) == ["First?", "Second?"]
+
+
+def test_batch_in_json_fence():
+    raw = "```json\n" + json.dumps([
+        {'question': "1. What is REST?", 'answer': " Representational state transfer. "},
+        {'question': "What is gRPC?", 'answer': ""}
+    ]) + "\n```"
+    assert parse_question_batch(raw, 5) == [
+        {'question': "What is REST?", 'answer': "Representational state transfer."},
+        {'question': "What is gRPC?", 'answer': None}
+    ]
+
+
+def test_truncated_batch_is_rejected():
+    raw = json.dumps([{'question': "Q1?", 'answer': "A1"}, {'question': "Q2?", 'answer': "A2"}])
+    assert parse_question_batch(raw[:-20], 2) == []
+
+
+def test_short_batch_returns_what_is_valid():
+    raw = json.dumps({'questions': [
+        {'question': "Q1?", 'answer': "A1"},
+        {'question': "q1?", 'answer': "duplicate"},
+        "not an object",
+        {'answer': "no question"},
+        {'question': "Q2?", 'answer': "A2"}
+    ]})
+    items = parse_question_batch(raw, 5)
+    assert [item['question'] for item in items] == ["Q1?", "Q2?"]
+    assert parse_question_batch(raw, 1) == [{'question': "Q1?", 'answer': "A1"}]
+
+
+def test_unique_questions_skip_normalized_repeats():
+    seen = {"what is a closure?"}
+    questions = ["What is a  Closure?", "Explain the GIL.", "explain the gil.", "What is REST?"]
+    assert list(unique_questions(questions, seen)) == ["Explain the GIL.", "What is REST?"]
+    assert "what is rest?" in seen
+
+
+def test_pipeline_publishes_in_order_when_later_questions_finish_first():
+    published = []
+    # Question 1 is the slowest, question 4 the fastest
+    delays = {"Q1": 0.2, "Q2": 0.15, "Q3": 0.1, "Q4": 0.0}
+    pipeline = QuestionPipeline(
+        answer_fn=lambda text: time.sleep(delays[text]) or f"answer to {text}",
+        audio_fn=lambda index, text: f"/audio/{index}.mp3",
+        on_ready=lambda question: published.append(question),
+        max_workers=8
+    )
+    try:
+        for text in delays:
+            pipeline.submit(text)
+        assert pipeline.wait() == 4
+    finally:
+        pipeline.shutdown()
+
+    assert [q['index'] for q in published] == [1, 2, 3, 4]
+    assert published[0] == {'text': "Q1", 'answer': "answer to Q1", 'audio_url': "/audio/1.mp3", 'index': 1}
+
+
+def test_known_answers_and_audio_are_not_generated_again():
+    calls = []
+    published = []
+    pipeline = QuestionPipeline(
+        answer_fn=lambda text: calls.append(('answer', text)),
+        audio_fn=lambda index, text: calls.append(('audio', text)),
+        on_ready=published.append
+    )
+    try:
+        pipeline.submit("Banked?", answer="Banked answer", audio_url="/audio/banked.mp3")
+        pipeline.wait()
+    finally:
+        pipeline.shutdown()
+    assert calls == []
+    assert published[0]['audio_url'] == "/audio/banked.mp3"
+
+
+def test_streamed_audio_completes_after_publishing():
+    audio_done = threading.Event()
+    published = []
+    completed = []
+    pipeline = QuestionPipeline(
+        answer_fn=lambda text: "answer",
+        audio_fn=lambda index, text: audio_done.wait(5) and "/audio/1.mp3",
+        on_ready=published.append,
+        on_complete=completed.append,
+        wait_for_audio=False
+    )
+    try:
+        pipeline.submit("Q1")
+        deadline = time.monotonic() + 5
+        while not published and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert published[0]['audio_url'] is None
+        assert completed == []
+        audio_done.set()
+        pipeline.wait()
+    finally:
+        pipeline.shutdown()
+    assert completed[0]['audio_url'] == "/audio/1.mp3"
+
+
+def test_cancelled_pipeline_starts_and_publishes_nothing_more():
+    token = CancellationToken()
+    started = threading.Event()
+    release = threading.Event()
+    published = []
+    calls = []
+
+    def answer(text):
+        calls.append(text)
+        started.set()
+        release.wait(5)
+        return "answer"
+
+    pipeline = QuestionPipeline(answer_fn=answer, audio_fn=lambda index, text: None,
+                                on_ready=published.append, max_workers=1, token=token)
+    try:
+        pipeline.submit("Q1")
+        pipeline.submit("Q2")
+        assert started.wait(5)
+        token.cancel('speculation')
+        assert pipeline.submit("Q3") is None
+        release.set()
+        pipeline.wait()
+    finally:
+        pipeline.shutdown()
+
+    assert calls == ["Q1"]
+    assert published == []
+    assert token.late_work == 1
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    """A session whose batch call returns 2 of 3 questions and whose re-request repeats one of them"""
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(recon, 'SESSION_DATA_DIR', str(tmp_path / 'sessions'))
+    monkeypatch.setattr(recon, 'AUDIO_CACHE_DIR', str(tmp_path / 'audio_cache'))
+    monkeypatch.setattr(recon, 'SESSION_STORE_URL', 'memory://')
+    monkeypatch.setattr(recon, 'QUESTION_BANK_ENABLED', False)
+    monkeypatch.setattr(recon, 'QUESTION_GENERATION_MODE', 'batch')
+    monkeypatch.setattr(recon, 'AUDIO_STREAMING', False)
+    batch = json.dumps([{'question': "What is a closure?", 'answer': "A1"},
+                        {'question': "Explain the GIL.", 'answer': "A2"}])
+    relisted = "1. what is a  closure?\n2. What is a decorator?\n3. Explain the GIL."
+
+    def fake_gemini(prompt, max_tokens=None, generation_config=None, **kwargs):
+        return batch if generation_config else relisted
+
+    async def fake_gemini_async(prompt, **kwargs):
+        return fake_gemini(prompt, **kwargs)
+
+    async def fake_answer_async(text, level):
+        return "answer"
+
+    async def fake_audio_async(session_id, index, text):
+        return None
+    monkeypatch.setattr(recon, 'get_gemini_response', fake_gemini)
+    monkeypatch.setattr(recon, 'stream_gemini_response', lambda prompt, max_tokens=None: iter([relisted]))
+    monkeypatch.setattr(recon, 'generate_model_answer', lambda text, level: "answer")
+    monkeypatch.setattr(recon, 'generate_question_audio', lambda session_id, index, text: None)
+    monkeypatch.setattr(recon, 'get_gemini_response_async', fake_gemini_async)
+    monkeypatch.setattr(recon, 'generate_model_answer_async', fake_answer_async)
+    monkeypatch.setattr(recon, 'generate_question_audio_async', fake_audio_async)
+    recon.create_app(start_services=False)
+    recon.sessions.create('s1', {'config': {}, 'status': 'intro_ready', 'questions': [], 'user_answers': {},
+                                 'total_questions': 4, 'created_at': time.time()})
+    yield
+    recon.sessions.delete('s1')
+
+
+def published_texts():
+    return [question['text'] for question in recon.sessions.get('s1')['questions']]
+
+
+def test_rerequested_questions_are_deduplicated_against_the_batch(session):
+    config = {'skills': ['Python'], 'num_questions': 3}
+    recon.prepare_remaining_questions('s1', config, CancellationToken())
+    assert published_texts() == ["What is a closure?", "Explain the GIL.", "What is a decorator?"]
+
+
+def test_rerequested_questions_are_deduplicated_on_the_async_engine(session):
+    config = {'skills': ['Python'], 'num_questions': 3}
+    asyncio.run(recon.prepare_remaining_questions_async('s1', config, CancellationToken()))
+    assert published_texts() == ["What is a closure?", "Explain the GIL.", "What is a decorator?"]
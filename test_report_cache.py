@@ -0,0 +1,125 @@
+"""
+Tests for the feedback cache and background report generation.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+import app as recon
+from report_cache import FeedbackCache
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_concurrent_misses_share_one_generation():
+    cache = FeedbackCache()
+    calls = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.1)
+        return "feedback"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_create('k', generate)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [("feedback", False)] + [("feedback", True)] * 3
+    assert cache.get_or_create('k', generate) == ("feedback", True)
+
+
+def test_failures_are_not_cached():
+    cache = FeedbackCache()
+    assert cache.get_or_create('k', lambda: None) == (None, False)
+    assert cache.get_or_create('k', lambda: "feedback") == ("feedback", False)
+
+
+def test_least_recently_used_feedback_is_dropped():
+    cache = FeedbackCache(max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.get_or_create(key, lambda: key)
+    assert cache.stats()['entries'] == 2
+    assert cache.get_or_create('a', lambda: "again") == ("again", False)
+
+
+def test_key_covers_every_prompt_input():
+    key = FeedbackCache.make_key("the skills: Python", 'mid', 'Skills-based', 2, 3)
+    assert key == FeedbackCache.make_key("the skills: Python", 'mid', 'Skills-based', 2, 3)
+    assert key != FeedbackCache.make_key("the skills: Python", 'mid', 'Skills-based', 3, 3)
+    assert key != FeedbackCache.make_key("the skills: Python", 'senior', 'Skills-based', 2, 3)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(recon, 'SESSION_DATA_DIR', str(tmp_path / 'sessions'))
+    monkeypatch.setattr(recon, 'AUDIO_CACHE_DIR', str(tmp_path / 'audio_cache'))
+    monkeypatch.setattr(recon, 'SESSION_STORE_URL', 'memory://')
+    monkeypatch.setattr(recon, 'QUESTION_BANK_ENABLED', False)
+    monkeypatch.setattr(recon, 'feedback_cache', FeedbackCache())
+    prompts = []
+
+    def fake_gemini(prompt, max_tokens=None, **kwargs):
+        prompts.append(prompt)
+        return f"Feedback #{len(prompts)}"
+    monkeypatch.setattr(recon, 'get_gemini_response', fake_gemini)
+    flask_app = recon.create_app(start_services=False)
+    client = flask_app.test_client()
+    client.prompts = prompts
+    yield client
+    for session_id in ('s1', 's2'):
+        recon.sessions.delete(session_id)
+
+
+def create_session(session_id, answered):
+    recon.sessions.create(session_id, {
+        'config': {'skills': ['Python'], 'level': 'mid'}, 'status': 'all_questions_ready',
+        'questions': [{'text': f"Q{i}?"} for i in range(1, 4)],
+        'user_answers': {str(i): {'audio_path': f"q_{i}.webm"} for i in range(answered + 1)},
+        'total_questions': 4, 'created_at': time.time()
+    })
+
+
+def wait_for_report(client, session_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get(f"/report_status/{session_id}").get_json()['status']
+        if status != 'pending':
+            return status
+        time.sleep(0.02)
+    return None
+
+
+def test_report_is_built_once_and_shared_by_equal_sessions(client):
+    create_session('s1', answered=2)
+    create_session('s2', answered=2)
+    assert wait_for_report(client, 's1') == 'ready'
+    assert wait_for_report(client, 's2') == 'ready'
+
+    assert len(client.prompts) == 1
+    assert "Questions Attempted: 2 out of 3" in client.prompts[0]
+    assert recon.sessions.get('s2')['report']['cached']
+    page = client.get('/report/s1').get_data(as_text=True)
+    assert "Feedback #1" in page
+    assert len(client.prompts) == 1
+
+
+def test_report_is_regenerated_when_the_answers_change(client):
+    create_session('s1', answered=2)
+    assert wait_for_report(client, 's1') == 'ready'
+
+    recon.sessions.update('s1', lambda data: data['user_answers'].update({'3': {'audio_path': 'q_3.webm'}}))
+    assert client.get('/report_status/s1').get_json()['status'] == 'pending'
+    assert wait_for_report(client, 's1') == 'ready'
+
+    report = recon.sessions.get('s1')['report']
+    assert (report['answered'], report['feedback']) == (3, "Feedback #2")
+    assert "Questions Attempted: 3 out of 3" in client.prompts[1]
@@ -0,0 +1,52 @@
+"""
+Tests for the session event stream and its long-poll fallback.
+"""
+
+import os
+import time
+
+import pytest
+
+import app as recon
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(recon, 'SESSION_DATA_DIR', str(tmp_path / 'sessions'))
+    monkeypatch.setattr(recon, 'AUDIO_CACHE_DIR', str(tmp_path / 'audio_cache'))
+    monkeypatch.setattr(recon, 'SESSION_STORE_URL', 'memory://')
+    monkeypatch.setattr(recon, 'QUESTION_BANK_ENABLED', False)
+    flask_app = recon.create_app(start_services=False)
+    recon.sessions.create('s1', {'config': {}, 'status': 'initializing', 'questions': [],
+                                 'user_answers': {}, 'total_questions': 1, 'created_at': time.time()})
+    yield flask_app.test_client()
+    recon.sessions.delete('s1')
+
+
+def test_stream_replays_events_until_a_terminal_one(client):
+    recon.event_bus.publish('s1', 'intro_ready', {'status': 'intro_ready'})
+    recon.event_bus.publish('s1', 'all_questions_ready', {'total': 1})
+    response = client.get('/session_events/s1')
+    body = response.get_data(as_text=True)
+    assert response.mimetype == 'text/event-stream'
+    assert 'event: intro_ready' in body
+    assert body.rstrip().endswith('data: {"total": 1}')
+
+
+def test_disabled_stream_sends_clients_to_long_polling(client, monkeypatch):
+    monkeypatch.setattr(recon, 'SSE_ENABLED', False)
+    assert client.get('/session_events/s1').status_code == 204
+
+    recon.event_bus.publish('s1', 'intro_ready', {'status': 'intro_ready'})
+    recon.event_bus.publish('s1', 'question_ready', {'index': 1})
+    result = client.get('/session_events/s1/poll?after=1&timeout=0').get_json()
+    assert [event['event'] for event in result['events']] == ['question_ready']
+    assert not result['finished']
+
+
+def test_unknown_session(client):
+    assert client.get('/session_events/missing').status_code == 404
+    assert client.get('/session_events/missing/poll').status_code == 404
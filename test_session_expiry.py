@@ -0,0 +1,94 @@
+"""
+Tests for the idle-deadline heap and the session count and disk budgets.
+"""
+
+from session_expiry import SessionExpiry, select_evictions
+
+
+def test_due_pops_expired_sessions_in_deadline_order():
+    expiry = SessionExpiry(ttl=100)
+    expiry.touch('late', now=30)
+    expiry.touch('early', now=10)
+    expiry.touch('middle', now=20)
+
+    assert expiry.due(now=105) == []
+    assert expiry.due(now=125) == ['early', 'middle']
+    assert 'early' not in expiry
+    assert expiry.due(now=1000) == ['late']
+    assert len(expiry) == 0
+
+
+def test_touch_pushes_the_deadline_forward():
+    expiry = SessionExpiry(ttl=100)
+    expiry.touch('s1', now=1)
+    expiry.touch('s1', now=50)
+    # The stale deadline at 100 is skipped
+    assert expiry.due(now=120) == []
+    assert expiry.due(now=150) == ['s1']
+
+
+def test_session_ttl_sticks_until_replaced():
+    expiry = SessionExpiry(ttl=100)
+    expiry.touch('speculative', now=1, ttl=10)
+    expiry.touch('speculative', now=5)
+    assert expiry.due(now=16) == ['speculative']
+
+    expiry.touch('claimed', now=1, ttl=10)
+    expiry.touch('claimed', now=5, ttl=100)
+    assert expiry.due(now=16) == []
+
+
+def test_activity_is_persisted_at_most_every_interval():
+    expiry = SessionExpiry(ttl=100, persist_interval=30)
+    assert expiry.touch('s1', now=1000)
+    assert not expiry.touch('s1', now=1010)
+    # A new ttl is always written
+    assert expiry.touch('s1', now=1020, ttl=50)
+    assert not expiry.touch('s1', now=1040)
+    assert expiry.touch('s1', now=1051)
+
+
+def test_adopt_uses_shared_activity_with_slack_for_the_persist_interval():
+    expiry = SessionExpiry(ttl=100, persist_interval=30)
+    assert not expiry.adopt('gone', last_active=0, now=130)
+    assert 'gone' not in expiry
+
+    assert expiry.adopt('active', last_active=50, ttl=20, now=90)
+    assert expiry.due(now=99) == []
+    assert expiry.due(now=100) == ['active']
+
+
+def test_forget_drops_a_session():
+    expiry = SessionExpiry(ttl=100)
+    expiry.touch('s1', now=1)
+    expiry.forget('s1')
+    assert expiry.due(now=1000) == []
+    assert expiry.stats()['sessions'] == 0
+
+
+def test_stale_heap_entries_are_compacted():
+    expiry = SessionExpiry(ttl=100)
+    for now in range(1, 501):
+        expiry.touch('s1', now=now)
+    stats = expiry.stats()
+    assert stats['sessions'] == 1
+    assert stats['heap_entries'] <= 2 + 64
+
+
+def test_evictions_take_the_least_recently_active_first():
+    oldest = [('b', 10.0, None, 10), ('c', 20.0, 60, 10), ('a', 30.0, None, 10)]
+    assert select_evictions(oldest, 3, 30, max_sessions=3, disk_budget=100) == []
+    assert select_evictions(oldest, 3, 30, max_sessions=1, disk_budget=100) == ['b', 'c']
+
+
+def test_evictions_bring_disk_usage_under_budget():
+    oldest = [('a', 10.0, None, 500), ('b', 20.0, None, 100), ('c', 30.0, None, 400)]
+    assert select_evictions(oldest, 3, 1000, max_sessions=10, disk_budget=600) == ['a']
+    assert select_evictions(oldest, 3, 1000, max_sessions=10, disk_budget=300) == ['a', 'b', 'c']
+
+
+def test_evictions_use_the_totals_of_every_session():
+    # Only the oldest two of many sessions were read
+    oldest = [('a', 10.0, None, 100), ('b', 20.0, None, 100)]
+    assert select_evictions(oldest, 50, 5000, max_sessions=49, disk_budget=10000) == ['a']
+    assert select_evictions(oldest, 50, 5000, max_sessions=100, disk_budget=4000) == ['a', 'b']
@@ -0,0 +1,142 @@
+"""
+Tests for the session store backends; Redis runs against fakeredis when it is installed.
+"""
+
+import threading
+
+import pytest
+
+from session_store import MemorySessionStore, RedisSessionStore, SQLiteSessionStore, create_session_store
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def store(request, tmp_path, monkeypatch):
+    if request.param == 'memory':
+        return MemorySessionStore()
+    if request.param == 'sqlite':
+        return SQLiteSessionStore(str(tmp_path / 'sessions.db'))
+    redis = pytest.importorskip('redis')
+    fakeredis = pytest.importorskip('fakeredis')
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, 'from_url',
+                        classmethod(lambda cls, url, **kwargs: fakeredis.FakeRedis(server=server)))
+    return RedisSessionStore('redis://localhost:6379/0')
+
+
+def test_data_round_trips_through_json(store):
+    store.create('s1', {'status': 'initializing', 'user_answers': {1: {'audio_path': 'a.webm'}}})
+    assert store.get('s1') == {'status': 'initializing', 'user_answers': {'1': {'audio_path': 'a.webm'}}}
+    assert 's1' in store
+    assert store.get('missing') is None
+    assert 'missing' not in store
+
+
+def test_reads_are_snapshots(store):
+    store.create('s1', {'questions': []})
+    snapshot = store.get('s1')
+    snapshot['questions'].append('changed')
+    assert store.get('s1') == {'questions': []}
+
+
+def test_update_applies_and_returns_the_new_data(store):
+    store.create('s1', {'questions': [], 'status': 'initializing'})
+    updated = store.update('s1', lambda data: data['questions'].append({'index': 1}))
+    assert updated == {'questions': [{'index': 1}], 'status': 'initializing'}
+    assert store.set_fields('s1', status='ready')['status'] == 'ready'
+    assert store.get('s1')['status'] == 'ready'
+    assert store.update('missing', lambda data: data.clear()) is None
+
+
+def test_concurrent_updates_are_not_lost(store):
+    store.create('s1', {'count': 0})
+
+    def increment():
+        for _ in range(25):
+            store.update('s1', lambda data: data.update(count=data['count'] + 1))
+
+    threads = [threading.Thread(target=increment) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.get('s1')['count'] == 200
+
+
+def test_delete_removes_data_and_activity(store):
+    store.create('s1', {})
+    store.create('s2', {})
+    store.delete('s1')
+    assert sorted(store.session_ids()) == ['s2']
+    assert store.activity('s1') is None
+    assert [entry[0] for entry in store.all_activity()] == ['s2']
+
+
+def test_activity_ttl_and_disk_usage(store):
+    store.create('s1', {})
+    store.create('s2', {})
+    store.touch('s1', now=1000.0, ttl=120)
+    store.touch('s1', now=2000.0)
+    store.touch('s2', now=1500.0)
+    store.add_usage('s1', 300)
+    store.add_usage('s1', -100)
+
+    assert store.activity('s1') == (2000.0, 120)
+    assert store.activity('s2') == (1500.0, None)
+    assert sorted(store.all_activity()) == [('s1', 2000.0, 120, 200), ('s2', 1500.0, None, 0)]
+
+
+def test_totals_are_kept_on_create_usage_and_delete(store):
+    assert store.totals() == (0, 0)
+    store.create('s1', {})
+    store.create('s2', {})
+    store.add_usage('s1', 300)
+    store.add_usage('s2', 50)
+    assert store.totals() == (2, 350)
+    # Re-creating a session starts its usage over
+    store.create('s2', {})
+    assert store.totals() == (2, 300)
+    store.delete('s1')
+    store.add_usage('s1', 10)
+    assert store.totals() == (1, 0)
+
+
+def test_oldest_lists_the_least_recently_active_first(store):
+    for session_id, now in [('a', 3000.0), ('b', 1000.0), ('c', 2000.0)]:
+        store.create(session_id, {})
+        store.touch(session_id, now=now)
+    store.add_usage('b', 7)
+    assert store.oldest(2) == [('b', 1000.0, None, 7), ('c', 2000.0, None, 0)]
+    assert [entry[0] for entry in store.oldest(10)] == ['b', 'c', 'a']
+
+
+def test_sqlite_totals_are_seeded_for_an_existing_database(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    store = SQLiteSessionStore(path)
+    store.create('s1', {})
+    store.add_usage('s1', 40)
+    conn = store._connection()
+    conn.execute("DROP TABLE session_totals")
+    for trigger in ('sessions_insert_totals', 'sessions_delete_totals', 'sessions_usage_totals'):
+        conn.execute(f"DROP TRIGGER {trigger}")
+    assert SQLiteSessionStore(path).totals() == (1, 40)
+
+
+def test_touch_does_not_bring_back_a_deleted_session(store):
+    store.create('s1', {})
+    store.delete('s1')
+    store.touch('s1', ttl=60)
+    assert store.activity('s1') is None
+    assert store.all_activity() == []
+
+
+def test_sqlite_sessions_are_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    SQLiteSessionStore(path).create('s1', {'status': 'ready'})
+    assert SQLiteSessionStore(path).get('s1') == {'status': 'ready'}
+
+
+def test_store_from_url(tmp_path):
+    assert isinstance(create_session_store(None), MemorySessionStore)
+    assert isinstance(create_session_store(f"sqlite:///{tmp_path}/sessions.db"), SQLiteSessionStore)
+    with pytest.raises(ValueError):
+        create_session_store('postgres://localhost/sessions')
@@ -0,0 +1,106 @@
+"""
+Tests for speculative session preparation: claiming a matching session, cancelling a mismatched one.
+"""
+
+import os
+import threading
+
+import pytest
+
+import app as recon
+from generation_executor import GenerationExecutor
+from speculation import SpeculationTracker, speculation_key
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_key_ignores_skill_order_but_not_question_count():
+    key = speculation_key({'skills': ['Python', 'SQL'], 'level': 'mid', 'num_questions': 5})
+    assert speculation_key({'skills': ['SQL', 'python'], 'level': 'mid', 'num_questions': '5'}) == key
+    assert speculation_key({'skills': ['Python', 'SQL'], 'level': 'mid', 'num_questions': 3}) != key
+
+
+def test_tracker_hit_rate_and_waste():
+    tracker = SpeculationTracker()
+    for _ in range(4):
+        tracker.record_start()
+    tracker.record_claim(2.0)
+    tracker.record_waste('mismatch', questions=3, seconds=4.0)
+    tracker.record_late_waste(calls=2, seconds=1.0)
+    stats = tracker.stats()
+    assert stats['hit_rate'] == 0.25
+    assert stats['cancelled'] == {'mismatch': 1}
+    assert (stats['wasted_questions'], stats['wasted_calls'], stats['wasted_seconds']) == (3, 2, 5.0)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(recon, 'SESSION_DATA_DIR', str(tmp_path / 'sessions'))
+    monkeypatch.setattr(recon, 'AUDIO_CACHE_DIR', str(tmp_path / 'audio_cache'))
+    monkeypatch.setattr(recon, 'SESSION_STORE_URL', 'memory://')
+    monkeypatch.setattr(recon, 'QUESTION_BANK_ENABLED', False)
+    monkeypatch.setattr(recon, 'GENERATION_ENGINE', 'threads')
+    monkeypatch.setattr(recon, 'SPECULATION_RESERVED_WORKERS', 1)
+    monkeypatch.setattr(recon, 'prepare_introduction_question', lambda session_id, config: None)
+    release = threading.Event()
+    monkeypatch.setattr(recon, 'prepare_remaining_questions',
+                        lambda session_id, config, token: release.wait(5))
+    monkeypatch.setattr(recon, 'generation_executor', GenerationExecutor(max_workers=4, max_queue=4))
+    monkeypatch.setattr(recon, 'speculation_tracker', SpeculationTracker())
+    flask_app = recon.create_app(start_services=False)
+    yield flask_app.test_client()
+    release.set()
+    for session_id in list(recon.sessions.session_ids()):
+        recon.sessions.delete(session_id)
+
+
+def speculate(client, config):
+    response = client.post('/speculate_session', json=config)
+    assert response.get_json()['status'] == 'preparing'
+    return response.get_json()['speculation_id']
+
+
+def test_matching_config_claims_the_speculative_session(client):
+    speculation_id = speculate(client, {'skills': ['Python', 'SQL'], 'level': 'mid', 'num_questions': 3})
+    response = client.post('/prepare_session', json={
+        'skills': ['SQL', 'Python'], 'level': 'mid', 'num_questions': 3, 'speculation_id': speculation_id
+    })
+    data = response.get_json()
+    assert data['session_id'] == speculation_id
+    assert data['speculative']
+
+    session_data = recon.sessions.get(speculation_id)
+    assert not session_data['speculative']
+    # The claimed session keeps the submitted config
+    assert session_data['config']['skills'] == ['SQL', 'Python']
+    assert recon.speculation_tracker.stats()['claimed'] == 1
+
+
+def test_mismatched_config_cancels_the_speculative_session(client):
+    speculation_id = speculate(client, {'skills': ['Python'], 'level': 'mid', 'num_questions': 3})
+    response = client.post('/prepare_session', json={
+        'skills': ['Go'], 'level': 'mid', 'num_questions': 3, 'speculation_id': speculation_id
+    })
+    data = response.get_json()
+    assert data['session_id'] != speculation_id
+    assert 'speculative' not in data
+
+    assert speculation_id not in recon.sessions
+    assert recon.sessions.get(data['session_id'])['config']['skills'] == ['Go']
+    stats = recon.speculation_tracker.stats()
+    assert (stats['claimed'], stats['cancelled']) == (0, {'mismatch': 1})
+
+
+def test_speculation_only_uses_idle_workers(client, monkeypatch):
+    monkeypatch.setattr(recon, 'SPECULATION_RESERVED_WORKERS', 4)
+    response = client.post('/speculate_session', json={'skills': ['Python'], 'num_questions': 3})
+    assert response.get_json() == {'status': 'skipped'}
+    assert list(recon.sessions.session_ids()) == []
+
+
+def test_abandoned_speculation_is_cancelled_once(client):
+    speculation_id = speculate(client, {'skills': ['Python'], 'num_questions': 3})
+    assert client.post(f"/speculate_session/{speculation_id}/cancel").get_json() == {'cancelled': True}
+    assert client.post(f"/speculate_session/{speculation_id}/cancel").get_json() == {'cancelled': False}
+    assert recon.speculation_tracker.stats()['cancelled'] == {'abandoned': 1}
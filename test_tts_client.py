@@ -0,0 +1,72 @@
+"""
+Tests for the Azure TTS client's token handling, against the fake Azure server.
+"""
+
+import threading
+
+import pytest
+
+from fakes import FakeAzureTTSServer
+from tts_client import AzureTTSClient
+
+
+@pytest.fixture
+def server(tmp_path):
+    mp3_path = tmp_path / 'clip.mp3'
+    mp3_path.write_bytes(b'fake-mp3')
+    server = FakeAzureTTSServer(str(mp3_path)).start()
+    yield server
+    server.stop()
+
+
+def make_client(server):
+    return AzureTTSClient('key', 'region', endpoint=server.endpoint, token_endpoint=server.token_endpoint)
+
+
+def test_concurrent_callers_share_one_token_fetch(server):
+    server.token_latency = 0.2
+    client = make_client(server)
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(client.get_token())) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tokens == ['fake-token'] * 5
+    assert server.stats()['tokens'] == 1
+
+
+def test_token_lock_is_not_held_during_the_fetch(server):
+    server.token_latency = 0.3
+    client = make_client(server)
+    fetcher = threading.Thread(target=client.get_token)
+    fetcher.start()
+    while client._token_fetch is None:
+        pass
+    # Invalidation does not wait behind the network call
+    assert client._token_lock.acquire(timeout=0.1)
+    client._token_lock.release()
+    fetcher.join()
+
+
+def test_failed_fetch_falls_back_to_the_key_for_the_backoff_window(server):
+    server.token_status = 401
+    client = make_client(server)
+    assert client.auth_headers() == {'Ocp-Apim-Subscription-Key': 'key'}
+    assert client.auth_headers() == {'Ocp-Apim-Subscription-Key': 'key'}
+    assert server.stats()['tokens'] == 1
+
+    # Once the window is over the token endpoint is tried again
+    server.token_status = 200
+    client._token_retry_at = 0
+    assert client.auth_headers() == {'Authorization': 'Bearer fake-token'}
+    assert server.stats()['tokens'] == 2
+
+
+def test_synthesis_uses_the_token(server):
+    client = make_client(server)
+    response = client.synthesize('<speak>Hello</speak>', 'audio-24khz-48kbitrate-mono-mp3')
+    assert response.status_code == 200
+    assert response.content == b'fake-mp3'
+    assert server.stats() == {'tokens': 1, 'syntheses': 1, 'errors': 0, 'bytes': 8}
@@ -0,0 +1,113 @@
+"""
+Speech-to-text engines for transcribing recorded answers.
+
+Answers are transcribed in the background as they are submitted, so the
+report never waits on STT. Engines share one small interface; the Azure
+engine uses the Speech SDK, and an offline stand-in (see fakes.py) can be
+selected for development and load tests.
+"""
+
+import os
+import tempfile
+import threading
+
+
+class STTEngine:
+    """
+    Base interface: transcribe(audio_path) returns the recognized text
+    """
+    name = 'base'
+
+    def transcribe(self, audio_path):
+        raise NotImplementedError
+
+
+class AzureSTTEngine(STTEngine):
+    """
+    Azure Speech SDK continuous recognition
+
+    Browser recordings are WebM/Opus, which the SDK cannot read without
+    GStreamer, so they are decoded to 16kHz mono PCM with pydub first.
+    """
+    name = 'azure'
+
+    def __init__(self, key, region, language='en-US', timeout=300):
+        self.key = key
+        self.region = region
+        self.language = language
+        self.timeout = timeout
+
+    def transcribe(self, audio_path):
+        # Both are heavy and only needed on the worker threads, import on first use
+        from azure.cognitiveservices.speech import SpeechConfig, SpeechRecognizer, ResultReason
+        from azure.cognitiveservices.speech.audio import AudioConfig
+
+        wav_path = to_pcm_wav(audio_path)
+        try:
+            speech_config = SpeechConfig(subscription=self.key, region=self.region)
+            speech_config.speech_recognition_language = self.language
+            recognizer = SpeechRecognizer(speech_config=speech_config,
+                                          audio_config=AudioConfig(filename=wav_path))
+
+            # Answers run past the single-shot limit, so collect every recognized phrase
+            phrases = []
+            errors = []
+            done = threading.Event()
+
+            def on_recognized(evt):
+                if evt.result.reason == ResultReason.RecognizedSpeech and evt.result.text:
+                    phrases.append(evt.result.text)
+
+            def on_canceled(evt):
+                # End of the file also arrives as a cancellation, without error details
+                details = evt.cancellation_details.error_details
+                if details:
+                    errors.append(details)
+                done.set()
+
+            recognizer.recognized.connect(on_recognized)
+            recognizer.canceled.connect(on_canceled)
+            recognizer.session_stopped.connect(lambda evt: done.set())
+
+            recognizer.start_continuous_recognition()
+            finished = done.wait(self.timeout)
+            recognizer.stop_continuous_recognition()
+
+            if errors:
+                raise RuntimeError(errors[0])
+            if not finished:
+                raise TimeoutError(f"Transcription did not finish within {self.timeout}s")
+            return ' '.join(phrases)
+        finally:
+            if wav_path != audio_path and os.path.exists(wav_path):
+                os.remove(wav_path)
+
+
+def to_pcm_wav(audio_path):
+    """Decode a recording to a temporary 16kHz mono WAV, returns its path"""
+    if audio_path.endswith('.wav'):
+        return audio_path
+    from pydub import AudioSegment
+
+    audio = AudioSegment.from_file(audio_path).set_frame_rate(16000).set_channels(1).set_sample_width(2)
+    fd, wav_path = tempfile.mkstemp(suffix='.wav')
+    os.close(fd)
+    audio.export(wav_path, format='wav')
+    return wav_path
+
+
+def create_stt_engine(name, **options):
+    """
+    Build an STT engine by name
+
+    azure    Azure Speech SDK (needs key and region)
+    offline  local stand-in that returns a placeholder transcript
+    """
+    name = (name or 'azure').lower()
+    if name == 'azure':
+        return AzureSTTEngine(options.get('key'), options.get('region'),
+                              language=options.get('language', 'en-US'))
+    if name == 'offline':
+        from fakes import FakeSTTEngine
+        return FakeSTTEngine(latency=options.get('latency', 0.0))
+    raise ValueError(f"Unsupported STT engine: {name}")
@@ -0,0 +1,209 @@
+"""
+Reusable Azure Text-to-Speech REST client.
+
+Keeps a pooled keep-alive HTTP session, authenticates with a cached bearer
+token from the issueToken endpoint (refreshed before it expires, one fetch
+at a time, falling back to the subscription key while the endpoint fails)
+and retries 429/5xx responses with exponential backoff.
+"""
+
+import asyncio
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class AzureTTSClient:
+    """
+    Pooled, token-authenticated client for the Azure TTS REST API
+    """
+
+    # Tokens are valid for 10 minutes, refresh a little before that
+    TOKEN_LIFETIME = 9 * 60
+    TOKEN_TIMEOUT = 10
+    # After a failed token fetch, requests use the subscription key for this long
+    TOKEN_FAILURE_BACKOFF = 30
+
+    def __init__(self, key, region, pool_size=20, max_retries=3, backoff_factor=0.5,
+                 timeout=30, endpoint=None, token_endpoint=None, user_agent='ReconAI-TTS'):
+        self.key = key
+        self.region = region
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.pool_size = pool_size
+        self.endpoint = endpoint or f"https://{region}.tts.speech.microsoft.com/cognitiveservices/v1"
+        self.token_endpoint = token_endpoint or f"https://{region}.api.cognitive.microsoft.com/sts/v1.0/issuetoken"
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({'POST'}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._token = None
+        self._token_expires = 0
+        self._token_lock = threading.Lock()
+        self._token_fetch = None  # Event set when the in-flight fetch is done
+        self._token_error = None
+        self._token_retry_at = 0
+        self._async_sessions = {}  # event loop -> aiohttp session
+        self._warned_no_aiohttp = False
+
+    def get_token(self):
+        """
+        Return a cached bearer token, fetching a new one when close to expiry
+
+        One caller fetches, outside the lock, while the others wait for its
+        result. A failed fetch is raised again without a request for
+        TOKEN_FAILURE_BACKOFF seconds.
+        """
+        with self._token_lock:
+            if self._token and time.time() < self._token_expires:
+                return self._token
+            if self._token_error is not None and time.time() < self._token_retry_at:
+                raise self._token_error
+            fetch = self._token_fetch
+            if fetch is None:
+                fetch = self._token_fetch = threading.Event()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            fetch.wait(self.TOKEN_TIMEOUT)
+            with self._token_lock:
+                if self._token and time.time() < self._token_expires:
+                    return self._token
+                raise self._token_error or requests.Timeout("Timed out waiting for the Azure TTS token")
+
+        token = error = None
+        try:
+            response = self.session.post(
+                self.token_endpoint,
+                headers={'Ocp-Apim-Subscription-Key': self.key, 'Content-Length': '0'},
+                timeout=self.TOKEN_TIMEOUT
+            )
+            response.raise_for_status()
+            token = response.text
+            return token
+        except requests.RequestException as e:
+            error = e
+            print(f"[WARNING] Could not fetch Azure TTS token, using subscription key "
+                  f"for {self.TOKEN_FAILURE_BACKOFF}s: {str(e)}")
+            raise
+        finally:
+            with self._token_lock:
+                if token is not None:
+                    self._token = token
+                    self._token_expires = time.time() + self.TOKEN_LIFETIME
+                    self._token_error = None
+                elif error is not None:
+                    self._token_error = error
+                    self._token_retry_at = time.time() + self.TOKEN_FAILURE_BACKOFF
+                self._token_fetch = None
+            fetch.set()
+
+    def invalidate_token(self):
+        with self._token_lock:
+            self._token = None
+            self._token_expires = 0
+
+    def auth_headers(self):
+        try:
+            return {'Authorization': f"Bearer {self.get_token()}"}
+        except requests.RequestException:
+            # The subscription key is accepted directly, so a token outage is not fatal
+            return {'Ocp-Apim-Subscription-Key': self.key}
+
+    def synthesize(self, ssml, output_format, stream=False):
+        """
+        POST SSML to the TTS endpoint and return the response
+
+        With stream=True the body is not read up front, so callers can relay
+        audio chunks as they arrive.
+        """
+        response = self._post(ssml, output_format, stream)
+        if response.status_code == 401:
+            # Token revoked or expired early, fetch a fresh one once
+            response.close()
+            self.invalidate_token()
+            response = self._post(ssml, output_format, stream)
+        return response
+
+    def _headers(self, output_format):
+        return {
+            'Content-Type': 'application/ssml+xml',
+            'X-Microsoft-OutputFormat': output_format,
+            'User-Agent': self.user_agent,
+            **self.auth_headers()
+        }
+
+    def _post(self, ssml, output_format, stream):
+        return self.session.post(self.endpoint, headers=self._headers(output_format), data=ssml.encode('utf-8'),
+                                 timeout=self.timeout, stream=stream)
+
+    async def synthesize_async(self, ssml, output_format):
+        """
+        Async synthesis for the asyncio generation engine, returns (status, audio bytes)
+
+        Uses aiohttp when it is installed, with the same 401 refresh and
+        429/5xx backoff as the blocking client; otherwise the blocking client
+        runs in a worker thread.
+        """
+        try:
+            import aiohttp
+        except ImportError:
+            if not self._warned_no_aiohttp:
+                self._warned_no_aiohttp = True
+                print("[WARNING] aiohttp is not installed, async TTS falls back to the blocking client "
+                      "in worker threads (pip install aiohttp)")
+            response = await asyncio.to_thread(self.synthesize, ssml, output_format)
+            return response.status_code, response.content
+
+        session = self._async_session(aiohttp)
+        refreshed = False
+        attempt = 0
+        while True:
+            # Token refreshes are rare but blocking, keep them off the event loop
+            headers = await asyncio.to_thread(self._headers, output_format)
+            async with session.post(self.endpoint, headers=headers, data=ssml.encode('utf-8')) as response:
+                body = await response.read()
+                status = response.status
+                retry_after = response.headers.get('Retry-After')
+            if status == 401 and not refreshed:
+                self.invalidate_token()
+                refreshed = True
+                continue
+            if status in (429, 500, 502, 503, 504) and attempt < self.max_retries:
+                attempt += 1
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else self.backoff_factor * 2 ** attempt
+                await asyncio.sleep(delay)
+                continue
+            return status, body
+
+    def _async_session(self, aiohttp):
+        # aiohttp sessions belong to one event loop
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.pool_size)
+            )
+            self._async_sessions[loop] = session
+        return session
+
+    def close(self):
+        self.session.close()